@@ -0,0 +1,108 @@
+"""Output tokens and latency: full-key vs compact-key extraction schema.
+
+Starts the bundled DashScope stand-in (``src.devtools.mock_services``) on
+127.0.0.1. It answers in whichever schema the prompt asks for, with the same
+content for the same report, and sleeps ``--ms-per-token`` per output token,
+so latency tracks output size the way real generation does.
+
+    python -m benchmarks.bench_output_schema --requests 50 --ms-per-token 4
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+import httpx
+
+from src.ai.qwen import QwenClient
+from src.ai.tokens import estimate_tokens
+from src.devtools.mock_services import LatencyModel, MockConfig, start_mock_server
+from src.schemas import ReportIn
+
+
+def _report(index: int) -> ReportIn:
+    now = datetime.utcnow()
+    return ReportIn(
+        user_id=f"u{index}",
+        user_name="张三",
+        period_type="weekly",
+        period_start=now.date(),
+        period_end=now.date(),
+        raw_text="本周完成支付接口灰度，推进 KR2 自动化测试覆盖率，风险：第三方依赖不稳定。" * 3,
+        message_ts=now,
+    )
+
+
+async def _run(compact: bool, requests: int, base_url: str) -> Dict[str, Any]:
+    outputs: List[int] = []
+
+    async def capture(response: httpx.Response) -> None:
+        await response.aread()
+        outputs.append(estimate_tokens(response.json()["output"]["text"]))
+
+    async with httpx.AsyncClient(event_hooks={"response": [capture]}) as client:
+        qwen = QwenClient(
+            api_key="bench",
+            model="qwen-max",
+            http_client=client,
+            compact_output=compact,
+            base_url=base_url,
+        )
+        latencies: List[float] = []
+        for index in range(requests):
+            started = time.perf_counter()
+            extract = await qwen.generate_hr_extract(_report(index), "O1 提升交付质量\n- KR2 覆盖率80%")
+            latencies.append(time.perf_counter() - started)
+            assert not extract.needs_retranslation and extract.risk_level == "medium"
+    latencies.sort()
+    return {
+        "schema": "compact" if compact else "full",
+        "requests": requests,
+        "output_tokens_mean": round(statistics.mean(outputs), 1),
+        "latency_ms_mean": round(statistics.mean(latencies) * 1000, 1),
+        "latency_ms_p95": round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 1),
+    }
+
+
+async def _main(requests: int, ms_per_token: float, base_ms: float) -> None:
+    config = MockConfig(latency=LatencyModel("fixed", (base_ms,)), ms_per_token=ms_per_token)
+    server, base_url = start_mock_server(config)
+    try:
+        results = [await _run(compact, requests, base_url) for compact in (False, True)]
+    finally:
+        server.should_exit = True
+    for result in results:
+        print(json.dumps(result, ensure_ascii=False))
+    full, compact = results
+    print(
+        json.dumps(
+            {
+                "output_token_reduction": round(
+                    1 - compact["output_tokens_mean"] / full["output_tokens_mean"], 3
+                ),
+                "latency_reduction": round(
+                    1 - compact["latency_ms_mean"] / full["latency_ms_mean"], 3
+                ),
+            }
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare full vs compact output schema.")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--ms-per-token", type=float, default=4.0)
+    parser.add_argument("--base-ms", type=float, default=150.0, help="time to first token")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)  # keep stdout to the JSON result lines
+    asyncio.run(_main(args.requests, args.ms_per_token, args.base_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Requests/sec microbenchmark for ``POST /webhook/feishu``.
+
+Drives the ASGI app in-process (no sockets) with a dummy Qwen client and
+without starting the ingest workers, so only the request path is measured:
+body decode, validation, token check, dedupe and enqueue.
+
+Each scenario runs twice: against ``baseline``, a route that keeps the
+original flow (decode to str, normalize, validate the envelope, check the
+token on the model, enqueue the re-dumped envelope), and against the
+``fast_path`` the app serves today. Both results are printed on one line.
+INFO logging is disabled while it runs so log formatting is not measured.
+
+    python -m benchmarks.bench_webhook --requests 2000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request, status
+
+from src.ai.qwen import DummyQwenClient
+from src.config import Settings
+from src.feishu.dedupe import dedupe_keys
+from src.feishu.ingest_queue import IngestQueueFull
+from src.main import _normalize_webhook_payload, create_app
+from src.schemas import FeishuWebhookEnvelope, HRExtract, OKRAlignment
+
+TOKEN = "bench-token"
+
+
+def _extract() -> HRExtract:
+    return HRExtract(
+        hr_summary="bench",
+        risks=[],
+        needs=[],
+        okr_alignment=OKRAlignment(hit_objectives=[], hit_krs=[], gaps=[], confidence=0.5),
+        next_actions=[],
+        risk_level="low",
+    )
+
+
+def _envelope(index: int, token: str = TOKEN, message_type: str = "text") -> Dict[str, Any]:
+    text = "本周周报：完成支付接口灰度，推进 KR2 自动化测试覆盖率，风险：第三方依赖不稳定。" * 4
+    return {
+        "schema": "2.0",
+        "header": {"event_id": f"e{index}", "token": token, "event_type": "im.message.receive_v1"},
+        "event": {
+            "message": {
+                "message_id": f"m{index}",
+                "message_type": message_type,
+                "content": json.dumps({"text": text}, ensure_ascii=False),
+                "create_time": str(int(datetime.now().timestamp() * 1000)),
+                "sender": {"sender_id": {"user_id": f"u{index % 50}"}, "name": "张三"},
+            }
+        },
+    }
+
+
+SCENARIOS: Dict[str, Callable[[int], Dict[str, Any]]] = {
+    "accepted": lambda i: _envelope(i),
+    "bad_token": lambda i: _envelope(i, token="wrong"),
+    "url_verification": lambda i: {"type": "url_verification", "challenge": f"c{i}", "token": TOKEN},
+    "non_report": lambda i: _envelope(i, message_type="image"),
+}
+
+
+BASELINE_PATH = "/webhook/feishu-baseline"
+VARIANTS = {"baseline": BASELINE_PATH, "fast_path": "/webhook/feishu"}
+
+
+def _mount_baseline(app: FastAPI, settings: Settings) -> None:
+    """Serve the webhook flow as it was before the fast path, for comparison."""
+    deduplicator = app.state.deduplicator
+    ingest_queue = app.state.ingest_queue
+    worker_pool = app.state.worker_pool
+
+    @app.post(BASELINE_PATH)
+    async def baseline_webhook(request: Request) -> Dict[str, Any]:
+        raw_body = await request.body()
+        try:
+            payload_data = json.loads(raw_body.decode("utf-8"))
+        except UnicodeDecodeError:
+            payload_data = json.loads(raw_body.decode("utf-8", errors="ignore"))
+        except json.JSONDecodeError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid JSON payload: {exc}",
+            ) from exc
+        payload = _normalize_webhook_payload(payload_data, settings)
+        if payload.get("type") == "url_verification" and "challenge" in payload:
+            return {"challenge": payload["challenge"]}
+
+        envelope = FeishuWebhookEnvelope.model_validate(payload)
+        if envelope.header.token != settings.feishu_bot_verification_token:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid verification token.",
+            )
+
+        keys = dedupe_keys(envelope)
+        if await deduplicator.check_and_mark(keys):
+            return {"ok": True}
+        try:
+            await ingest_queue.enqueue(envelope.model_dump(mode="json"))
+        except IngestQueueFull as exc:
+            await deduplicator.forget(keys)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)
+            ) from exc
+        worker_pool.notify()
+        return {"ok": True}
+
+
+async def _run_scenario(
+    name: str, variant: str, requests: int, workdir: Path
+) -> Dict[str, Any]:
+    prefix = f"{name}-{variant}"
+    settings = Settings(
+        feishu_bot_verification_token=TOKEN,
+        csv_path=str(workdir / f"{prefix}.csv"),
+        okr_cache_path=str(workdir / "okr.json"),
+        ingest_queue_path=str(workdir / f"{prefix}-queue.db"),
+        ingest_queue_max_depth=requests + 1,
+        dedupe_index_path=str(workdir / f"{prefix}-dedupe.db"),
+    )
+    app = create_app(settings=settings, qwen_client=DummyQwenClient(_extract()))
+    _mount_baseline(app, settings)
+    path = VARIANTS[variant]
+    bodies = [
+        json.dumps(SCENARIOS[name](i), ensure_ascii=False).encode("utf-8")
+        for i in range(requests)
+    ]
+    headers = {"Content-Type": "application/json"}
+    transport = httpx.ASGITransport(app=app)
+    statuses: Dict[int, int] = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        for body in bodies:
+            response = await client.post(path, content=body, headers=headers)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        elapsed = time.perf_counter() - started
+    app.state.ingest_queue.close()
+    app.state.deduplicator.close()
+    return {
+        "seconds": round(elapsed, 4),
+        "requests_per_sec": round(requests / elapsed, 1),
+        "statuses": statuses,
+    }
+
+
+async def _main(requests: int) -> None:
+    logging.disable(logging.INFO)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in SCENARIOS:
+                line: Dict[str, Any] = {"scenario": name, "requests": requests}
+                for variant in VARIANTS:
+                    line[variant] = await _run_scenario(name, variant, requests, Path(tmp))
+                baseline = line["baseline"]["requests_per_sec"]
+                line["speedup"] = round(line["fast_path"]["requests_per_sec"] / baseline, 2)
+                print(json.dumps(line, ensure_ascii=False), flush=True)
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Feishu webhook endpoint.")
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(_main(args.requests))
+
+
+if __name__ == "__main__":
+    main()
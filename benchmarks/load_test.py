@@ -0,0 +1,423 @@
+"""End-to-end load test: webhook -> ingest queue -> OKR -> Qwen -> storage -> card.
+
+Starts the DashScope/Feishu stand-in (``src.devtools.mock_services``) on
+127.0.0.1 and points a ``create_app()`` instance at it, with fresh CSV storage,
+ingest queue, dedupe index and OKR cache in a temporary directory. Synthetic
+``text`` and ``post`` envelopes are replayed at each rate in ``--rates``
+(reports per second) with the chosen arrival shape:
+
+* ``constant`` - evenly spaced
+* ``poisson`` - exponential gaps with the same mean
+* ``burst`` - ``--burst-size`` messages at once, same mean rate
+* ``ramp`` - rate rises linearly from 0 to the step's rate
+
+Each worker stage is timed (queue wait, OKR lookup, LLM, storage, card) along
+with the end-to-end time from webhook POST to card sent. One JSON object per
+step is printed and, with ``--output``, the whole run is written to a file so
+runs can be diffed.
+
+    python -m benchmarks.load_test --rates 1,2,4,8 --duration 30 --shape poisson \\
+        --latency lognormal:800:0.4 --ms-per-token 2 --output load.json
+
+``--set KEY=VALUE`` passes any setting through, e.g.
+``--set QWEN_AIMD_MAX_CONCURRENCY=16`` or ``--set QWEN_COMPACT_OUTPUT=true``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import tempfile
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from src.ai.qwen import build_qwen_client
+from src.config import Settings
+from src.devtools.dataset import (
+    DatasetConfig,
+    pick_level,
+    report_text,
+    user_id,
+    user_name,
+    write_okr_cache,
+)
+from src.devtools.mock_services import LatencyModel, MockConfig, start_mock_server
+from src.feishu.api_client import FeishuAPIClient
+from src.main import create_app
+from src.okr.source import build_okr_source
+from src.schemas import ReportIn, StoredReport
+from src.storage import build_storage
+
+TOKEN = "load-token"
+STAGES = ("queue", "okr", "llm", "storage", "card")
+SHAPES = ("constant", "poisson", "burst", "ramp")
+
+
+def arrival_offsets(
+    shape: str, rate: float, duration: float, rng: random.Random, burst_size: int = 10
+) -> List[float]:
+    """Send times in seconds from the start of a step."""
+    total = max(1, int(rate * duration))
+    if shape == "poisson":
+        offsets, now = [], 0.0
+        while len(offsets) < total:
+            now += rng.expovariate(rate)
+            offsets.append(now)
+        return offsets
+    if shape == "burst":
+        gap = burst_size / rate
+        return [(index // burst_size) * gap for index in range(total)]
+    if shape == "ramp":
+        # Arrivals up to t are rate * t^2 / (2 * duration); the mean rate halves.
+        return [(2 * duration * index / rate) ** 0.5 for index in range(total // 2 or 1)]
+    return [index / rate for index in range(total)]
+
+
+def synthetic_envelope(
+    index: int, rng: random.Random, users: int, post_share: float, create_ms: int
+) -> Dict[str, Any]:
+    period_type = "weekly" if rng.random() < 0.3 else "daily"
+    kr = rng.randint(1, 9) if rng.random() < 0.8 else None
+    lines = report_text(rng, period_type, pick_level(rng), kr).split("\n")
+    if rng.random() < post_share:
+        message_type = "post"
+        content: Dict[str, Any] = {
+            "title": lines[0],
+            "content": [[{"tag": "text", "text": line}] for line in lines[1:]],
+        }
+    else:
+        message_type = "text"
+        content = {"text": "\n".join(lines)}
+    user = index % max(1, users)
+    return {
+        "schema": "2.0",
+        "header": {
+            "event_id": f"load-e{index}",
+            "token": TOKEN,
+            "event_type": "im.message.receive_v1",
+        },
+        "event": {
+            "message": {
+                "message_id": f"load-m{index}",
+                "message_type": message_type,
+                "content": json.dumps(content, ensure_ascii=False),
+                "create_time": str(create_ms),
+                "sender": {"sender_id": {"open_id": user_id(user)}, "name": user_name(user)},
+            }
+        },
+    }
+
+
+@dataclass
+class _Trace:
+    started: float
+    stages: Dict[str, float] = field(default_factory=dict)
+    key: Optional[Tuple[str, int]] = None
+
+
+# The ingest workers run each job start to finish in one task, so a trace set
+# at the OKR lookup is still current when the card goes out.
+_trace: ContextVar[Optional[_Trace]] = ContextVar("load_test_trace", default=None)
+
+
+def _report_key(report: ReportIn) -> Tuple[str, int]:
+    return report.user_id, round(report.message_ts.timestamp() * 1000)
+
+
+class StageRecorder:
+    def __init__(self) -> None:
+        self.samples: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+        self.end_to_end: List[float] = []
+        self.accepted_at: Dict[Tuple[str, int], float] = {}
+        self.sent_at: Dict[Tuple[str, int], float] = {}
+        self.completed = 0
+        self.last_completed = 0.0
+
+    def add(self, stage: str, seconds: float) -> None:
+        trace = _trace.get()
+        if trace is not None:
+            trace.stages[stage] = trace.stages.get(stage, 0.0) + seconds
+
+    def finish(self) -> None:
+        trace = _trace.get()
+        _trace.set(None)
+        if trace is None or trace.key not in self.sent_at:
+            return
+        now = time.perf_counter()
+        for stage, seconds in trace.stages.items():
+            self.samples[stage].append(seconds)
+        accepted = self.accepted_at.get(trace.key)
+        if accepted is not None:
+            self.samples["queue"].append(max(0.0, trace.started - accepted))
+        self.end_to_end.append(now - self.sent_at[trace.key])
+        self.completed += 1
+        self.last_completed = now
+
+
+class _TimedOKRSource:
+    def __init__(self, inner: Any, recorder: StageRecorder) -> None:
+        self.inner = inner
+        self.recorder = recorder
+
+    async def get_okr_brief(self, user_id: str, period_start: date, period_end: date) -> str:
+        started = time.perf_counter()
+        _trace.set(_Trace(started))
+        try:
+            return await self.inner.get_okr_brief(user_id, period_start, period_end)
+        finally:
+            self.recorder.add("okr", time.perf_counter() - started)
+
+
+class _Timed:
+    """Delegating proxy that times one coroutine method as ``stage``."""
+
+    def __init__(self, inner: Any, recorder: StageRecorder, method: str, stage: str) -> None:
+        self._inner = inner
+        self._recorder = recorder
+        self._method = method
+        self._stage = stage
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._inner, name)
+        if name != self._method:
+            return attr
+
+        async def timed(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return await attr(*args, **kwargs)
+            finally:
+                self._recorder.add(self._stage, time.perf_counter() - started)
+                self._after(args)
+
+        return timed
+
+    def _after(self, args: Tuple[Any, ...]) -> None:
+        pass
+
+
+class _TimedStorage(_Timed):
+    def _after(self, args: Tuple[Any, ...]) -> None:
+        trace = _trace.get()
+        if trace is not None and args and isinstance(args[0], StoredReport):
+            trace.key = _report_key(args[0].report)
+
+
+class _TimedFeishu(_Timed):
+    def _after(self, args: Tuple[Any, ...]) -> None:
+        self._recorder.finish()
+
+
+def _percentiles(values: List[float]) -> Dict[str, Any]:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def at(quantile: float) -> float:
+        return round(ordered[int(quantile * (len(ordered) - 1))] * 1000, 1)
+
+    return {
+        "count": len(ordered),
+        "p50_ms": at(0.50),
+        "p95_ms": at(0.95),
+        "p99_ms": at(0.99),
+        "max_ms": round(ordered[-1] * 1000, 1),
+    }
+
+
+def _settings(workdir: Path, base_url: str, overrides: Dict[str, str]) -> Settings:
+    values: Dict[str, Any] = {
+        "FEISHU_BOT_VERIFICATION_TOKEN": TOKEN,
+        "FEISHU_APP_ID": "mock",
+        "FEISHU_APP_SECRET": "mock",
+        "FEISHU_DEFAULT_CHAT_ID": "oc_mock",
+        "DASHSCOPE_API_KEY": "mock",
+        "DASHSCOPE_BASE_URL": base_url,
+        "FEISHU_BASE_URL": base_url,
+        "STORAGE_DRIVER": "csv",
+        "CSV_PATH": str(workdir / "reports.csv"),
+        "OKR_SOURCE": "cache",
+        "OKR_CACHE_PATH": str(workdir / "okr_cache.json"),
+        "LLM_CACHE_PATH": str(workdir / "llm_cache.db"),
+        "RETRANSLATE_BACKLOG_PATH": str(workdir / "backlog.jsonl"),
+        "INGEST_QUEUE_PATH": str(workdir / "queue.db"),
+        "INGEST_QUEUE_MAX_DEPTH": 100_000,
+        "DEDUPE_INDEX_PATH": str(workdir / "dedupe.db"),
+        "AUTO_SYNC_ENABLED": False,
+        "HTTP_TRUST_ENV": False,
+    }
+    values.update(overrides)
+    return Settings(**values)
+
+
+async def _wait_for_drain(app: Any, accepted: int, timeout: float) -> bool:
+    pool = app.state.worker_pool
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        metrics = pool.metrics()
+        if metrics["processed"] + metrics["failed"] >= accepted:
+            return True
+        await asyncio.sleep(0.05)
+    return False
+
+
+async def _run_step(
+    rate: float, args: argparse.Namespace, base_url: str, workdir: Path
+) -> Dict[str, Any]:
+    settings = _settings(workdir, base_url, args.overrides)
+    # Objectives for this month, so every lookup finds the sender's OKRs.
+    okrs = DatasetConfig(users=args.users, days=1, seed=args.seed)
+    write_okr_cache(Path(settings.okr_cache_path), okrs)
+    recorder = StageRecorder()
+    feishu = FeishuAPIClient(
+        app_id=settings.feishu_app_id,
+        app_secret=settings.feishu_app_secret,
+        default_chat_id=settings.feishu_default_chat_id,
+        timeout=settings.request_timeout,
+        base_url=settings.feishu_base_url,
+    )
+    app = create_app(
+        settings=settings,
+        storage=_TimedStorage(build_storage(settings), recorder, "save", "storage"),
+        qwen_client=_Timed(build_qwen_client(settings), recorder, "generate_hr_extract", "llm"),
+        okr_source=_TimedOKRSource(build_okr_source(settings), recorder),
+        feishu_client=_TimedFeishu(feishu, recorder, "send_card", "card"),
+    )
+    rng = random.Random(f"{args.seed}:{rate}")
+    offsets = arrival_offsets(args.shape, rate, args.duration, rng, args.burst_size)
+    base_ms = int(time.time() * 1000)
+    bodies = []
+    for index, _ in enumerate(offsets):
+        # Distinct create_time per message: it is how a card is matched to its POST.
+        envelope = synthetic_envelope(index, rng, args.users, args.post_share, base_ms + index)
+        message = envelope["event"]["message"]
+        key = (message["sender"]["sender_id"]["open_id"], base_ms + index)
+        bodies.append((key, json.dumps(envelope, ensure_ascii=False).encode("utf-8")))
+
+    statuses: Dict[int, int] = {}
+    ingest: List[float] = []
+    headers = {"Content-Type": "application/json"}
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+
+            async def send(key: Tuple[str, int], body: bytes) -> None:
+                sent = time.perf_counter()
+                recorder.sent_at[key] = sent
+                response = await client.post("/webhook/feishu", content=body, headers=headers)
+                accepted = time.perf_counter()
+                recorder.accepted_at[key] = accepted
+                ingest.append(accepted - sent)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+            started = time.perf_counter()
+            tasks = []
+            for offset, (key, body) in zip(offsets, bodies):
+                delay = started + offset - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                tasks.append(asyncio.create_task(send(key, body)))
+            await asyncio.gather(*tasks)
+            send_window = time.perf_counter() - started
+            backlog_at_end = statuses.get(200, 0) - recorder.completed
+            drained = await _wait_for_drain(app, statuses.get(200, 0), args.drain_timeout)
+        pool = app.state.worker_pool.metrics()
+    elapsed = max(recorder.last_completed, started + send_window) - started
+    return {
+        "rate_per_sec": rate,
+        "shape": args.shape,
+        "sent": len(bodies),
+        "statuses": statuses,
+        "completed": recorder.completed,
+        "failed": pool["failed"],
+        "drained": drained,
+        "send_window_s": round(send_window, 2),
+        "elapsed_s": round(elapsed, 2),
+        "offered_per_min": round(len(bodies) / send_window * 60, 1) if send_window else None,
+        "throughput_per_min": round(recorder.completed / elapsed * 60, 1) if elapsed else None,
+        "backlog_at_end_of_send": backlog_at_end,
+        "worker_utilisation_avg": pool["utilisation_avg"],
+        "end_to_end": _percentiles(recorder.end_to_end),
+        "stages": {
+            "ingest": _percentiles(ingest),
+            **{stage: _percentiles(recorder.samples[stage]) for stage in STAGES},
+        },
+    }
+
+
+async def _main(args: argparse.Namespace) -> Dict[str, Any]:
+    mock = MockConfig(
+        latency=LatencyModel.parse(args.latency),
+        ms_per_token=args.ms_per_token,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        feishu_latency=LatencyModel.parse(args.feishu_latency),
+        users=args.users,
+        seed=args.seed,
+    )
+    server, base_url = start_mock_server(mock)
+    steps = []
+    try:
+        for rate in args.rates:
+            with tempfile.TemporaryDirectory() as tmp:
+                step = await _run_step(rate, args, base_url, Path(tmp))
+            print(json.dumps(step, ensure_ascii=False), flush=True)
+            steps.append(step)
+    finally:
+        server.should_exit = True
+    return {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "steps": steps,
+    }
+
+
+def _parse_overrides(pairs: List[str]) -> Dict[str, str]:
+    overrides = {}
+    for pair in pairs:
+        key, sep, value = pair.partition("=")
+        if not sep:
+            raise SystemExit(f"--set expects KEY=VALUE, got {pair!r}")
+        overrides[key.strip()] = value.strip()
+    return overrides
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the ingest pipeline end to end.")
+    parser.add_argument("--rates", default="1,2,4", help="comma-separated reports/sec, one step each")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of sending per step")
+    parser.add_argument("--shape", choices=SHAPES, default="poisson")
+    parser.add_argument("--burst-size", type=int, default=10)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--post-share", type=float, default=0.3, help="share of rich-text posts")
+    parser.add_argument("--latency", default="lognormal:800:0.4", help="Qwen time to first byte (ms)")
+    parser.add_argument("--ms-per-token", type=float, default=2.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--feishu-latency", default="fixed:30")
+    parser.add_argument("--drain-timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="KEY=VALUE")
+    parser.add_argument("--output", help="write the full run as JSON here")
+    args = parser.parse_args()
+    args.rates = [float(rate) for rate in args.rates.split(",") if rate.strip()]
+    args.overrides = _parse_overrides(args.overrides)
+    logging.disable(logging.WARNING)  # keep stdout to the JSON result lines
+    result = asyncio.run(_main(args))
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
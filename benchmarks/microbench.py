@@ -0,0 +1,335 @@
+"""Microbenchmarks for the CPU hot paths, with a checked-in baseline.
+
+Every benchmark runs once per report on synthetic data at each scale (1k, 100k
+and 1M reports by default) and reports nanoseconds per report. Data comes from
+``src.devtools.dataset``. Inputs are drawn from a pool of up to 10k distinct
+reports; the OKR cache (one user per 20 reports) and the CSV store (one row per
+report) are built at full size, since their cost grows with the data. Each
+``report_stats.*`` benchmark is one ``ReportStatsService`` call over that store,
+which re-reads the whole CSV, so it too is reported per stored report.
+
+    python -m benchmarks.microbench                       # compare to baseline
+    python -m benchmarks.microbench --scales 1k --only detect_period,parse_extract
+    python -m benchmarks.microbench --update-baseline     # after an intended change
+
+Results are compared to ``benchmarks/baseline.json``; anything slower than
+``--threshold`` times its baseline is flagged and the command exits non-zero.
+The baseline is only meaningful on the machine that recorded it, so re-record
+it before comparing on new hardware.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import random
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from backend.services.report_stats import ReportStatsService
+from benchmarks.load_test import synthetic_envelope
+from src.ai.qwen import QwenClient
+from src.config import Settings
+from src.devtools.dataset import (
+    PROJECTS,
+    DatasetConfig,
+    generate_reports,
+    user_id,
+    write_okr_cache,
+    write_reports_csv,
+)
+from src.devtools.mock_services import mock_extract
+from src.feishu.cards import build_summary_card
+from src.feishu.webhook import FeishuWebhookHandler
+from src.main import _normalize_webhook_payload
+from src.okr.source import CacheOKRSource
+from src.schemas import FeishuWebhookEnvelope, StoredReport
+from src.storage.csv_store import CSVStorage
+from src.utils.period import detect_period
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+POOL_SIZE = 10_000
+REPORTS_PER_USER = 20
+
+
+@dataclass
+class Dataset:
+    reports: int
+    users: int
+    texts: List[str]
+    envelopes: List[Dict[str, Any]]
+    demo_payloads: List[Dict[str, Any]]
+    raw_outputs: List[str]
+    outputs: List[Dict[str, Any]]
+    records: List[StoredReport]
+    csv_rows: List[Dict[str, str]]
+    workdir: Path
+    start: date
+
+
+def build_dataset(reports: int, workdir: Path, seed: int = 7) -> Dataset:
+    # One month of history, so the OKR cache holds a single month per user.
+    config = DatasetConfig(
+        reports=reports,
+        users=max(1, reports // REPORTS_PER_USER),
+        objectives=2,
+        days=31,
+        end=date(2024, 5, 31),
+        seed=seed,
+    )
+    rng = random.Random(seed)
+    # Only the handler's stateless parsing helpers are used, so skip __init__.
+    handler = FeishuWebhookHandler.__new__(FeishuWebhookHandler)
+    base_ms = int(datetime(2024, 5, 6, 9).timestamp() * 1000)
+    pool = min(reports, POOL_SIZE)
+    envelopes, texts, demo_payloads = [], [], []
+    for index in range(pool):
+        envelope = synthetic_envelope(index, rng, config.users, 0.3, base_ms + index * 60_000)
+        message = envelope["event"]["message"]
+        text = handler._extract_text(message["message_type"], message["content"])
+        envelopes.append(envelope)
+        texts.append(text)
+        sender = message["sender"]
+        demo_payloads.append(
+            {"user_id": sender["sender_id"]["open_id"], "user_name": sender["name"], "text": text}
+        )
+    raw_outputs = [json.dumps(mock_extract(text), ensure_ascii=False) for text in texts]
+    records = list(islice(generate_reports(config), pool))
+    write_okr_cache(workdir / "okr_cache.json", config)
+    write_reports_csv(workdir / "reports.csv", config)
+    return Dataset(
+        reports=reports,
+        users=config.users,
+        texts=texts,
+        envelopes=envelopes,
+        demo_payloads=demo_payloads,
+        raw_outputs=raw_outputs,
+        outputs=[json.loads(raw) for raw in raw_outputs],
+        records=records,
+        csv_rows=[{key: str(value) for key, value in r.to_csv_row().items()} for r in records],
+        workdir=workdir,
+        start=config.start,
+    )
+
+
+def _loop(fn: Callable[[Any], Any], items: List[Any], ops: int) -> int:
+    pool = len(items)
+    started = time.perf_counter_ns()
+    for index in range(ops):
+        fn(items[index % pool])
+    return time.perf_counter_ns() - started
+
+
+BENCHMARKS: Dict[str, Callable[[Dataset], int]] = {}
+
+
+def bench(name: str) -> Callable[[Callable[[Dataset], int]], Callable[[Dataset], int]]:
+    def register(fn: Callable[[Dataset], int]) -> Callable[[Dataset], int]:
+        BENCHMARKS[name] = fn
+        return fn
+
+    return register
+
+
+@bench("detect_period")
+def _detect_period(data: Dataset) -> int:
+    reference = date(2024, 5, 8)
+    return _loop(lambda text: detect_period(text, reference), data.texts, data.reports)
+
+
+@bench("normalize_webhook_payload")
+def _normalize_payload(data: Dataset) -> int:
+    settings = Settings(FEISHU_BOT_VERIFICATION_TOKEN="bench")
+    return _loop(
+        lambda payload: _normalize_webhook_payload(payload, settings),
+        data.demo_payloads,
+        data.reports,
+    )
+
+
+@bench("envelope_model_validate")
+def _envelope_validate(data: Dataset) -> int:
+    return _loop(FeishuWebhookEnvelope.model_validate, data.envelopes, data.reports)
+
+
+@bench("sanitize_extract_payload")
+def _sanitize(data: Dataset) -> int:
+    qwen = QwenClient(api_key="bench", model="qwen-max")
+    return _loop(qwen._sanitize_extract_payload, data.outputs, data.reports)
+
+
+@bench("parse_extract")
+def _parse_extract(data: Dataset) -> int:
+    qwen = QwenClient(api_key="bench", model="qwen-max")
+    return _loop(qwen._parse_extract, data.raw_outputs, data.reports)
+
+
+@bench("stored_report_to_csv_row")
+def _to_csv_row(data: Dataset) -> int:
+    return _loop(StoredReport.to_csv_row, data.records, data.reports)
+
+
+@bench("stored_report_from_csv_row")
+def _from_csv_row(data: Dataset) -> int:
+    return _loop(StoredReport.from_csv_row, data.csv_rows, data.reports)
+
+
+@bench("build_summary_card")
+def _summary_card(data: Dataset) -> int:
+    return _loop(
+        lambda record: build_summary_card(record.report, record.hr_extract),
+        data.records,
+        data.reports,
+    )
+
+
+@bench("okr_brief_lookup")
+def _okr_brief(data: Dataset) -> int:
+    source = CacheOKRSource(str(data.workdir / "okr_cache.json"))
+    start, end = date(2024, 5, 6), date(2024, 5, 12)
+    users = [user_id(index) for index in range(min(data.users, POOL_SIZE))]
+
+    async def run() -> int:
+        # Loading the cache is a one-off per process; time the lookups only.
+        await source.get_okr_brief(users[0], start, end)
+        pool = len(users)
+        started = time.perf_counter_ns()
+        for index in range(data.reports):
+            await source.get_okr_brief(users[index % pool], start, end)
+        return time.perf_counter_ns() - started
+
+    return asyncio.run(run())
+
+
+@bench("csv_latest_index")
+def _csv_latest_index(data: Dataset) -> int:
+    # Per report in the store: the first latest_for_user() call reads it all.
+    storage = CSVStorage(str(data.workdir / "reports.csv"))
+    started = time.perf_counter_ns()
+    storage._latest_for_user(user_id(0))
+    return time.perf_counter_ns() - started
+
+
+def _stats_window(data: Dataset) -> int:
+    # The service counts back from today; reach the first synthetic report.
+    return (date.today() - data.start).days + 1
+
+
+_REPORT_STATS_CALLS: Dict[str, Callable[[ReportStatsService, Dataset], Any]] = {
+    "get_dashboard_stats": lambda service, data: service.get_dashboard_stats(),
+    "get_recent_reports": lambda service, data: service.get_recent_reports(10),
+    "get_risk_distribution": lambda service, data: service.get_risk_distribution(),
+    "get_okr_trend_data": lambda service, data: service.get_okr_trend_data(_stats_window(data)),
+    "get_report_timeline_data": lambda service, data: service.get_report_timeline_data(
+        _stats_window(data)
+    ),
+    "get_reports_list": lambda service, data: service.get_reports_list(
+        risk_level="high", search=PROJECTS[0]
+    ),
+    "get_user_submission_stats": lambda service, data: service.get_user_submission_stats(
+        _stats_window(data)
+    ),
+    "get_risk_trend_data": lambda service, data: service.get_risk_trend_data(_stats_window(data)),
+    "get_okr_achievement_ranking": lambda service, data: service.get_okr_achievement_ranking(
+        _stats_window(data)
+    ),
+    "get_team_statistics": lambda service, data: service.get_team_statistics(),
+    "get_report_by_id": lambda service, data: service.get_report_by_id(10_000 + data.reports // 2),
+}
+
+
+def _report_stats_bench(call: Callable[[ReportStatsService, Dataset], Any]) -> Callable[[Dataset], int]:
+    def run(data: Dataset) -> int:
+        service = ReportStatsService(str(data.workdir / "reports.csv"))
+        started = time.perf_counter_ns()
+        call(service, data)
+        return time.perf_counter_ns() - started
+
+    return run
+
+
+for _method, _call in _REPORT_STATS_CALLS.items():
+    bench(f"report_stats.{_method}")(_report_stats_bench(_call))
+
+
+def _load_baseline() -> Dict[str, Any]:
+    if not BASELINE_PATH.exists():
+        return {"results": {}}
+    return json.loads(BASELINE_PATH.read_text(encoding="utf-8"))
+
+
+def run(
+    scales: List[str], names: List[str], repeat: int, threshold: float
+) -> Tuple[Dict[str, Dict[str, float]], int]:
+    baseline = _load_baseline()["results"]
+    results: Dict[str, Dict[str, float]] = {}
+    regressions = 0
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            data = build_dataset(SCALES[scale], Path(tmp))
+            for name in names:
+                # Best of ``repeat`` at small scales, where one run is noisy;
+                # the large ones are long enough to be stable on their own.
+                runs = repeat if data.reports < 100_000 else 1
+                elapsed = min(BENCHMARKS[name](data) for _ in range(runs))
+                ns_per_op = round(elapsed / data.reports, 1)
+                results.setdefault(name, {})[scale] = ns_per_op
+                line: Dict[str, Any] = {"bench": name, "scale": scale, "ns_per_op": ns_per_op}
+                reference = baseline.get(name, {}).get(scale)
+                if reference:
+                    line["baseline_ns_per_op"] = reference
+                    line["ratio"] = round(ns_per_op / reference, 3)
+                    line["regression"] = ns_per_op > reference * threshold
+                    regressions += line["regression"]
+                print(json.dumps(line), flush=True)
+    print(json.dumps({"regressions": regressions, "threshold": threshold}))
+    return results, regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Microbenchmarks for CPU hot paths.")
+    parser.add_argument("--scales", default=",".join(SCALES), help="comma-separated: 1k,100k,1m")
+    parser.add_argument("--only", help="comma-separated benchmark names")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark below 100k")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown flagged as a regression")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--list", action="store_true", help="list benchmark names and exit")
+    args = parser.parse_args()
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return
+    scales = [scale.strip().lower() for scale in args.scales.split(",") if scale.strip()]
+    names = [name.strip() for name in args.only.split(",")] if args.only else list(BENCHMARKS)
+    unknown = [value for value in scales if value not in SCALES] + [
+        value for value in names if value not in BENCHMARKS
+    ]
+    if unknown:
+        parser.error(f"unknown scale or benchmark: {', '.join(unknown)}")
+    logging.disable(logging.WARNING)  # keep stdout to the JSON result lines
+    results, regressions = run(scales, names, max(1, args.repeat), args.threshold)
+    if args.update_baseline:
+        baseline = _load_baseline()
+        for name, by_scale in results.items():
+            baseline["results"].setdefault(name, {}).update(by_scale)
+        baseline["recorded_on"] = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "processor": platform.processor() or platform.machine(),
+            "date": date.today().isoformat(),
+        }
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    elif regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
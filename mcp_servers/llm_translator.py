@@ -17,8 +17,19 @@ from typing import Any, Dict, List, Optional
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import httpx
+
+from src.ai.breaker import BreakerConfig
 from src.ai.qwen import QwenClient
+from src.ai.ratelimit import RateLimitConfig
+from src.config import get_settings
 from src.schemas import HRExtract, OKRAlignment, ReportIn
+from src.utils.http import (
+    close_shared_client,
+    get_shared_client,
+    http_pool_stats,
+    open_shared_client,
+)
 
 
 class LLMTranslatorServer:
@@ -42,6 +53,7 @@ class LLMTranslatorServer:
         model: str = "qwen-plus",
         api_mode: str = "text",
         timeout: float = 30.0,
+        http_client: Optional[httpx.AsyncClient] = None,
     ):
         """
         Initialize LLM Translator Server.
@@ -51,25 +63,42 @@ class LLMTranslatorServer:
             model: Model name (qwen-plus, qwen-max, qwen-turbo)
             api_mode: API mode (text or compatible)
             timeout: Request timeout in seconds
+            http_client: Optional pooled client; defaults to the shared DashScope pool
         """
         self.api_key = api_key
         self.model = model
         self.api_mode = api_mode
         self.timeout = timeout
+        self._http_client = http_client
+        self._owns_pool = False
         self._client: Optional[QwenClient] = None
 
-    def _get_client(self) -> QwenClient:
-        """Lazy initialization of Qwen client."""
+    async def _get_client(self) -> QwenClient:
+        """Lazy initialization of Qwen client on the shared connection pool."""
         if self._client is None:
+            http_client = self._http_client or get_shared_client()
+            if http_client is None:
+                http_client = await open_shared_client(get_settings())
+                self._owns_pool = True
             self._client = QwenClient(
                 api_key=self.api_key,
                 model=self.model,
                 timeout=self.timeout,
                 api_mode=self.api_mode,
                 trust_env=False,
+                http_client=http_client,
+                rate_limits=RateLimitConfig.from_settings(get_settings()),
+                breaker=BreakerConfig.from_settings(get_settings()),
             )
         return self._client
 
+    async def aclose(self) -> None:
+        """Release the connection pool if this server opened it."""
+        self._client = None
+        if self._owns_pool:
+            await close_shared_client()
+            self._owns_pool = False
+
     # ==================== MCP Tools ====================
 
     async def translate_to_hr_language(
@@ -131,7 +160,7 @@ class LLMTranslatorServer:
         )
 
         # Generate HR extract
-        client = self._get_client()
+        client = await self._get_client()
         hr_extract = await client.generate_hr_extract(
             report=report,
             okr_brief=okr_context or "暂无 OKR 信息",
@@ -343,6 +372,15 @@ class LLMTranslatorServer:
             "target_audience": "Non-technical HR/HRBP",
         }
 
+    def get_connection_stats(self) -> Dict[str, Any]:
+        """
+        Get DashScope connection pool statistics.
+
+        Returns:
+            {"open": True, "requests": 12, "new_connections": 1, "reuse_ratio": 0.917, ...}
+        """
+        return http_pool_stats()
+
     def get_translation_glossary(self) -> Dict[str, str]:
         """
         Get technical terms → plain language glossary.
@@ -442,6 +480,8 @@ async def _test_translation():
 
     print(f"📊 风险等级: {result['risk_level']}")
     print(f"🔍 OKR 对齐置信度: {result['okr_alignment']['confidence']:.0%}")
+    print(f"🔌 连接复用: {server.get_connection_stats()}")
+    await server.aclose()
 
 
 if __name__ == "__main__":
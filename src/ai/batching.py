@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from typing import Iterable, List, Tuple
+
+
+def pack_by_tokens(
+    costs: Iterable[Tuple[int, int]], budget: int, max_items: int
+) -> List[List[int]]:
+    """Greedily group ``(index, estimated_tokens)`` pairs into batches.
+
+    Order is preserved; a batch closes when the next item would exceed
+    ``budget`` tokens or ``max_items`` entries. An item larger than the budget
+    ends up alone in its own batch.
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    used = 0
+    for index, cost in costs:
+        if current and (used + cost > budget or len(current) >= max_items):
+            batches.append(current)
+            current, used = [], 0
+        current.append(index)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
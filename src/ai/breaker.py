@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Literal, Optional
+
+from ..config import Settings
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BreakerState = Literal["closed", "open", "half_open"]
+
+
+@dataclass(frozen=True)
+class BreakerConfig:
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+    probe_timeout: float = 90.0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> Optional["BreakerConfig"]:
+        if settings.qwen_breaker_failure_threshold <= 0:
+            return None
+        return cls(
+            failure_threshold=settings.qwen_breaker_failure_threshold,
+            reset_timeout=settings.qwen_breaker_reset_seconds,
+            # No call, the probe included, outlives the per-request deadline.
+            probe_timeout=settings.qwen_deadline_seconds,
+        )
+
+
+class CircuitBreaker:
+    """Closed -> open after N consecutive failures; one probe when half-open.
+
+    A probe that never reports back (cancelled, or lost) is given up after
+    ``probe_timeout`` seconds so the breaker can probe again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        probe_timeout: float = 90.0,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.probe_timeout = probe_timeout
+        self.state: BreakerState = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self._short_circuited = 0
+        self._trips = 0
+
+    def allow_request(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                self._short_circuited += 1
+                return False
+            self._transition("half_open")
+        now = time.monotonic()
+        if self._probe_in_flight and now - self._probe_started < self.probe_timeout:
+            self._short_circuited += 1
+            return False
+        self._probe_in_flight = True
+        self._probe_started = now
+        return True
+
+    def release_probe(self) -> None:
+        """Give up the half-open probe without an outcome, e.g. when it was cancelled."""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._probe_in_flight = False
+        if self.state != "closed":
+            self._transition("closed")
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        was_probe = self._probe_in_flight
+        self._probe_in_flight = False
+        if was_probe or self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            if self.state != "open":
+                self._trips += 1
+                self._transition("open")
+
+    def _transition(self, state: BreakerState) -> None:
+        logger.warning(
+            "qwen_breaker_state",
+            extra={"breaker": self.name, "from": self.state, "to": state},
+        )
+        self.state = state
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "trips": self._trips,
+            "short_circuited": self._short_circuited,
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(name: str, config: BreakerConfig) -> CircuitBreaker:
+    """Process-wide breaker per model, shared by every QwenClient."""
+    key = name.lower()
+    breaker = _breakers.get(key)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            name,
+            failure_threshold=config.failure_threshold,
+            reset_timeout=config.reset_timeout,
+            probe_timeout=config.probe_timeout,
+        )
+        _breakers[key] = breaker
+    return breaker
+
+
+def breaker_metrics() -> Dict[str, Any]:
+    return {name: breaker.metrics() for name, breaker in list(_breakers.items())}
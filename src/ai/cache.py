@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ..config import Settings
+from ..schemas import HRExtract
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS extractions (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_extractions_last_access ON extractions (last_access);
+"""
+
+
+class ExtractionCache:
+    """Content-addressed SQLite cache of validated :class:`HRExtract` results.
+
+    Entries expire after ``ttl_seconds``; once the stored payloads exceed
+    ``max_bytes`` the least recently read entries are evicted.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float = 7 * 86400.0,
+        max_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max(1, max_bytes)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model: str, api_mode: str, system_prompt: str, user_prompt: str) -> str:
+        material = json.dumps(
+            [model, api_mode, system_prompt, user_prompt], ensure_ascii=False
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        conn.execute("DELETE FROM extractions WHERE created_at <= ?", (self._cutoff(),))
+        conn.commit()
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM extractions").fetchone()
+        self._total_bytes = int(total)
+        self._conn = conn
+        return conn
+
+    def _cutoff(self) -> float:
+        return time.time() - self.ttl_seconds
+
+    async def get(self, key: str) -> Optional[HRExtract]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def put(self, key: str, extract: HRExtract) -> None:
+        await asyncio.to_thread(self._put, key, extract)
+
+    def _get(self, key: str) -> Optional[HRExtract]:
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT payload, created_at FROM extractions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= self._cutoff():
+                self.misses += 1
+                return None
+            conn.execute(
+                "UPDATE extractions SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            conn.commit()
+            self.hits += 1
+        return HRExtract.model_validate_json(row[0])
+
+    def _put(self, key: str, extract: HRExtract) -> None:
+        payload = extract.model_dump_json()
+        size = len(payload.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            previous = conn.execute(
+                "SELECT size FROM extractions WHERE key = ?", (key,)
+            ).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO extractions (key, payload, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, size, now, now),
+            )
+            self._total_bytes += size - (int(previous[0]) if previous else 0)
+            self.writes += 1
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        if self._total_bytes <= self.max_bytes:
+            return
+        conn.execute("DELETE FROM extractions WHERE created_at <= ?", (self._cutoff(),))
+        rows = conn.execute(
+            "SELECT key, size FROM extractions ORDER BY last_access"
+        ).fetchall()
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM extractions").fetchone()
+        self._total_bytes = int(total)
+        for key, size in rows:
+            if self._total_bytes <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM extractions WHERE key = ?", (key,))
+            self._total_bytes -= int(size)
+            self.evictions += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def build_extraction_cache(settings: Settings) -> Optional[ExtractionCache]:
+    if not settings.llm_cache_path:
+        return None
+    return ExtractionCache(
+        settings.llm_cache_path,
+        ttl_seconds=settings.llm_cache_ttl_seconds,
+        max_bytes=settings.llm_cache_max_bytes,
+    )
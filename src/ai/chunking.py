@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from ..config import Settings
+from ..schemas import HRExtract, NeedItem, OKRAlignment, RiskItem
+from .batching import pack_by_tokens
+from .tokens import estimate_tokens
+
+# Lines that open a new section in reports pasted from docs.
+_SECTION_RE = re.compile(
+    r"^\s*(【[^】]+】|#{1,6}\s|[一二三四五六七八九十]+[、.．]|第[一二三四五六七八九十\d]+[部分章节周]|\d+[、.．]\s*\S)"
+)
+_KEY_RE = re.compile(r"[\s\W_]+", re.UNICODE)
+_LEVELS = {"low": 0, "medium": 1, "high": 2}
+MAX_SUMMARY_CHARS = 200
+MAX_NEXT_ACTIONS = 8
+
+REDUCE_SYSTEM_PROMPT = "你是资深人力视角的解读助手。严格输出JSON。"
+
+REDUCE_PROMPT_TEMPLATE = """
+以下是同一份{{ period_type }}报告各部分的通俗总结：
+{% for summary in summaries %}{{ loop.index }}. {{ summary }}
+{% endfor %}
+请合并为一段不超过200字的通俗总结，突出价值、风险和下一步，不要逐条罗列。
+请输出 JSON：{"hr_summary": ""}
+""".strip()
+
+
+@dataclass(frozen=True)
+class ChunkConfig:
+    """Split reports whose text exceeds ``threshold_tokens`` into ~``chunk_tokens`` pieces."""
+
+    chunk_tokens: int = 2500
+    threshold_tokens: int = 4000
+    max_chunks: int = 12
+    reduce_summary: bool = True
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> Optional["ChunkConfig"]:
+        if settings.qwen_chunk_tokens <= 0:
+            return None
+        return cls(
+            chunk_tokens=settings.qwen_chunk_tokens,
+            threshold_tokens=max(settings.qwen_chunk_threshold_tokens, settings.qwen_chunk_tokens),
+            max_chunks=max(2, settings.qwen_chunk_max_chunks),
+            reduce_summary=settings.qwen_chunk_reduce_summary,
+        )
+
+    def applies_to(self, raw_text: str) -> bool:
+        return estimate_tokens(raw_text) > self.threshold_tokens
+
+
+def _split_long(piece: str, max_tokens: int) -> List[str]:
+    """Break an oversized section at paragraphs, then lines, then characters."""
+    if estimate_tokens(piece) <= max_tokens:
+        return [piece]
+    for separator in ("\n\n", "\n"):
+        parts = [part for part in piece.split(separator) if part.strip()]
+        if len(parts) > 1:
+            return [chunk for part in parts for chunk in _split_long(part, max_tokens)]
+    # A single huge line: cut by characters (≥1 char per token, so this fits).
+    return [piece[start : start + max_tokens] for start in range(0, len(piece), max_tokens)]
+
+
+def _sections(text: str) -> List[str]:
+    sections: List[str] = []
+    current: List[str] = []
+    for line in text.splitlines():
+        if current and _SECTION_RE.match(line):
+            sections.append("\n".join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append("\n".join(current))
+    return [section for section in sections if section.strip()]
+
+
+def _pack(sections: Sequence[str], max_tokens: int) -> List[str]:
+    pieces = [chunk for section in sections for chunk in _split_long(section, max_tokens)]
+    costs = [(index, estimate_tokens(piece) + 1) for index, piece in enumerate(pieces)]
+    return [
+        "\n".join(pieces[index] for index in batch)
+        for batch in pack_by_tokens(costs, budget=max_tokens, max_items=len(pieces) or 1)
+    ]
+
+
+def split_sections(text: str, max_tokens: int, max_chunks: int = 0) -> List[str]:
+    """Split ``text`` at section headings and pack sections into chunks of ≤ ``max_tokens``.
+
+    With ``max_chunks`` set, the chunk size grows until the text fits in that
+    many chunks.
+    """
+    sections = _sections(text)
+    chunks = _pack(sections, max_tokens)
+    while max_chunks > 0 and len(chunks) > max_chunks:
+        max_tokens = max(max_tokens + 1, int(max_tokens * 1.25))
+        chunks = _pack(sections, max_tokens)
+    return chunks
+
+
+def _key(text: str) -> str:
+    return _KEY_RE.sub("", text).lower()
+
+
+def _union(lists: Sequence[Sequence[str]], limit: Optional[int] = None) -> List[str]:
+    seen: Dict[str, str] = {}
+    for values in lists:
+        for value in values:
+            key = _key(value)
+            if key and key not in seen:
+                seen[key] = value
+    merged = list(seen.values())
+    return merged[:limit] if limit is not None else merged
+
+
+def merge_summaries(summaries: Sequence[str]) -> str:
+    summary = "；".join(text.strip().rstrip("。；;") for text in summaries if text.strip())
+    if len(summary) > MAX_SUMMARY_CHARS:
+        summary = summary[: MAX_SUMMARY_CHARS - 1] + "…"
+    return summary
+
+
+def merge_extracts(extracts: Sequence[HRExtract]) -> HRExtract:
+    """Deterministic reduce of per-chunk extracts, in chunk order.
+
+    Risks and needs are de-duplicated on their normalised text (keeping the
+    highest likelihood and the first owner/mitigation seen), list fields are
+    order-preserving unions, and the overall level is the highest chunk level.
+    """
+    risks: Dict[str, RiskItem] = {}
+    needs: Dict[str, NeedItem] = {}
+    for extract in extracts:
+        for risk in extract.risks:
+            key = _key(risk.item)
+            known = risks.get(key)
+            if known is None:
+                risks[key] = risk
+            elif _LEVELS[risk.likelihood] > _LEVELS[known.likelihood]:
+                risks[key] = risk.model_copy(
+                    update={"mitigation": known.mitigation or risk.mitigation}
+                )
+        for need in extract.needs:
+            key = _key(need.topic)
+            known_need = needs.get(key)
+            if known_need is None:
+                needs[key] = need
+            elif not known_need.owner and need.owner:
+                needs[key] = need
+    alignments = [extract.okr_alignment for extract in extracts]
+    return HRExtract(
+        hr_summary=merge_summaries([extract.hr_summary for extract in extracts]),
+        risks=list(risks.values()),
+        needs=list(needs.values()),
+        okr_alignment=OKRAlignment(
+            hit_objectives=_union([item.hit_objectives for item in alignments]),
+            hit_krs=_union([item.hit_krs for item in alignments]),
+            gaps=_union([item.gaps for item in alignments]),
+            confidence=max((item.confidence for item in alignments), default=0.0),
+        ),
+        next_actions=_union([extract.next_actions for extract in extracts], MAX_NEXT_ACTIONS),
+        risk_level=max(
+            (extract.risk_level for extract in extracts),
+            key=lambda level: _LEVELS[level],
+            default="low",
+        ),
+    )
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from ..config import Settings
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class AIMDConfig:
+    initial: int = 4
+    min_limit: int = 1
+    max_limit: int = 32
+    latency_target: float = 20.0
+    decrease_factor: float = 0.5
+    # Failures of calls that were already in flight when the limit dropped
+    # should not shrink it again.
+    cooldown: float = 2.0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> Optional["AIMDConfig"]:
+        if settings.qwen_aimd_max_concurrency <= 0:
+            return None
+        max_limit = settings.qwen_aimd_max_concurrency
+        min_limit = max(1, min(settings.qwen_aimd_min_concurrency, max_limit))
+        return cls(
+            initial=max(min_limit, min(settings.qwen_aimd_initial_concurrency, max_limit)),
+            min_limit=min_limit,
+            max_limit=max_limit,
+            latency_target=settings.qwen_aimd_latency_target_seconds,
+            decrease_factor=min(0.95, max(0.1, settings.qwen_aimd_decrease_factor)),
+        )
+
+
+class AdaptiveConcurrencyLimiter:
+    """Additive-increase / multiplicative-decrease cap on concurrent LLM calls.
+
+    Every healthy call (no error, latency within target) adds ``1 / limit``,
+    so the limit grows by about one per round of ``limit`` calls. A 429, a
+    timeout or a latency spike multiplies it by ``decrease_factor``.
+    """
+
+    def __init__(self, config: AIMDConfig, history: int = 50) -> None:
+        self.config = config
+        self._limit = float(config.initial)
+        self._in_flight = 0
+        self._waiting = 0
+        self._condition = asyncio.Condition()
+        self._last_decrease = 0.0
+        self._increases = 0
+        self._decreases: Dict[str, int] = {}
+        self._history: Deque[Dict[str, Any]] = deque(maxlen=history)
+
+    @property
+    def limit(self) -> int:
+        return max(self.config.min_limit, int(self._limit))
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        async with self._condition:
+            self._waiting += 1
+            try:
+                await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            finally:
+                self._waiting -= 1
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+
+    def record_success(self, latency: float) -> None:
+        if latency > self.config.latency_target:
+            self.record_overload("latency")
+            return
+        before = self.limit
+        self._limit = min(float(self.config.max_limit), self._limit + 1.0 / self._limit)
+        if self.limit > before:
+            self._increases += 1
+            self._remember("increase")
+
+    def record_overload(self, reason: str) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.config.cooldown:
+            return
+        self._last_decrease = now
+        before = self.limit
+        self._limit = max(float(self.config.min_limit), self._limit * self.config.decrease_factor)
+        self._decreases[reason] = self._decreases.get(reason, 0) + 1
+        self._remember(reason)
+        logger.warning(
+            "qwen_concurrency_decreased",
+            extra={"reason": reason, "from": before, "to": self.limit},
+        )
+
+    def _remember(self, reason: str) -> None:
+        self._history.append({"at": round(time.time(), 3), "limit": self.limit, "reason": reason})
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "min_limit": self.config.min_limit,
+            "max_limit": self.config.max_limit,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "increases": self._increases,
+            "decreases": dict(self._decreases),
+            "history": list(self._history),
+        }
+
+
+# Like the rate limiters, one controller per event loop shared by every caller.
+_controllers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AdaptiveConcurrencyLimiter]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_concurrency_limiter(config: AIMDConfig) -> AdaptiveConcurrencyLimiter:
+    loop = asyncio.get_running_loop()
+    controller = _controllers.get(loop)
+    if controller is None:
+        controller = AdaptiveConcurrencyLimiter(config)
+        _controllers[loop] = controller
+    return controller
+
+
+def concurrency_metrics() -> Dict[str, Any]:
+    controllers = list(_controllers.values())
+    if len(controllers) == 1:
+        return controllers[0].metrics()
+    return {str(index): controller.metrics() for index, controller in enumerate(controllers)}
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from ..config import Settings
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class HedgeConfig:
+    percentile: float = 0.95
+    budget_ratio: float = 0.1
+    min_samples: int = 20
+    window: int = 200
+    min_delay: float = 1.0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> Optional["HedgeConfig"]:
+        if not settings.qwen_hedge_enabled:
+            return None
+        return cls(
+            percentile=settings.qwen_hedge_percentile,
+            budget_ratio=settings.qwen_hedge_budget_ratio,
+            min_samples=settings.qwen_hedge_min_samples,
+        )
+
+
+class HedgeTracker:
+    """Recent latency window plus the hedge budget for one model."""
+
+    def __init__(self, config: HedgeConfig) -> None:
+        self.config = config
+        self._latencies: Deque[float] = deque(maxlen=config.window)
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def record_latency(self, seconds: float) -> None:
+        self._latencies.append(seconds)
+
+    def hedge_delay(self) -> Optional[float]:
+        if len(self._latencies) < self.config.min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(self.config.percentile * len(ordered)))
+        return max(self.config.min_delay, ordered[index])
+
+    def allow_hedge(self) -> bool:
+        return self.hedges + 1 <= self.config.budget_ratio * self.requests
+
+    def metrics(self) -> Dict[str, Any]:
+        delay = self.hedge_delay()
+        return {
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "hedge_rate": round(self.hedges / self.requests, 3) if self.requests else 0.0,
+            "hedge_wins": self.hedge_wins,
+            "win_rate": round(self.hedge_wins / self.hedges, 3) if self.hedges else 0.0,
+            "hedge_delay_seconds": round(delay, 3) if delay is not None else None,
+        }
+
+
+async def run_hedged(
+    tracker: HedgeTracker, call: Callable[[], Awaitable[T]], label: str = ""
+) -> T:
+    """Run ``call``; if it outlives the latency percentile, race a duplicate.
+
+    The first call to *return* wins, so ``call`` should include everything that
+    can reject a reply (parsing, validation) and acquire its own rate-limit
+    slot; a call that raises leaves the race to the other one.
+    """
+    tracker.requests += 1
+    started = time.monotonic()
+    primary = asyncio.ensure_future(call())
+    try:
+        delay = tracker.hedge_delay()
+        if delay is not None:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if not done and tracker.allow_hedge():
+                tracker.hedges += 1
+                logger.info(
+                    "qwen_hedge_fired", extra={"model": label, "after_seconds": delay}
+                )
+                hedge = asyncio.ensure_future(call())
+                return await _race(tracker, primary, hedge, started)
+        result = await primary
+    except asyncio.CancelledError:
+        primary.cancel()
+        raise
+    tracker.record_latency(time.monotonic() - started)
+    return result
+
+
+async def _race(
+    tracker: HedgeTracker,
+    primary: "asyncio.Future[T]",
+    hedge: "asyncio.Future[T]",
+    started: float,
+) -> T:
+    pending = {primary, hedge}
+    last_error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                error = task.exception()
+                if error is None:
+                    if task is hedge:
+                        tracker.hedge_wins += 1
+                    tracker.record_latency(time.monotonic() - started)
+                    return task.result()
+                last_error = error
+    finally:
+        for task in pending:
+            task.cancel()
+            with suppress(asyncio.CancelledError, Exception):
+                await task
+    assert last_error is not None
+    raise last_error
+
+
+_trackers: Dict[str, HedgeTracker] = {}
+
+
+def get_hedge_tracker(model: str, config: HedgeConfig) -> HedgeTracker:
+    key = model.lower()
+    tracker = _trackers.get(key)
+    if tracker is None:
+        tracker = HedgeTracker(config)
+        _trackers[key] = tracker
+    return tracker
+
+
+def hedge_metrics() -> Dict[str, Any]:
+    return {model: tracker.metrics() for model, tracker in list(_trackers.items())}
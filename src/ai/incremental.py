@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import difflib
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from ..config import Settings
+from ..schemas import ReportIn, StoredReport
+from .tokens import estimate_tokens
+
+INCREMENTAL_PROMPT_TEMPLATE = """
+【上一份报告的解读（{{ previous.period_start }}~{{ previous.period_end }}）】
+总结：{{ previous.hr_summary }}
+风险等级：{{ previous.risk_level }}
+{% if previous.risks %}已知风险：{{ previous.risks|join("；") }}
+{% endif %}{% if previous.hit_krs %}已涉及KR：{{ previous.hit_krs|join("、") }}
+{% endif %}
+【本次报告相对上一份的新增或变化内容】
+{{ changes }}
+
+【人员】{{ report.user_name }} ({{ report.user_id }})
+【周期】{{ report.period_type }} {{ report.period_start }}~{{ report.period_end }}
+
+【该人员OKR（摘要）】
+{{ okr_brief }}
+
+未列出的内容与上一份报告相同。请在上一份解读的基础上，结合变化内容给出本次完整解读。
+请输出 JSON：
+{{ output_spec }}
+""".strip()
+
+
+@dataclass(frozen=True)
+class ReportDelta:
+    changed_lines: List[str]
+    ratio: float
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.changed_lines)
+
+
+def diff_report(previous_text: str, current_text: str) -> ReportDelta:
+    """Lines added or rewritten since ``previous_text``; ``ratio`` is their share of the new text."""
+    old_lines = [line for line in previous_text.splitlines() if line.strip()]
+    new_lines = [line for line in current_text.splitlines() if line.strip()]
+    matcher = difflib.SequenceMatcher(a=old_lines, b=new_lines, autojunk=False)
+    changed: List[str] = []
+    for tag, _, _, j1, j2 in matcher.get_opcodes():
+        if tag in ("replace", "insert"):
+            changed.extend(new_lines[j1:j2])
+    total = sum(len(line) for line in new_lines)
+    ratio = sum(len(line) for line in changed) / total if total else 1.0
+    return ReportDelta(changed, ratio)
+
+
+@dataclass(frozen=True)
+class IncrementalConfig:
+    max_age: timedelta = timedelta(days=3)
+    max_diff_ratio: float = 0.6
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> Optional["IncrementalConfig"]:
+        if not settings.qwen_incremental:
+            return None
+        return cls(
+            max_age=timedelta(days=settings.qwen_incremental_max_age_days),
+            max_diff_ratio=settings.qwen_incremental_max_diff_ratio,
+        )
+
+    def delta_for(self, report: ReportIn, previous: Optional[StoredReport]) -> Optional[ReportDelta]:
+        """Diff against ``previous`` when it is a usable baseline, else ``None``.
+
+        The baseline must be the same kind of report, recent, and a full model
+        extract (not the offline fallback, nor a gate or triage light extract);
+        a mostly rewritten report goes through the full prompt instead.
+        """
+        if previous is None or previous.hr_extract.needs_retranslation:
+            return None
+        if previous.hr_extract.light:
+            return None
+        last = previous.report
+        if last.period_type != report.period_type:
+            return None
+        try:
+            age = report.message_ts - last.message_ts
+        except TypeError:  # naive vs aware timestamps from different sources
+            return None
+        if age <= timedelta(0) or age > self.max_age:
+            return None
+        delta = diff_report(last.raw_text, report.raw_text)
+        if not delta.changed_lines or delta.ratio > self.max_diff_ratio:
+            return None
+        return delta
+
+
+def previous_context(previous: StoredReport) -> Dict[str, Any]:
+    extract = previous.hr_extract
+    return {
+        "period_start": previous.report.period_start,
+        "period_end": previous.report.period_end,
+        "hr_summary": extract.hr_summary,
+        "risk_level": extract.risk_level,
+        "risks": [f"{risk.item}({risk.likelihood})" for risk in extract.risks],
+        "hit_krs": list(extract.okr_alignment.hit_krs),
+    }
+
+
+class IncrementalStats:
+    def __init__(self) -> None:
+        self.used = 0
+        self.skipped = 0
+        self.tokens_saved = 0
+
+    def record_use(self, full_text: str, delta_text: str) -> None:
+        self.used += 1
+        self.tokens_saved += max(0, estimate_tokens(full_text) - estimate_tokens(delta_text))
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "used": self.used,
+            "skipped": self.skipped,
+            "estimated_input_tokens_saved": self.tokens_saved,
+        }
+
+
+_stats = IncrementalStats()
+
+
+def get_incremental_stats() -> IncrementalStats:
+    return _stats
+
+
+def incremental_metrics() -> Dict[str, Any]:
+    return _stats.metrics()
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Dict, List
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*(.*?)(?:```|$)", re.DOTALL)
+_TRAILING_TOKEN_RE = re.compile(r"[A-Za-z0-9.+\-]+$")
+_DANGLING_KEY_RE = re.compile(r'([{,])\s*"(?:[^"\\]|\\.)*"\s*$')
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class JSONRepairStats:
+    """How often model output parsed as-is, needed a local repair, or still failed."""
+
+    def __init__(self) -> None:
+        self.clean = 0
+        self.repaired = 0
+        self.failed = 0
+        self.retries = 0
+
+    def metrics(self) -> Dict[str, Any]:
+        parsed = self.clean + self.repaired
+        total = parsed + self.failed
+        return {
+            "clean": self.clean,
+            "repaired": self.repaired,
+            "failed": self.failed,
+            "retries": self.retries,
+            "repair_ratio": round(self.repaired / total, 3) if total else 0.0,
+            # every repaired payload is one LLM round-trip that did not happen
+            "retries_avoided": self.repaired,
+        }
+
+
+_stats = JSONRepairStats()
+
+
+def json_repair_metrics() -> Dict[str, Any]:
+    return _stats.metrics()
+
+
+def record_parse_retry() -> None:
+    _stats.retries += 1
+
+
+def loads_lenient(text: str) -> Any:
+    """``json.loads`` that tolerates the usual LLM damage.
+
+    Handles Markdown fences, prose before/after the payload, trailing commas
+    and output truncated mid-string or mid-array. Raises ``ValueError`` when
+    nothing usable can be recovered.
+    """
+    try:
+        value = json.loads(text)
+    except (TypeError, ValueError):
+        pass
+    else:
+        _stats.clean += 1
+        return value
+    try:
+        value = json.loads(repair_json(text), strict=False)
+    except ValueError as exc:
+        _stats.failed += 1
+        raise ValueError(f"Unrecoverable JSON output: {exc}") from exc
+    _stats.repaired += 1
+    return value
+
+
+def repair_json(text: str) -> str:
+    """Best-effort rewrite of ``text`` into a parseable JSON document."""
+    candidate = _strip_wrapping(text or "")
+    out: List[str] = []
+    stack: List[str] = []
+    in_string = False
+    escape = False
+    for char in candidate:
+        if in_string:
+            out.append(char)
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+            out.append(char)
+        elif char in _CLOSERS:
+            stack.append(char)
+            out.append(char)
+        elif char in "}]":
+            if not stack or _CLOSERS[stack[-1]] != char:
+                continue
+            stack.pop()
+            _drop_trailing_comma(out)
+            out.append(char)
+            if not stack:
+                break  # anything after the root value is prose
+        else:
+            out.append(char)
+    if in_string:
+        if escape:
+            out.pop()
+        out.append('"')
+    repaired = "".join(out)
+    if stack:
+        repaired = _trim_dangling(repaired, stack[-1])
+        for opener in reversed(stack):
+            repaired = repaired.rstrip().rstrip(",") + _CLOSERS[opener]
+    return repaired
+
+
+def _strip_wrapping(text: str) -> str:
+    fenced = _FENCE_RE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    starts = [index for index in (text.find("{"), text.find("[")) if index >= 0]
+    return text[min(starts):] if starts else text.strip()
+
+
+def _drop_trailing_comma(out: List[str]) -> None:
+    index = len(out) - 1
+    while index >= 0 and out[index].isspace():
+        index -= 1
+    if index >= 0 and out[index] == ",":
+        del out[index:]
+
+
+def _trim_dangling(text: str, innermost: str) -> str:
+    """Remove a half-written member at the truncation point."""
+    while True:
+        stripped = text.rstrip()
+        token = _TRAILING_TOKEN_RE.search(stripped)
+        if token and not _is_literal(token.group(0)):
+            stripped = stripped[: token.start()]
+        if stripped.endswith(","):
+            stripped = stripped[:-1]
+        elif stripped.endswith(":"):
+            stripped = _DANGLING_KEY_RE.sub(r"\1", stripped[:-1])
+        elif innermost == "{" and _DANGLING_KEY_RE.search(stripped):
+            stripped = _DANGLING_KEY_RE.sub(r"\1", stripped)
+        if stripped == text:
+            return text
+        text = stripped
+
+
+def _is_literal(token: str) -> bool:
+    try:
+        json.loads(token)
+    except ValueError:
+        return False
+    return True
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ..config import Settings
+from .tokens import CJK_BIGRAM_RE, OKR_ID_RE, estimate_tokens, okr_ids
+
+# Lines carrying these words are what HR reads the report for.
+HIGH_VALUE_KEYWORDS = (
+    "风险",
+    "阻塞",
+    "卡点",
+    "卡住",
+    "问题",
+    "延期",
+    "延迟",
+    "依赖",
+    "需要",
+    "求助",
+    "支持",
+    "计划",
+    "下一步",
+    "目标",
+    "KR",
+    "OKR",
+    "risk",
+    "block",
+    "issue",
+    "delay",
+    "depend",
+    "need",
+    "next",
+)
+_HEADING_RE = re.compile(r"^\s*(【[^】]+】|#+\s|[^:：\s]{1,12}[:：])")
+_NUMBER_RE = re.compile(r"\d+(\.\d+)?\s*%|\d{2,}")
+OMITTED_MARKER = "……（已省略{count}行）"
+
+
+@dataclass(frozen=True)
+class BudgetedText:
+    text: str
+    tokens: int
+    original_tokens: int
+    dropped_lines: int
+
+    @property
+    def truncated(self) -> bool:
+        return self.tokens < self.original_tokens
+
+
+def _line_priority(line: str, index: int) -> int:
+    """0 = keep first … 3 = drop first."""
+    lowered = line.lower()
+    if index == 0 or any(keyword.lower() in lowered for keyword in HIGH_VALUE_KEYWORDS):
+        return 0
+    if _HEADING_RE.match(line) or _NUMBER_RE.search(line):
+        return 1
+    if line.strip():
+        return 2
+    return 3
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut ``text`` to roughly ``max_tokens`` estimated tokens."""
+    if max_tokens <= 0:
+        return ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(text[:middle]) + 1 <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low] + "…"
+
+
+def select_lines(lines: Sequence[str], priorities: Sequence[int], max_tokens: int) -> BudgetedText:
+    """Keep the highest-priority lines that fit, in their original order.
+
+    Dropped runs are replaced by an omission marker; the first top-priority
+    line that no longer fits whole is cut to the space that is left.
+    """
+    original = "\n".join(lines)
+    original_tokens = estimate_tokens(original)
+    if original_tokens <= max_tokens:
+        return BudgetedText(original, original_tokens, original_tokens, 0)
+    costs = [estimate_tokens(line) + 1 for line in lines]
+    marker_cost = estimate_tokens(OMITTED_MARKER.format(count=99)) + 1
+    remaining = max_tokens - marker_cost * 2
+    kept: Dict[int, str] = {}
+    for index in sorted(range(len(lines)), key=lambda item: (priorities[item], item)):
+        if priorities[index] >= 3 or remaining <= 0:
+            continue
+        if costs[index] <= remaining:
+            kept[index] = lines[index]
+            remaining -= costs[index]
+        elif priorities[index] == 0 and remaining > 8:
+            kept[index] = truncate_to_tokens(lines[index], remaining - 1)
+            remaining = 0
+    output: List[str] = []
+    skipped = 0
+    for index, line in enumerate(lines):
+        if index in kept:
+            if skipped:
+                output.append(OMITTED_MARKER.format(count=skipped))
+                skipped = 0
+            output.append(kept[index])
+        elif line.strip():
+            skipped += 1
+    if skipped:
+        output.append(OMITTED_MARKER.format(count=skipped))
+    text = truncate_to_tokens("\n".join(output), max_tokens)
+    dropped = sum(1 for index, line in enumerate(lines) if line.strip() and index not in kept)
+    return BudgetedText(text, estimate_tokens(text), original_tokens, dropped)
+
+
+def budget_report_text(raw_text: str, max_tokens: int) -> BudgetedText:
+    lines = raw_text.splitlines()
+    priorities = [_line_priority(line, index) for index, line in enumerate(lines)]
+    return select_lines(lines, priorities, max_tokens)
+
+
+def budget_okr_brief(okr_brief: str, raw_text: str, max_tokens: int) -> BudgetedText:
+    """Keep objective lines and the KRs the report most likely talks about."""
+    lines = okr_brief.splitlines()
+    mentioned_ids = set(okr_ids(raw_text, OKR_ID_RE))
+    report_bigrams = set(CJK_BIGRAM_RE.findall(raw_text))
+    priorities: List[int] = []
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            priorities.append(3)
+            continue
+        if not stripped.startswith("-"):
+            priorities.append(0)  # objective header
+            continue
+        ids = set(okr_ids(stripped, OKR_ID_RE))
+        overlap = len(set(CJK_BIGRAM_RE.findall(stripped)) & report_bigrams)
+        priorities.append(0 if ids & mentioned_ids or overlap >= 2 else 2)
+    return select_lines(lines, priorities, max_tokens)
+
+
+@dataclass(frozen=True)
+class PromptBudget:
+    """Input-token ceiling for one report prompt, split between report and OKR brief."""
+
+    max_input_tokens: int
+    okr_share: float = 0.3
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> Optional["PromptBudget"]:
+        if settings.qwen_max_input_tokens <= 0:
+            return None
+        return cls(
+            max_input_tokens=settings.qwen_max_input_tokens,
+            okr_share=settings.qwen_prompt_okr_share,
+        )
+
+    def fit(
+        self, raw_text: str, okr_brief: str, overhead_tokens: int
+    ) -> Tuple[BudgetedText, BudgetedText]:
+        available = max(64, self.max_input_tokens - overhead_tokens)
+        okr_tokens = estimate_tokens(okr_brief)
+        okr_budget = min(okr_tokens, int(available * self.okr_share))
+        raw = budget_report_text(raw_text, available - okr_budget)
+        # Hand whatever the report did not need back to the OKR brief.
+        okr = budget_okr_brief(okr_brief, raw_text, available - raw.tokens)
+        return raw, okr
@@ -2,39 +2,86 @@ from __future__ import annotations
 
 import asyncio
 import json
-from typing import Any, Dict, List, Optional, Tuple
+import time
+from contextlib import nullcontext
+from email.utils import parsedate_to_datetime
+from functools import partial
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
 
 import httpx
 from jinja2 import BaseLoader, Environment
 
-from ..schemas import HRExtract, OKRAlignment, ReportIn
+from ..config import Settings, resolve_api_mode
+from ..schemas import HRExtract, OKRAlignment, ReportIn, StoredReport
+from .batching import pack_by_tokens
+from .breaker import BreakerConfig, get_circuit_breaker
+from .cache import ExtractionCache, build_extraction_cache
+from .chunking import (
+    REDUCE_PROMPT_TEMPLATE,
+    REDUCE_SYSTEM_PROMPT,
+    ChunkConfig,
+    merge_extracts,
+    split_sections,
+)
+from .concurrency import AIMDConfig, get_concurrency_limiter
+from .hedging import HedgeConfig, get_hedge_tracker, run_hedged
+from .incremental import (
+    INCREMENTAL_PROMPT_TEMPLATE,
+    IncrementalConfig,
+    get_incremental_stats,
+    previous_context,
+)
+from .json_repair import loads_lenient, record_parse_retry
+from .prompt_budget import PromptBudget
+from .ratelimit import RateLimitConfig, get_rate_limiter
+from .router import ModelRouter, build_model_router
+from .streaming import IncrementalJSONFields, iter_sse_data, stream_delta
+from .tokens import estimate_tokens
+from .triage import (
+    TRIAGE_PROMPT_TEMPLATE,
+    TRIAGE_SYSTEM_PROMPT,
+    CascadeConfig,
+    get_cascade_stats,
+    heuristic_triage,
+    light_extract,
+    parse_model_triage,
+)
+from ..utils.http import get_shared_client
 from ..utils.logger import get_logger
+from ..utils.retry import RetryPolicy, is_retryable
 
 logger = get_logger(__name__)
 
-TEXT_GENERATION_URL = (
-    "https://dashscope.aliyuncs.com/api/v1/services/aigc/text-generation/generation"
-)
-CHAT_COMPLETION_URL = (
-    "https://dashscope.aliyuncs.com/compatible-mode/v1/chat/completions"
-)
+T = TypeVar("T")
+
+DASHSCOPE_BASE_URL = "https://dashscope.aliyuncs.com"
+TEXT_GENERATION_PATH = "/api/v1/services/aigc/text-generation/generation"
+CHAT_COMPLETION_PATH = "/compatible-mode/v1/chat/completions"
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+# Budgeted output size used when reserving tokens/min before a call.
+EXPECTED_OUTPUT_TOKENS = 600
+
+# Top-level fields surfaced as soon as they finish streaming.
+EARLY_STREAM_FIELDS = {"hr_summary", "risk_level"}
 
 SYSTEM_PROMPT = (
     "你是资深人力视角的解读助手。把技术日报/周报/月报翻译为非技术HR或小白能懂的语言，"
     "突出价值、风险、依赖和下一步动作。严格输出JSON。"
 )
 
-USER_PROMPT_TEMPLATE = """
-【报告文本】
-{{ report.raw_text }}
-
-【人员】{{ report.user_name }} ({{ report.user_id }})
-【周期】{{ report.period_type }} {{ report.period_start }}~{{ report.period_end }}
-
-【该人员OKR（摘要）】
-{{ okr_brief }}
-
-请输出 JSON：
+OUTPUT_SCHEMA = """
 {
   "hr_summary": "不超过200字的通俗总结",
   "risks": [{"item":"", "likelihood":"low|medium|high", "mitigation":""}],
@@ -48,6 +95,9 @@ USER_PROMPT_TEMPLATE = """
   "next_actions": ["可执行的下一步1","下一步2"],
   "risk_level": "low|medium|high"
 }
+""".strip()
+
+OUTPUT_RULES = """
 约束：
 1. 所有字段（包括 gaps、hit_objectives、hit_krs）都必须用HR能理解的通俗语言，避免专业术语（如TDD、BDD、API等）；
 2. 对于 gaps 字段，不要输出 "O2KR1: xxx" 这样的格式，而要描述具体的业务目标，例如 "测试流程优化进展缓慢" 而不是 "TDD与BDD模式研究尚未完成"；
@@ -55,6 +105,160 @@ USER_PROMPT_TEMPLATE = """
 4. 如未提及OKR，也要基于文本给出最可能关联的O/KR并标注低置信度。
 """.strip()
 
+# Same content with one/two-letter keys and l|m|h levels: far fewer output tokens.
+COMPACT_OUTPUT_SCHEMA = """
+{
+  "s": "不超过200字的通俗总结",
+  "r": [{"i":"", "l":"l|m|h", "m":""}],
+  "n": [{"t":"", "o":""}],
+  "a": {"o": ["O1","O2"], "k": ["KR1","KR2"], "g": ["未覆盖或落后KR的通俗描述"], "c": 0.0},
+  "x": ["可执行的下一步1","下一步2"],
+  "v": "l|m|h"
+}
+""".strip()
+
+COMPACT_KEY_LEGEND = (
+    "键名：s=hr_summary，r=risks（i=item，l=likelihood，m=mitigation），"
+    "n=needs（t=topic，o=owner），a=okr_alignment（o=hit_objectives，k=hit_krs，"
+    "g=gaps，c=confidence），x=next_actions，v=risk_level；l/m/h 表示 low/medium/high。"
+    "只输出紧凑键名，不要输出完整键名。"
+)
+
+OUTPUT_SPEC = OUTPUT_SCHEMA + "\n" + OUTPUT_RULES
+COMPACT_OUTPUT_SPEC = COMPACT_OUTPUT_SCHEMA + "\n" + COMPACT_KEY_LEGEND + "\n" + OUTPUT_RULES
+
+COMPACT_KEYS = {
+    "s": "hr_summary",
+    "r": "risks",
+    "n": "needs",
+    "a": "okr_alignment",
+    "x": "next_actions",
+    "v": "risk_level",
+}
+_COMPACT_NESTED_KEYS = {
+    "risks": {"i": "item", "l": "likelihood", "m": "mitigation"},
+    "needs": {"t": "topic", "o": "owner"},
+    "okr_alignment": {"o": "hit_objectives", "k": "hit_krs", "g": "gaps", "c": "confidence"},
+}
+
+USER_PROMPT_TEMPLATE = (
+    """
+【报告文本】
+{{ report.raw_text }}
+
+【人员】{{ report.user_name }} ({{ report.user_id }})
+【周期】{{ report.period_type }} {{ report.period_start }}~{{ report.period_end }}
+
+【该人员OKR（摘要）】
+{{ okr_brief }}
+
+请输出 JSON：
+{{ output_spec }}
+""".strip()
+)
+
+BATCH_USER_PROMPT_TEMPLATE = (
+    """
+以下共有 {{ items|length }} 份报告，请逐份独立解读，不要混用不同人员的信息。
+{% for item in items %}
+=== 报告 {{ loop.index0 }} ===
+【报告文本】
+{{ item.report.raw_text }}
+
+【人员】{{ item.report.user_name }} ({{ item.report.user_id }})
+【周期】{{ item.report.period_type }} {{ item.report.period_start }}~{{ item.report.period_end }}
+
+【该人员OKR（摘要）】
+{{ item.okr_brief }}
+{% endfor %}
+请输出 JSON：{"reports": [...]}，数组中按报告编号顺序每份报告一个对象，并用 "index" 字段标注报告编号。
+每个对象的结构：
+{{ output_spec }}
+""".strip()
+)
+
+
+# Compiled once; rendering is per report.
+_JINJA_ENV = Environment(loader=BaseLoader(), autoescape=False)
+_USER_TEMPLATE = _JINJA_ENV.from_string(USER_PROMPT_TEMPLATE)
+_BATCH_TEMPLATE = _JINJA_ENV.from_string(BATCH_USER_PROMPT_TEMPLATE)
+_TRIAGE_TEMPLATE = _JINJA_ENV.from_string(TRIAGE_PROMPT_TEMPLATE)
+_INCREMENTAL_TEMPLATE = _JINJA_ENV.from_string(INCREMENTAL_PROMPT_TEMPLATE)
+_REDUCE_TEMPLATE = _JINJA_ENV.from_string(REDUCE_PROMPT_TEMPLATE)
+
+
+class DashScopeHTTPError(RuntimeError):
+    """Retryable DashScope status (429/5xx), carrying any ``Retry-After`` hint."""
+
+    def __init__(self, status_code: int, retry_after: Optional[float] = None) -> None:
+        super().__init__(f"DashScope temporary error: {status_code}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_response(cls, response: httpx.Response) -> "DashScopeHTTPError":
+        return cls(response.status_code, _parse_retry_after(response.headers.get("retry-after")))
+
+
+class CircuitOpenError(RuntimeError):
+    """The model's circuit breaker refused the call."""
+
+    def __init__(self, model: str) -> None:
+        super().__init__(f"Circuit open for {model}")
+        self.model = model
+
+
+def _expand_compact_keys(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map compact-schema keys back to the ``HRExtract`` field names."""
+    if not any(key in data for key in COMPACT_KEYS):
+        return data
+    expanded: Dict[str, Any] = {}
+    for key, value in data.items():
+        name = COMPACT_KEYS.get(key, key)
+        nested = _COMPACT_NESTED_KEYS.get(name)
+        if nested and isinstance(value, dict):
+            value = {nested.get(k, k): v for k, v in value.items()}
+        elif nested and isinstance(value, list):
+            value = [
+                {nested.get(k, k): v for k, v in item.items()} if isinstance(item, dict) else item
+                for item in value
+            ]
+        expanded.setdefault(name, value)
+    return expanded
+
+
+def _is_upstream_failure(exc: BaseException) -> bool:
+    """Outage-type errors that count against the circuit breaker."""
+    if isinstance(exc, DashScopeHTTPError):
+        return exc.status_code != 429  # throttling is the rate limiter's job
+    return isinstance(exc, (httpx.TransportError, asyncio.TimeoutError))
+
+
+def _is_overload(exc: BaseException) -> bool:
+    """Signals that DashScope wants less concurrency from us."""
+    if isinstance(exc, DashScopeHTTPError):
+        return exc.status_code in (429, 503)
+    return isinstance(exc, (asyncio.TimeoutError, httpx.TimeoutException))
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    # Unparseable or invalid output (ValueError, incl. pydantic) is worth another try.
+    return is_retryable(exc) or isinstance(exc, ValueError)
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
 
 class QwenClient:
     def __init__(
@@ -64,56 +268,612 @@ class QwenClient:
         timeout: float = 10.0,
         http_client: Optional[httpx.AsyncClient] = None,
         max_retries: int = 2,
+        deadline: float = 90.0,
+        retry_policy: Optional[RetryPolicy] = None,
         api_mode: str = "text",
         trust_env: bool = False,
+        cache: Optional[ExtractionCache] = None,
+        stream: bool = False,
+        stream_idle_timeout: float = 30.0,
+        on_partial: Optional[Callable[[str, str], None]] = None,
+        rate_limits: Optional[RateLimitConfig] = None,
+        breaker: Optional[BreakerConfig] = None,
+        hedge: Optional[HedgeConfig] = None,
+        router: Optional[ModelRouter] = None,
+        batch_max_tokens: int = 0,
+        batch_max_reports: int = 8,
+        prompt_budget: Optional[PromptBudget] = None,
+        compact_output: bool = False,
+        cascade: Optional[CascadeConfig] = None,
+        incremental: Optional[IncrementalConfig] = None,
+        chunking: Optional[ChunkConfig] = None,
+        concurrency: Optional[AIMDConfig] = None,
+        base_url: str = DASHSCOPE_BASE_URL,
     ) -> None:
         self.api_key = api_key
         self.model = model
         self.timeout = timeout
         self._client = http_client
+        self._owned_client: Optional[httpx.AsyncClient] = None
         self.max_retries = max(1, max_retries)
+        self.retry_policy = retry_policy or RetryPolicy(
+            max_attempts=self.max_retries,
+            deadline=deadline,
+            attempt_timeout=max(20.0, timeout),
+            max_delay=15.0,
+        )
         self.api_mode = api_mode
-        self._jinja_env = Environment(loader=BaseLoader(), autoescape=False)
         self.trust_env = trust_env
+        self.cache = cache
+        self.stream = stream
+        self.stream_idle_timeout = stream_idle_timeout
+        self.on_partial = on_partial
+        self.rate_limits = rate_limits
+        self.breaker = breaker
+        self.hedge = hedge
+        self.router = router
+        self.batch_max_tokens = batch_max_tokens
+        self.batch_max_reports = batch_max_reports
+        self.prompt_budget = prompt_budget
+        self.compact_output = compact_output
+        self.cascade = cascade
+        self.incremental = incremental
+        self.chunking = chunking
+        self.concurrency = concurrency
+        self.base_url = base_url.rstrip("/")
+        self._output_spec = COMPACT_OUTPUT_SPEC if compact_output else OUTPUT_SPEC
+
+    async def generate_hr_extract(
+        self,
+        report: ReportIn,
+        okr_brief: str,
+        previous: Optional[StoredReport] = None,
+    ) -> HRExtract:
+        """Translate one report.
 
-    async def generate_hr_extract(self, report: ReportIn, okr_brief: str) -> HRExtract:
+        ``previous`` is the user's last stored report; with incremental mode on,
+        only what changed since it is sent alongside its summary.
+        """
         if not self.api_key and not self._client:
             raise RuntimeError("DashScope API key is required for Qwen integration.")
-        system_prompt, user_prompt = self._render_prompts(report, okr_brief)
-        last_error: Optional[Exception] = None
+        light = await self._triage(report, okr_brief)
+        if light is not None:
+            return light
+        extract = await self._incremental_extract(report, okr_brief, previous)
+        if extract is not None:
+            return extract
+        return await self._full_extract(report, okr_brief)
+
+    async def _incremental_extract(
+        self, report: ReportIn, okr_brief: str, previous: Optional[StoredReport]
+    ) -> Optional[HRExtract]:
+        if self.incremental is None:
+            return None
+        delta = self.incremental.delta_for(report, previous)
+        stats = get_incremental_stats()
+        if delta is None or previous is None:
+            if previous is not None:
+                stats.skipped += 1
+            return None
+        user_prompt = _INCREMENTAL_TEMPLATE.render(
+            previous=previous_context(previous),
+            changes=delta.text,
+            report=report.model_dump(),
+            okr_brief=okr_brief,
+            output_spec=self._output_spec,
+        )
+        extract = await self._extract_with_prompts(
+            report, SYSTEM_PROMPT, user_prompt, model=self._route_model(report)
+        )
+        if extract.needs_retranslation:
+            return extract
+        stats.record_use(report.raw_text, delta.text)
+        logger.info(
+            "qwen_incremental",
+            extra={
+                "user_id": report.user_id,
+                "changed_lines": len(delta.changed_lines),
+                "diff_ratio": round(delta.ratio, 3),
+            },
+        )
+        return extract
+
+    async def _full_extract(self, report: ReportIn, okr_brief: str) -> HRExtract:
+        started = time.monotonic()
+        model = self._route_model(report)
+        if self.chunking is not None and self.chunking.applies_to(report.raw_text):
+            extract = await self._chunked_extract(report, okr_brief, model=model)
+        else:
+            system_prompt, user_prompt = self._render_prompts(report, okr_brief)
+            extract = await self._extract_with_prompts(
+                report, system_prompt, user_prompt, model=model
+            )
+        if self.cascade is not None:
+            get_cascade_stats().record_stage("full", time.monotonic() - started)
+        return extract
+
+    async def _chunked_extract(
+        self, report: ReportIn, okr_brief: str, *, model: str
+    ) -> HRExtract:
+        """Map-reduce for very long reports: one concurrent call per section chunk.
+
+        Chunk results are merged locally; only ``hr_summary`` optionally gets a
+        short reduce call. A report where some chunks failed is still merged
+        but flagged for re-translation.
+        """
+        config = self.chunking
+        assert config is not None
+        api_mode = resolve_api_mode(model, self.api_mode)
+        cache_key: Optional[str] = None
+        if self.cache is not None:
+            # Keyed on the inputs, not on any one chunk prompt.
+            chunk_marker = f"chunked:{config.chunk_tokens}:{config.max_chunks}"
+            cache_key = self.cache.make_key(
+                model, api_mode, chunk_marker, f"{okr_brief}\n{report.raw_text}"
+            )
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                logger.info("qwen_cache_hit", extra={"user_id": report.user_id})
+                return cached
 
-        for attempt in range(self.max_retries):
+        chunks = split_sections(report.raw_text, config.chunk_tokens, config.max_chunks)
+        started = time.monotonic()
+
+        async def extract_chunk(index: int, chunk: str) -> HRExtract:
+            part = report.model_copy(
+                update={"raw_text": f"【第{index + 1}/{len(chunks)}部分】\n{chunk}"}
+            )
+            system_prompt, user_prompt = self._render_prompts(part, okr_brief)
+            return await self._complete(
+                system_prompt,
+                user_prompt,
+                model=model,
+                parse=self._parse_extract,
+                user_id=report.user_id,
+            )
+
+        outcomes = await asyncio.gather(
+            *(extract_chunk(index, chunk) for index, chunk in enumerate(chunks)),
+            return_exceptions=True,
+        )
+        extracts = [outcome for outcome in outcomes if isinstance(outcome, HRExtract)]
+        failed = len(chunks) - len(extracts)
+        logger.info(
+            "qwen_chunked",
+            extra={
+                "user_id": report.user_id,
+                "chunks": len(chunks),
+                "failed": failed,
+                "map_seconds": round(time.monotonic() - started, 3),
+            },
+        )
+        if not extracts:
+            return self._fallback_extract(report)
+        merged = merge_extracts(extracts)
+        if config.reduce_summary and len(extracts) > 1:
+            summary = await self._reduce_summary(report, extracts, model=model)
+            if summary:
+                merged = merged.model_copy(update={"hr_summary": summary})
+        if failed:
+            return merged.model_copy(update={"needs_retranslation": True})
+        if self.cache is not None and cache_key:
+            await self.cache.put(cache_key, merged)
+        return merged
+
+    async def _reduce_summary(
+        self, report: ReportIn, extracts: Sequence[HRExtract], *, model: str
+    ) -> Optional[str]:
+        user_prompt = _REDUCE_TEMPLATE.render(
+            period_type=report.period_type,
+            summaries=[extract.hr_summary for extract in extracts],
+        )
+
+        def parse(raw: str) -> str:
+            data = loads_lenient(raw)
+            summary = str(data.get("hr_summary") or "").strip() if isinstance(data, dict) else ""
+            if not summary:
+                raise ValueError("Reduce output is missing hr_summary.")
+            return summary
+
+        try:
+            return await self._complete(
+                REDUCE_SYSTEM_PROMPT,
+                user_prompt,
+                model=model,
+                parse=parse,
+                user_id=report.user_id,
+                expected_output_tokens=250,
+            )
+        except Exception as exc:
+            # The deterministic merge already has a usable summary.
+            logger.warning(
+                "qwen_reduce_failed",
+                extra={"user_id": report.user_id, "error": str(exc) or repr(exc)},
+            )
+            return None
+
+    async def _triage(self, report: ReportIn, okr_brief: str) -> Optional[HRExtract]:
+        """Cheap first stage; returns a light extract unless the report needs escalation."""
+        cascade = self.cascade
+        if cascade is None or not cascade.applies_to(report):
+            return None
+        stats = get_cascade_stats()
+        started = time.monotonic()
+        if cascade.mode == "model":
+            user_prompt = _TRIAGE_TEMPLATE.render(report=report.model_dump(), okr_brief=okr_brief)
             try:
-                timeout = self._timeout_for_attempt(attempt)
-                raw_text = await self._invoke_completion(
-                    system_prompt, user_prompt, attempt, timeout=timeout
+                result = await self._complete(
+                    TRIAGE_SYSTEM_PROMPT,
+                    user_prompt,
+                    model=cascade.triage_model,
+                    parse=lambda raw: parse_model_triage(loads_lenient(raw), report),
+                    user_id=report.user_id,
+                    expected_output_tokens=80,
+                )
+            except Exception as exc:
+                stats.triage_failures += 1
+                logger.warning(
+                    "qwen_triage_failed",
+                    extra={"user_id": report.user_id, "error": str(exc) or repr(exc)},
+                )
+                result = None
+        else:
+            result = heuristic_triage(report, okr_brief)
+        stats.triaged += 1
+        stats.record_stage("triage", time.monotonic() - started)
+        escalate = result is None or cascade.should_escalate(result)
+        if escalate:
+            stats.escalated += 1
+        logger.info(
+            "qwen_triage",
+            extra={
+                "user_id": report.user_id,
+                "mode": cascade.mode,
+                "risk_level": result.risk_level if result else None,
+                "confidence": result.confidence if result else None,
+                "escalated": escalate,
+            },
+        )
+        if escalate or result is None:
+            return None
+        return light_extract(result, report)
+
+    def _route_model(self, report: ReportIn) -> str:
+        if self.router is None:
+            return self.model
+        return self.router.choose(report)
+
+    async def _extract_with_prompts(
+        self,
+        report: ReportIn,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        model: str,
+    ) -> HRExtract:
+        """Cache lookup and offline fallback around one single-report prompt."""
+        api_mode = resolve_api_mode(model, self.api_mode)
+        cache_key: Optional[str] = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(model, api_mode, system_prompt, user_prompt)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                logger.info("qwen_cache_hit", extra={"user_id": report.user_id})
+                return cached
+        try:
+            extract = await self._complete(
+                system_prompt,
+                user_prompt,
+                model=model,
+                parse=self._parse_extract,
+                user_id=report.user_id,
+            )
+        except CircuitOpenError:
+            return self._fallback_extract(report)
+        except Exception as exc:
+            logger.error(
+                "qwen_fallback",
+                extra={
+                    "error": str(exc),
+                    "attempts": self.retry_policy.max_attempts,
+                    "user_id": report.user_id,
+                    "model": model,
+                },
+            )
+            return self._fallback_extract(report)
+        # Only validated model output is cached, never the fallback.
+        if self.cache is not None and cache_key:
+            await self.cache.put(cache_key, extract)
+        return extract
+
+    async def _complete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        model: str,
+        parse: Callable[[str], T],
+        user_id: str = "",
+        expected_output_tokens: int = EXPECTED_OUTPUT_TOKENS,
+    ) -> T:
+        """Run one prompt through the rate limiter, breaker and retry loop.
+
+        Raises :class:`CircuitOpenError` when the breaker refuses the call and
+        the last error once every attempt has failed.
+        """
+        api_mode = resolve_api_mode(model, self.api_mode)
+        limiter = get_rate_limiter(model, self.rate_limits) if self.rate_limits else None
+        estimated_tokens = (
+            estimate_tokens(system_prompt)
+            + estimate_tokens(user_prompt)
+            + expected_output_tokens
+        )
+
+        breaker = get_circuit_breaker(model, self.breaker) if self.breaker else None
+        adaptive = get_concurrency_limiter(self.concurrency) if self.concurrency else None
+        tracker = get_hedge_tracker(model, self.hedge) if self.hedge else None
+        retry = self.retry_policy.start()
+
+        async def attempt_once(prompt: str, attempt: int, timeout: float) -> T:
+            # A hedged duplicate runs this too, so it takes its own slots and
+            # token reservation and only wins once its output has parsed.
+            async with adaptive.slot() if adaptive else nullcontext(), (
+                limiter.slot(estimated_tokens) if limiter else nullcontext()
+            ):
+                started = time.monotonic()
+                try:
+                    raw_text = await asyncio.wait_for(
+                        self._invoke_completion(
+                            system_prompt,
+                            prompt,
+                            attempt,
+                            timeout=timeout,
+                            model=model,
+                            api_mode=api_mode,
+                        ),
+                        timeout=max(0.001, retry.remaining()),
+                    )
+                except Exception as exc:
+                    upstream_failure = _is_upstream_failure(exc)
+                    if adaptive is not None and _is_overload(exc):
+                        adaptive.record_overload(
+                            "throttled" if isinstance(exc, DashScopeHTTPError) else "timeout"
+                        )
+                    if self.router is not None:
+                        self.router.record(
+                            model, time.monotonic() - started, ok=not upstream_failure
+                        )
+                    if breaker is not None:
+                        if upstream_failure:
+                            breaker.record_failure()
+                        else:
+                            breaker.record_success()
+                    raise
+                latency = time.monotonic() - started
+                if adaptive is not None:
+                    adaptive.record_success(latency)
+            if self.router is not None:
+                self.router.record(model, latency, ok=True)
+            if breaker is not None:
+                breaker.record_success()
+            return parse(raw_text)
+
+        while True:
+            if breaker is not None and not breaker.allow_request():
+                logger.warning(
+                    "qwen_circuit_open",
+                    extra={"model": model, "user_id": user_id},
                 )
-                return self._parse_extract(raw_text)
+                raise CircuitOpenError(model)
+            # Only the half-open probe gets through in that state.
+            probing = breaker is not None and breaker.state == "half_open"
+            timeout = retry.attempt_timeout()
+            call = partial(attempt_once, user_prompt, retry.attempts - 1, timeout)
+            try:
+                # Never hedge the probe: the breaker allows exactly one call.
+                if tracker is not None and not probing:
+                    return await run_hedged(tracker, call, label=model)
+                return await call()
+            except asyncio.CancelledError:
+                # No outcome to record, but the probe must not stay taken.
+                if probing:
+                    breaker.release_probe()
+                raise
             except Exception as exc:
-                last_error = exc
+                delay = retry.next_delay(exc, classify=_is_retryable)
                 logger.error(
                     "qwen_invoke_error",
                     extra={
-                        "attempt": attempt + 1,
-                        "max_retries": self.max_retries,
+                        "attempt": retry.attempts,
+                        "max_retries": self.retry_policy.max_attempts,
+                        "remaining_seconds": round(retry.remaining(), 3),
+                        "will_retry": delay is not None,
                         "error": str(exc) or repr(exc),
                         "error_type": type(exc).__name__,
                     },
                 )
-                if attempt < self.max_retries - 1:
-                    await asyncio.sleep(2**attempt)
+                if isinstance(exc, DashScopeHTTPError) and exc.status_code == 429:
+                    if limiter is not None:
+                        limiter.pause(delay if delay is not None else exc.retry_after or 1.0)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                # Only malformed output benefits from a hint; HTTP errors
+                # would just make the retried prompt longer.
+                if isinstance(exc, ValueError):
+                    record_parse_retry()
                     user_prompt = self._append_retry_hint(user_prompt, str(exc))
-                    continue
 
-        logger.error(
-            "qwen_fallback",
-            extra={
-                "error": str(last_error),
-                "attempts": self.max_retries,
-                "user_id": report.user_id,
-            },
+    async def generate_hr_extracts(
+        self,
+        items: Sequence[Tuple[ReportIn, str]],
+        previous: Optional[Sequence[Optional[StoredReport]]] = None,
+    ) -> List[HRExtract]:
+        """Translate many ``(report, okr_brief)`` pairs, packing short ones per prompt.
+
+        Results come back in input order. Reports that do not fit a batch, and
+        batch elements that fail validation, go through :meth:`generate_hr_extract`.
+        ``previous`` lines up with ``items``; reports with a usable previous
+        report are translated incrementally instead of being batched.
+        """
+        results: List[Optional[HRExtract]] = [None] * len(items)
+
+        async def first_stage(index: int) -> None:
+            report, okr_brief = items[index]
+            results[index] = await self._triage(report, okr_brief)
+            if results[index] is None and previous is not None:
+                results[index] = await self._incremental_extract(
+                    report, okr_brief, previous[index]
+                )
+
+        async def full(index: int) -> None:
+            report, okr_brief = items[index]
+            results[index] = await self._full_extract(report, okr_brief)
+
+        await self._run_all(first_stage(index) for index in range(len(items)))
+        pending = [index for index, extract in enumerate(results) if extract is None]
+        if self.batch_max_tokens <= 0 or self.batch_max_reports <= 1 or len(pending) < 2:
+            await self._run_all(full(index) for index in pending)
+            return self._fill_missing(items, results)
+
+        by_model: Dict[str, List[Tuple[int, int]]] = {}
+        singles: List[int] = []
+        item_budget = self.batch_max_tokens // 2
+        for index in pending:
+            report, okr_brief = items[index]
+            cost = estimate_tokens(report.raw_text) + estimate_tokens(okr_brief)
+            if cost > item_budget:
+                singles.append(index)
+                continue
+            by_model.setdefault(self._route_model(report), []).append((index, cost))
+
+        async def batched(batch: List[int], model: str) -> None:
+            extracts = await self._extract_batch([items[index] for index in batch], model=model)
+            for index, extract in zip(batch, extracts):
+                if extract is None:
+                    singles.append(index)
+                else:
+                    results[index] = extract
+
+        overhead = estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(self._output_spec)
+        batches: List[Tuple[List[int], str]] = []
+        for model, costs in by_model.items():
+            for batch in pack_by_tokens(
+                costs,
+                budget=self.batch_max_tokens - overhead,
+                max_items=self.batch_max_reports,
+            ):
+                if len(batch) == 1:
+                    singles.extend(batch)
+                else:
+                    batches.append((batch, model))
+        await self._run_all(batched(batch, model) for batch, model in batches)
+        await self._run_all(full(index) for index in sorted(singles))
+        return self._fill_missing(items, results)
+
+    def _fill_missing(
+        self, items: Sequence[Tuple[ReportIn, str]], results: List[Optional[HRExtract]]
+    ) -> List[HRExtract]:
+        """One extract per input, in order; an empty slot gets the offline fallback."""
+        filled: List[HRExtract] = []
+        for (report, _), extract in zip(items, results):
+            if extract is None:
+                logger.error("qwen_batch_slot_missing", extra={"user_id": report.user_id})
+                extract = self._fallback_extract(report)
+            filled.append(extract)
+        return filled
+
+    async def _run_all(self, calls: Iterable[Awaitable[None]]) -> None:
+        """Sequential by default; concurrent when the adaptive limiter bounds it."""
+        if self.concurrency is None:
+            for call in calls:
+                await call
+            return
+        await asyncio.gather(*calls)
+
+    async def _extract_batch(
+        self, items: Sequence[Tuple[ReportIn, str]], *, model: str
+    ) -> List[Optional[HRExtract]]:
+        """One call for several reports; ``None`` marks elements to redo singly."""
+        user_prompt = _BATCH_TEMPLATE.render(
+            items=[
+                {"report": report.model_dump(), "okr_brief": okr_brief}
+                for report, okr_brief in items
+            ],
+            output_spec=self._output_spec,
+        )
+        try:
+            extracts = await self._complete(
+                SYSTEM_PROMPT,
+                user_prompt,
+                model=model,
+                parse=lambda raw: self._parse_batch(raw, len(items)),
+                user_id=",".join(report.user_id for report, _ in items),
+                expected_output_tokens=EXPECTED_OUTPUT_TOKENS * len(items),
+            )
+        except Exception as exc:
+            logger.warning(
+                "qwen_batch_failed",
+                extra={"reports": len(items), "model": model, "error": str(exc)},
+            )
+            return [None] * len(items)
+        failed = sum(1 for extract in extracts if extract is None)
+        logger.info(
+            "qwen_batch_completed",
+            extra={"reports": len(items), "failed": failed, "model": model},
         )
-        return self._fallback_extract(report)
+        if self.cache is not None:
+            api_mode = resolve_api_mode(model, self.api_mode)
+            for (report, okr_brief), extract in zip(items, extracts):
+                if extract is None:
+                    continue
+                system_prompt, single_prompt = self._render_prompts(report, okr_brief)
+                key = self.cache.make_key(model, api_mode, system_prompt, single_prompt)
+                await self.cache.put(key, extract)
+        return extracts
+
+    def _parse_batch(self, raw_text: str, expected: int) -> List[Optional[HRExtract]]:
+        # The array is wrapped in an object because compatible mode forces
+        # ``json_object`` output; a bare array is accepted as well.
+        data = loads_lenient(raw_text)
+        if isinstance(data, dict):
+            arrays = [value for value in data.values() if isinstance(value, list)]
+            data = arrays[0] if len(arrays) == 1 else None
+        if not isinstance(data, list):
+            raise ValueError("Batch response is not a JSON array.")
+        results: List[Optional[HRExtract]] = [None] * expected
+        for position, element in enumerate(data):
+            if not isinstance(element, dict):
+                continue
+            element = _expand_compact_keys(element)
+            index = element.get("index", position)
+            if not isinstance(index, int) or not 0 <= index < expected:
+                continue
+            if not str(element.get("hr_summary") or "").strip():
+                continue
+            try:
+                results[index] = HRExtract.model_validate(
+                    self._sanitize_extract_payload(element)
+                )
+            except ValueError:
+                continue
+        return results
+
+    def _http_client(self) -> httpx.AsyncClient:
+        """Injected client, else the app-wide pool, else a lazily built own pool."""
+        if self._client is not None:
+            return self._client
+        shared = get_shared_client()
+        if shared is not None:
+            return shared
+        if self._owned_client is None or self._owned_client.is_closed:
+            self._owned_client = httpx.AsyncClient(trust_env=self.trust_env)
+        return self._owned_client
+
+    async def aclose(self) -> None:
+        if self._owned_client is not None:
+            await self._owned_client.aclose()
+            self._owned_client = None
 
     def _append_retry_hint(self, prompt: str, error: str) -> str:
         hint = "\n\n注意：上一轮输出未通过JSON校验，必须输出有效JSON对象。错误:" + error
@@ -126,7 +886,11 @@ class QwenClient:
         attempt: int,
         *,
         timeout: float,
+        model: Optional[str] = None,
+        api_mode: Optional[str] = None,
     ) -> str:
+        model = model or self.model
+        api_mode = api_mode or self.api_mode
         timeout_config = httpx.Timeout(
             timeout,
             connect=min(timeout, 10.0),
@@ -134,86 +898,177 @@ class QwenClient:
             write=min(timeout, 10.0),
             pool=timeout,
         )
-        client = self._client or httpx.AsyncClient(
-            timeout=timeout_config, trust_env=self.trust_env
-        )
-        should_close = self._client is None
-        try:
-            headers = {"Content-Type": "application/json"}
-            if self.api_key:
-                headers["Authorization"] = f"Bearer {self.api_key}"
-
-            if self.api_mode == "compatible":
-                payload = {
-                    "model": self.model,
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt},
-                    ],
-                    "response_format": {"type": "json_object"},
-                }
-                response = await client.post(
-                    CHAT_COMPLETION_URL, json=payload, headers=headers
-                )
-                if response.status_code in {429, 500, 502, 503, 504}:
-                    raise RuntimeError(
-                        f"DashScope temporary error: {response.status_code}"
-                    )
+        client = self._http_client()
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        url, payload = self._build_request(system_prompt, user_prompt, model, api_mode)
+
+        if self.stream:
+            text = await self._invoke_stream(
+                client, url, payload, headers, timeout, api_mode
+            )
+        elif api_mode == "compatible":
+            response = await client.post(
+                url, json=payload, headers=headers, timeout=timeout_config
+            )
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                raise DashScopeHTTPError.from_response(response)
+            try:
+                response.raise_for_status()
+            except httpx.HTTPStatusError as exc:
                 try:
-                    response.raise_for_status()
-                except httpx.HTTPStatusError as exc:
-                    try:
-                        detail = response.json()
-                    except Exception:
-                        detail = response.text
-                    logger.error(
-                        "qwen_http_error",
-                        extra={
-                            "status_code": response.status_code,
-                            "detail": detail,
-                        },
-                    )
-                    raise exc
-                text = self._extract_chat_text(response)
-            else:
-                combined_prompt = self._combine_prompts(system_prompt, user_prompt)
-                payload = {
-                    "model": self.model,
-                    "input": {
-                        "messages": [
-                            {"role": "user", "content": combined_prompt},
-                        ]
+                    detail = response.json()
+                except Exception:
+                    detail = response.text
+                logger.error(
+                    "qwen_http_error",
+                    extra={
+                        "status_code": response.status_code,
+                        "detail": detail,
                     },
-                }
-                response = await client.post(
-                    TEXT_GENERATION_URL, json=payload, headers=headers
                 )
-                if response.status_code in {429, 500, 502, 503, 504}:
-                    raise RuntimeError(
-                        f"DashScope temporary error: {response.status_code}"
-                    )
-                response.raise_for_status()
-                text = self._extract_text(response)
+                raise exc
+            text = self._extract_chat_text(response)
+        else:
+            response = await client.post(
+                url, json=payload, headers=headers, timeout=timeout_config
+            )
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                raise DashScopeHTTPError.from_response(response)
+            response.raise_for_status()
+            text = self._extract_text(response)
 
-            json.loads(text)  # validate before returning
-            return text
-        finally:
-            if should_close:
-                await client.aclose()
+        return text
 
-    def _timeout_for_attempt(self, attempt: int) -> float:
-        base = max(20.0, self.timeout)
-        factor = 2.0**attempt
-        return min(base * factor, 120.0)
+    def _build_request(
+        self, system_prompt: str, user_prompt: str, model: str, api_mode: str
+    ) -> Tuple[str, Dict[str, Any]]:
+        if api_mode == "compatible":
+            return self.base_url + CHAT_COMPLETION_PATH, {
+                "model": model,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                "response_format": {"type": "json_object"},
+            }
+        combined_prompt = self._combine_prompts(system_prompt, user_prompt)
+        return self.base_url + TEXT_GENERATION_PATH, {
+            "model": model,
+            "input": {
+                "messages": [
+                    {"role": "user", "content": combined_prompt},
+                ]
+            },
+        }
+
+    async def _invoke_stream(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        payload: Dict[str, Any],
+        headers: Dict[str, str],
+        timeout: float,
+        api_mode: str,
+    ) -> str:
+        """Consume DashScope incremental output; the read timeout applies per chunk."""
+        payload = dict(payload)
+        headers = {**headers, "Accept": "text/event-stream"}
+        if api_mode == "compatible":
+            payload["stream"] = True
+        else:
+            headers["X-DashScope-SSE"] = "enable"
+            payload["parameters"] = {"incremental_output": True}
+        timeout_config = httpx.Timeout(
+            timeout,
+            connect=min(timeout, 10.0),
+            read=self.stream_idle_timeout,
+            write=min(timeout, 10.0),
+            pool=timeout,
+        )
+        started = time.monotonic()
+        scanner = IncrementalJSONFields()
+        parts: List[str] = []
+        async with client.stream(
+            "POST", url, json=payload, headers=headers, timeout=timeout_config
+        ) as response:
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                raise DashScopeHTTPError.from_response(response)
+            if response.is_error:
+                await response.aread()
+                logger.error(
+                    "qwen_http_error",
+                    extra={"status_code": response.status_code, "detail": response.text},
+                )
+                response.raise_for_status()
+            async for data in iter_sse_data(response):
+                delta = stream_delta(json.loads(data), api_mode)
+                if not delta:
+                    continue
+                parts.append(delta)
+                for field, value in scanner.feed(delta):
+                    if self.compact_output:
+                        field = COMPACT_KEYS.get(field, field)
+                    if field in EARLY_STREAM_FIELDS:
+                        self._on_stream_field(field, value, time.monotonic() - started)
+        text = "".join(parts)
+        if not text:
+            raise ValueError("DashScope stream returned no content.")
+        return text
+
+    def _on_stream_field(self, field: str, value: str, elapsed: float) -> None:
+        logger.info(
+            "qwen_stream_field",
+            extra={"field": field, "elapsed_ms": int(elapsed * 1000)},
+        )
+        if self.on_partial is not None:
+            self.on_partial(field, value)
 
     def _parse_extract(self, raw_text: str) -> HRExtract:
-        data = json.loads(raw_text)
+        data = loads_lenient(raw_text)
+        if not isinstance(data, dict):
+            raise ValueError("DashScope output is not a JSON object.")
         sanitized = self._sanitize_extract_payload(data)
+        # A repair of badly truncated output (``{"hr_su``) yields ``{}``, which
+        # would validate as an empty extract and be cached; retry it instead.
+        if not sanitized["hr_summary"].strip():
+            raise ValueError("DashScope output has no hr_summary.")
         return HRExtract.model_validate(sanitized)
 
     def _render_prompts(self, report: ReportIn, okr_brief: str) -> Tuple[str, str]:
-        template = self._jinja_env.from_string(USER_PROMPT_TEMPLATE)
-        user_prompt = template.render(report=report.model_dump(), okr_brief=okr_brief)
+        report_data = report.model_dump()
+        user_prompt = _USER_TEMPLATE.render(
+            report=report_data, okr_brief=okr_brief, output_spec=self._output_spec
+        )
+        prompt_tokens = estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(user_prompt)
+        budget = self.prompt_budget
+        if budget is not None and prompt_tokens > budget.max_input_tokens:
+            overhead = (
+                prompt_tokens - estimate_tokens(report.raw_text) - estimate_tokens(okr_brief)
+            )
+            raw, okr = budget.fit(report.raw_text, okr_brief, overhead)
+            report_data["raw_text"] = raw.text
+            user_prompt = _USER_TEMPLATE.render(
+                report=report_data, okr_brief=okr.text, output_spec=self._output_spec
+            )
+            budgeted_tokens = estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(user_prompt)
+            logger.warning(
+                "qwen_prompt_truncated",
+                extra={
+                    "user_id": report.user_id,
+                    "tokens_before": prompt_tokens,
+                    "tokens_after": budgeted_tokens,
+                    "max_input_tokens": budget.max_input_tokens,
+                    "report_lines_dropped": raw.dropped_lines,
+                    "okr_lines_dropped": okr.dropped_lines,
+                },
+            )
+            prompt_tokens = budgeted_tokens
+        logger.info(
+            "qwen_prompt_size",
+            extra={"user_id": report.user_id, "tokens": prompt_tokens, "chars": len(user_prompt)},
+        )
         return SYSTEM_PROMPT, user_prompt
 
     def _combine_prompts(self, system_prompt: str, user_prompt: str) -> str:
@@ -270,9 +1125,11 @@ class QwenClient:
             ),
             next_actions=next_actions,
             risk_level="medium" if "风险" in raw else "low",
+            needs_retranslation=True,
         )
 
     def _sanitize_extract_payload(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        data = _expand_compact_keys(data)
         result: Dict[str, Any] = {}
         result["hr_summary"] = self._ensure_string(data.get("hr_summary", ""))
         result["risks"] = self._normalize_risks(data.get("risks"))
@@ -404,7 +1261,12 @@ class DummyQwenClient(QwenClient):
         super().__init__(api_key=None, model="dummy", trust_env=False, api_mode="text")
         self._response = response
 
-    async def generate_hr_extract(self, report: ReportIn, okr_brief: str) -> HRExtract:
+    async def generate_hr_extract(
+        self,
+        report: ReportIn,
+        okr_brief: str,
+        previous: Optional[StoredReport] = None,
+    ) -> HRExtract:
         return self._response
 
     def _fallback_extract(self, report: ReportIn) -> HRExtract:
@@ -414,3 +1276,33 @@ class DummyQwenClient(QwenClient):
         self, system_prompt: str, user_prompt: str, attempt: int
     ) -> str:
         raise RuntimeError("Dummy client should not invoke completion.")
+
+
+def build_qwen_client(
+    settings: Settings, http_client: Optional[httpx.AsyncClient] = None
+) -> QwenClient:
+    return QwenClient(
+        api_key=settings.dashscope_api_key,
+        model=settings.qwen_model,
+        timeout=settings.request_timeout,
+        http_client=http_client,
+        api_mode=settings.qwen_api_mode,
+        deadline=settings.qwen_deadline_seconds,
+        trust_env=settings.http_trust_env,
+        cache=build_extraction_cache(settings),
+        stream=settings.qwen_stream,
+        stream_idle_timeout=settings.qwen_stream_idle_timeout,
+        rate_limits=RateLimitConfig.from_settings(settings),
+        breaker=BreakerConfig.from_settings(settings),
+        hedge=HedgeConfig.from_settings(settings),
+        router=build_model_router(settings),
+        batch_max_tokens=settings.qwen_batch_max_tokens,
+        batch_max_reports=settings.qwen_batch_max_reports,
+        prompt_budget=PromptBudget.from_settings(settings),
+        compact_output=settings.qwen_compact_output,
+        cascade=CascadeConfig.from_settings(settings),
+        incremental=IncrementalConfig.from_settings(settings),
+        chunking=ChunkConfig.from_settings(settings),
+        concurrency=AIMDConfig.from_settings(settings),
+        base_url=settings.dashscope_base_url,
+    )
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import weakref
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Optional
+
+from ..config import Settings
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TokenBucket:
+    """Classic token bucket; waiters are served in arrival order."""
+
+    def __init__(self, capacity: float, per_seconds: float = 60.0) -> None:
+        self.capacity = float(capacity)
+        self.rate = self.capacity / per_seconds
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """Take ``amount`` tokens, returning the seconds spent waiting."""
+        amount = min(float(amount), self.capacity)
+        waited = 0.0
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+    def utilisation(self) -> float:
+        elapsed = time.monotonic() - self._updated
+        available = min(self.capacity, self.tokens + elapsed * self.rate)
+        return round(1.0 - available / self.capacity, 3)
+
+
+class ModelRateLimiter:
+    """Per-model requests/min, estimated tokens/min and max-in-flight governor."""
+
+    def __init__(
+        self,
+        model: str,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_in_flight: int = 0,
+    ) -> None:
+        self.model = model
+        self.max_in_flight = max_in_flight
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self._slots = asyncio.Semaphore(max_in_flight) if max_in_flight > 0 else None
+        self._paused_until = 0.0
+        self._in_flight = 0
+        self._throttled = 0
+        self._wait_seconds = 0.0
+        self._retry_after_pauses = 0
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int = 0) -> AsyncIterator[None]:
+        started = time.monotonic()
+        pause = self._paused_until - started
+        if pause > 0:
+            await asyncio.sleep(pause)
+        if self._slots is not None:
+            await self._slots.acquire()
+        try:
+            if self._requests is not None:
+                await self._requests.acquire(1)
+            if self._tokens is not None and estimated_tokens:
+                await self._tokens.acquire(estimated_tokens)
+            waited = time.monotonic() - started
+            if waited > 0.01:
+                self._throttled += 1
+                self._wait_seconds += waited
+            self._in_flight += 1
+            try:
+                yield
+            finally:
+                self._in_flight -= 1
+        finally:
+            if self._slots is not None:
+                self._slots.release()
+
+    def pause(self, seconds: float) -> None:
+        """Hold back new calls, e.g. for a server-provided ``Retry-After``."""
+        until = time.monotonic() + max(0.0, seconds)
+        if until > self._paused_until:
+            self._paused_until = until
+            self._retry_after_pauses += 1
+            logger.warning(
+                "qwen_rate_limit_pause", extra={"model": self.model, "seconds": seconds}
+            )
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self._in_flight,
+            "max_in_flight": self.max_in_flight,
+            "rpm_utilisation": self._requests.utilisation() if self._requests else 0.0,
+            "tpm_utilisation": self._tokens.utilisation() if self._tokens else 0.0,
+            "throttled_calls": self._throttled,
+            "throttled_wait_seconds": round(self._wait_seconds, 3),
+            "retry_after_pauses": self._retry_after_pauses,
+            "paused_for_seconds": round(max(0.0, self._paused_until - time.monotonic()), 3),
+        }
+
+
+@dataclass(frozen=True)
+class RateLimitConfig:
+    requests_per_minute: int = 0
+    tokens_per_minute: int = 0
+    max_in_flight: int = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> Optional["RateLimitConfig"]:
+        config = cls(
+            requests_per_minute=settings.qwen_rpm,
+            tokens_per_minute=settings.qwen_tpm,
+            max_in_flight=settings.qwen_max_in_flight,
+        )
+        if not (config.requests_per_minute or config.tokens_per_minute or config.max_in_flight):
+            return None
+        return config
+
+
+# asyncio primitives are bound to one event loop, so limiters are kept per loop.
+_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, ModelRateLimiter]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_rate_limiter(model: str, config: RateLimitConfig) -> ModelRateLimiter:
+    """Return the limiter for ``model`` shared by every caller on this loop."""
+    per_loop = _limiters.setdefault(asyncio.get_running_loop(), {})
+    key = model.lower()
+    limiter = per_loop.get(key)
+    if limiter is None:
+        limiter = ModelRateLimiter(
+            model,
+            requests_per_minute=config.requests_per_minute,
+            tokens_per_minute=config.tokens_per_minute,
+            max_in_flight=config.max_in_flight,
+        )
+        per_loop[key] = limiter
+    return limiter
+
+
+def rate_limiter_metrics() -> Dict[str, Any]:
+    metrics: Dict[str, Any] = {}
+    for per_loop in list(_limiters.values()):
+        for model, limiter in per_loop.items():
+            metrics[model] = limiter.metrics()
+    return metrics
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, FrozenSet, List, Optional, Tuple
+
+from ..config import Settings
+from ..schemas import ReportIn
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class RoutingRule:
+    """``periods:length:model`` — e.g. ``daily,weekly:<=400:qwen-turbo``."""
+
+    model: str
+    period_types: FrozenSet[str] = frozenset()
+    min_chars: Optional[int] = None
+    max_chars: Optional[int] = None
+
+    def matches(self, period_type: str, chars: int) -> bool:
+        if self.period_types and period_type not in self.period_types:
+            return False
+        if self.min_chars is not None and chars < self.min_chars:
+            return False
+        if self.max_chars is not None and chars > self.max_chars:
+            return False
+        return True
+
+
+def parse_routing_rules(raw: str) -> List[RoutingRule]:
+    """Parse QWEN_ROUTING_RULES; malformed entries are skipped with a warning."""
+    rules: List[RoutingRule] = []
+    for entry in raw.split(";"):
+        entry = entry.strip()
+        if not entry:
+            continue
+        parts = [part.strip() for part in entry.split(":")]
+        if len(parts) != 3 or not parts[2]:
+            logger.warning("qwen_routing_rule_invalid", extra={"rule": entry})
+            continue
+        periods, length, model = parts
+        period_types = frozenset(
+            item.strip().lower() for item in periods.split(",") if item.strip() not in {"", "*"}
+        )
+        min_chars: Optional[int] = None
+        max_chars: Optional[int] = None
+        try:
+            if length.startswith("<="):
+                max_chars = int(length[2:])
+            elif length.startswith(">="):
+                min_chars = int(length[2:])
+            elif length not in {"", "*"}:
+                raise ValueError(length)
+        except ValueError:
+            logger.warning("qwen_routing_rule_invalid", extra={"rule": entry})
+            continue
+        rules.append(RoutingRule(model, period_types, min_chars, max_chars))
+    return rules
+
+
+class ModelHealth:
+    """Rolling latency / outcome window for one model.
+
+    Samples older than ``max_age`` seconds are dropped, so a model that was
+    failed over from falls below ``min_samples`` and gets traffic again.
+    """
+
+    def __init__(self, window: int = 50, max_age: float = 0.0) -> None:
+        self._samples: Deque[Tuple[float, float, bool]] = deque(maxlen=max(1, window))
+        self.max_age = max_age
+        self.routed = 0
+
+    def record(self, latency: float, ok: bool) -> None:
+        self._samples.append((time.monotonic(), latency, ok))
+
+    def _prune(self) -> None:
+        if self.max_age <= 0:
+            return
+        cutoff = time.monotonic() - self.max_age
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+
+    @property
+    def samples(self) -> int:
+        self._prune()
+        return len(self._samples)
+
+    def error_rate(self) -> float:
+        self._prune()
+        if not self._samples:
+            return 0.0
+        return sum(1 for _, _, ok in self._samples if not ok) / len(self._samples)
+
+    def latency_percentile(self, percentile: float = 0.9) -> Optional[float]:
+        self._prune()
+        latencies = sorted(latency for _, latency, ok in self._samples if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(percentile * len(latencies)))]
+
+    def metrics(self) -> Dict[str, Any]:
+        p50 = self.latency_percentile(0.5)
+        p90 = self.latency_percentile(0.9)
+        return {
+            "routed": self.routed,
+            "samples": self.samples,
+            "error_rate": round(self.error_rate(), 3),
+            "p50_seconds": round(p50, 3) if p50 is not None else None,
+            "p90_seconds": round(p90, 3) if p90 is not None else None,
+        }
+
+
+_health: Dict[str, ModelHealth] = {}
+
+
+def get_model_health(model: str, window: int = 50, max_age: float = 0.0) -> ModelHealth:
+    key = model.lower()
+    health = _health.get(key)
+    if health is None:
+        health = ModelHealth(window, max_age)
+        _health[key] = health
+    return health
+
+
+def router_metrics() -> Dict[str, Any]:
+    return {model: health.metrics() for model, health in _health.items()}
+
+
+class ModelRouter:
+    """Pick a Qwen model per report from ordered rules and recent model health.
+
+    Every rule matching the report's ``period_type`` and character count is a
+    candidate, in rule order, followed by ``default_model``. The first
+    candidate whose rolling error rate and p90 latency are within bounds wins;
+    when all of them look unhealthy the one with the lowest error rate is used.
+    Health only reflects the last ``sample_ttl`` seconds.
+    """
+
+    def __init__(
+        self,
+        rules: List[RoutingRule],
+        default_model: str,
+        window: int = 50,
+        max_error_rate: float = 0.5,
+        max_latency: float = 0.0,
+        min_samples: int = 5,
+        sample_ttl: float = 300.0,
+    ) -> None:
+        self.rules = rules
+        self.default_model = default_model
+        self.window = window
+        self.max_error_rate = max_error_rate
+        self.max_latency = max_latency
+        self.min_samples = min_samples
+        self.sample_ttl = sample_ttl
+
+    def candidates(self, report: ReportIn) -> List[str]:
+        chars = len(report.raw_text)
+        models: List[str] = []
+        for rule in self.rules:
+            if rule.matches(report.period_type, chars) and rule.model not in models:
+                models.append(rule.model)
+        if self.default_model not in models:
+            models.append(self.default_model)
+        return models
+
+    def is_healthy(self, model: str) -> bool:
+        health = self._model_health(model)
+        if health.samples < self.min_samples:
+            return True
+        if health.error_rate() > self.max_error_rate:
+            return False
+        if self.max_latency > 0:
+            p90 = health.latency_percentile(0.9)
+            if p90 is not None and p90 > self.max_latency:
+                return False
+        return True
+
+    def choose(self, report: ReportIn) -> str:
+        candidates = self.candidates(report)
+        chosen = next((model for model in candidates if self.is_healthy(model)), None)
+        if chosen is None:
+            chosen = min(
+                candidates, key=lambda model: self._model_health(model).error_rate()
+            )
+        if chosen != candidates[0]:
+            logger.info(
+                "qwen_route_degraded",
+                extra={"preferred": candidates[0], "model": chosen, "user_id": report.user_id},
+            )
+        self._model_health(chosen).routed += 1
+        return chosen
+
+    def record(self, model: str, latency: float, ok: bool) -> None:
+        self._model_health(model).record(latency, ok)
+
+    def _model_health(self, model: str) -> ModelHealth:
+        return get_model_health(model, self.window, self.sample_ttl)
+
+
+def build_model_router(settings: Settings) -> Optional[ModelRouter]:
+    rules = parse_routing_rules(settings.qwen_routing_rules)
+    if not rules:
+        return None
+    return ModelRouter(
+        rules,
+        default_model=settings.qwen_model,
+        window=settings.qwen_router_window,
+        max_error_rate=settings.qwen_router_max_error_rate,
+        max_latency=settings.qwen_router_max_latency_seconds,
+        sample_ttl=settings.qwen_router_sample_ttl_seconds,
+    )
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+
+
+async def iter_sse_data(response: httpx.Response) -> AsyncIterator[str]:
+    """Yield the ``data:`` payloads of a server-sent-events response."""
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if not data:
+            continue
+        if data == "[DONE]":
+            return
+        yield data
+
+
+def stream_delta(event: Dict[str, Any], api_mode: str) -> str:
+    """Extract the incremental text carried by one DashScope stream event."""
+    if api_mode == "compatible":
+        choices = event.get("choices") or []
+        if choices:
+            delta = choices[0].get("delta") or {}
+            return delta.get("content") or ""
+        return ""
+    output = event.get("output") or {}
+    if output.get("text"):
+        return output["text"]
+    choices = output.get("choices") or []
+    if choices:
+        message = choices[0].get("message") or {}
+        return message.get("content") or ""
+    return ""
+
+
+class IncrementalJSONFields:
+    """Scan a growing JSON object and surface top-level string fields early.
+
+    Only string values directly under the root object are reported, which is
+    enough to show ``hr_summary`` and ``risk_level`` before the full body ends.
+    Leading prose or a Markdown fence before the first ``{`` is ignored.
+    """
+
+    def __init__(self) -> None:
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._expect_key = False
+        self._current_key: Optional[str] = None
+        self.fields: Dict[str, str] = {}
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        self._text += chunk
+        completed: List[Tuple[str, str]] = []
+        text = self._text
+        while self._pos < len(text):
+            char = text[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._on_string(text[self._string_start : self._pos + 1], completed)
+            elif char == '"':
+                if self._depth >= 1:
+                    self._in_string = True
+                    self._string_start = self._pos
+            elif char in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    self._expect_key = True
+            elif char in "}]":
+                self._depth = max(0, self._depth - 1)
+            elif char == "," and self._depth == 1:
+                self._expect_key = True
+                self._current_key = None
+            self._pos += 1
+        return completed
+
+    def _on_string(self, literal: str, completed: List[Tuple[str, str]]) -> None:
+        try:
+            value = json.loads(literal)
+        except json.JSONDecodeError:
+            return
+        if self._expect_key:
+            self._current_key = value
+            self._expect_key = False
+            return
+        if self._current_key is not None and self._current_key not in self.fields:
+            self.fields[self._current_key] = value
+            completed.append((self._current_key, value))
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import re
+from typing import Tuple
+
+_CJK_RE = re.compile(r"[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uff00-\uffef]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough Qwen token count: ~1 token per CJK char, ~4 chars per token otherwise."""
+    if not text:
+        return 0
+    cjk = len(_CJK_RE.findall(text))
+    other = len(text) - cjk
+    return cjk + (other + 3) // 4
+
+
+# Report wording shared by the keyword heuristics (triage, message gate).
+HIGH_RISK_KEYWORDS = ("阻塞", "故障", "事故", "无法", "严重", "离职", "停滞", "失败", "blocker", "outage")
+MEDIUM_RISK_KEYWORDS = ("风险", "延期", "延迟", "卡点", "卡住", "依赖", "问题", "求助", "不稳定", "risk", "delay")
+
+CJK_BIGRAM_RE = re.compile(r"[一-鿿]{2}")
+# "O1KR2", "O1 KR2" or "KR3"; OKR_ID_RE also matches a bare objective ("O2").
+KR_ID_RE = re.compile(r"(?<![A-Za-z0-9])(O\d+\s*KR\d+|KR\d+)(?![0-9])", re.IGNORECASE)
+OKR_ID_RE = re.compile(r"(?<![A-Za-z0-9])(O\d+\s*KR\d+|KR\d+|O\d+)(?![0-9])", re.IGNORECASE)
+
+
+def okr_ids(text: str, pattern: "re.Pattern[str]" = KR_ID_RE) -> Tuple[str, ...]:
+    """Normalised OKR ids mentioned in ``text`` ("o1 kr2" -> "O1KR2"), first mention first."""
+    return tuple(dict.fromkeys(match.replace(" ", "").upper() for match in pattern.findall(text)))
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, FrozenSet, List, Literal, Optional
+
+from ..config import Settings
+from ..schemas import HRExtract, OKRAlignment, ReportIn
+from .tokens import CJK_BIGRAM_RE, HIGH_RISK_KEYWORDS, MEDIUM_RISK_KEYWORDS, okr_ids
+
+TriageMode = Literal["heuristic", "model"]
+
+
+TRIAGE_SYSTEM_PROMPT = "你是报告分诊助手，只判断风险等级和是否涉及OKR。严格输出JSON。"
+
+TRIAGE_PROMPT_TEMPLATE = """
+【报告文本】
+{{ report.raw_text }}
+
+【该人员OKR（摘要）】
+{{ okr_brief }}
+
+请输出 JSON：{"v": "l|m|h", "okr": true, "c": 0.0, "s": "不超过60字的通俗总结"}
+v 为整体风险等级，okr 表示是否涉及上述OKR，c 为你对判断的置信度（0~1）。
+""".strip()
+
+_LEVELS = {"l": "low", "m": "medium", "h": "high", "low": "low", "medium": "medium", "high": "high"}
+
+
+@dataclass(frozen=True)
+class TriageResult:
+    risk_level: str
+    mentions_okr: bool
+    confidence: float
+    summary: str
+    hit_krs: tuple = ()
+
+
+@dataclass(frozen=True)
+class CascadeConfig:
+    mode: TriageMode = "heuristic"
+    triage_model: str = "qwen-turbo"
+    min_confidence: float = 0.7
+    period_types: FrozenSet[str] = frozenset({"daily"})
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> Optional["CascadeConfig"]:
+        if settings.qwen_triage_mode == "off":
+            return None
+        periods = frozenset(
+            item.strip().lower()
+            for item in settings.qwen_triage_periods.split(",")
+            if item.strip()
+        )
+        return cls(
+            mode=settings.qwen_triage_mode,
+            triage_model=settings.qwen_triage_model,
+            min_confidence=settings.qwen_triage_min_confidence,
+            period_types=periods,
+        )
+
+    def applies_to(self, report: ReportIn) -> bool:
+        return not self.period_types or report.period_type in self.period_types
+
+    def should_escalate(self, result: TriageResult) -> bool:
+        return result.risk_level != "low" or result.confidence < self.min_confidence
+
+
+def heuristic_triage(report: ReportIn, okr_brief: str) -> TriageResult:
+    """Keyword triage; confident only for short reports with no risk wording."""
+    text = report.raw_text or ""
+    lowered = text.lower()
+    high = sum(1 for keyword in HIGH_RISK_KEYWORDS if keyword in lowered)
+    medium = sum(1 for keyword in MEDIUM_RISK_KEYWORDS if keyword in lowered)
+    if high:
+        level, confidence = "high", 0.8
+    elif medium:
+        level, confidence = "medium", 0.7
+    else:
+        # Long routine-looking text may still hide something; trust it less.
+        level, confidence = "low", 0.9 if len(text) <= 300 else 0.6 if len(text) <= 1000 else 0.4
+    hit_krs = okr_ids(text)
+    overlap = set(CJK_BIGRAM_RE.findall(text)) & set(CJK_BIGRAM_RE.findall(okr_brief or ""))
+    summary = " ".join(text.split())
+    if len(summary) > 120:
+        summary = summary[:120] + "..."
+    return TriageResult(level, bool(hit_krs) or len(overlap) >= 3, confidence, summary, hit_krs)
+
+
+def parse_model_triage(data: Dict[str, Any], report: ReportIn) -> TriageResult:
+    level = _LEVELS.get(str(data.get("v") or data.get("risk_level") or "").strip().lower())
+    if level is None:
+        raise ValueError("Triage output is missing a risk level.")
+    try:
+        confidence = min(1.0, max(0.0, float(data.get("c", data.get("confidence", 0.0)))))
+    except (TypeError, ValueError):
+        confidence = 0.0
+    summary = str(data.get("s") or data.get("summary") or "").strip()
+    if not summary:
+        summary = heuristic_triage(report, "").summary
+    hit_krs = okr_ids(report.raw_text)
+    return TriageResult(level, bool(data.get("okr")), confidence, summary, hit_krs)
+
+
+_LIGHT_NEXT_ACTIONS = {
+    "daily": "保持日报节奏，补充风险与需求。",
+    "weekly": "请在下次周会上同步关键进展。",
+    "monthly": "整理本月成果，准备月度复盘资料。",
+}
+
+
+def light_extract(result: TriageResult, report: ReportIn) -> HRExtract:
+    """Lightweight extract for a routine report that was not escalated."""
+    next_actions = [_LIGHT_NEXT_ACTIONS.get(report.period_type, _LIGHT_NEXT_ACTIONS["daily"])]
+    return HRExtract(
+        hr_summary=result.summary,
+        risks=[],
+        needs=[],
+        okr_alignment=OKRAlignment(
+            hit_objectives=[],
+            hit_krs=list(result.hit_krs),
+            gaps=[] if result.mentions_okr else ["报告未明显涉及OKR，需关注与目标的关联。"],
+            confidence=round(result.confidence * (0.6 if result.mentions_okr else 0.3), 2),
+        ),
+        next_actions=next_actions,
+        risk_level=result.risk_level,
+        light=True,
+    )
+
+
+class CascadeStats:
+    """Escalation rate and per-stage latency of the triage cascade."""
+
+    def __init__(self, window: int = 500) -> None:
+        self.triaged = 0
+        self.escalated = 0
+        self.triage_failures = 0
+        self._stage_latency: Dict[str, Deque[float]] = {
+            "triage": deque(maxlen=window),
+            "full": deque(maxlen=window),
+        }
+
+    def record_stage(self, stage: str, seconds: float) -> None:
+        self._stage_latency[stage].append(seconds)
+
+    def metrics(self) -> Dict[str, Any]:
+        stages: Dict[str, Any] = {}
+        for stage, samples in self._stage_latency.items():
+            ordered: List[float] = sorted(samples)
+            stages[stage] = {
+                "samples": len(ordered),
+                "p50_ms": round(ordered[len(ordered) // 2] * 1000, 1) if ordered else None,
+                "p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))] * 1000, 1)
+                if ordered
+                else None,
+            }
+        return {
+            "triaged": self.triaged,
+            "escalated": self.escalated,
+            "escalation_rate": round(self.escalated / self.triaged, 3) if self.triaged else 0.0,
+            "triage_failures": self.triage_failures,
+            "latency": stages,
+        }
+
+
+_stats = CascadeStats()
+
+
+def get_cascade_stats() -> CascadeStats:
+    return _stats
+
+
+def cascade_metrics() -> Dict[str, Any]:
+    return _stats.metrics()
@@ -13,12 +13,23 @@ StorageDriver = Literal["csv", "sheet", "bitable"]
 OKRSourceType = Literal["cache", "sheet", "bitable"]
 
 
+COMPATIBLE_ONLY_MODELS = {"qwen-plus", "qwen-long", "qwen-turbo"}
+
+
+def resolve_api_mode(model: str, api_mode: str) -> str:
+    """Return the DashScope API mode to use for ``model`` given the configured mode."""
+    if api_mode == "text" and model.lower() in COMPATIBLE_ONLY_MODELS:
+        return "compatible"
+    return api_mode
+
+
 class Settings(BaseSettings):
     """Application runtime configuration parsed from environment variables."""
 
     app_port: int = Field(default=8080, alias="APP_PORT")
     base_url: str = Field(default="http://localhost:8080", alias="APP_BASE_URL")
 
+    feishu_base_url: str = Field(default="https://open.feishu.cn", alias="FEISHU_BASE_URL")
     feishu_app_id: Optional[str] = Field(default=None, alias="FEISHU_APP_ID")
     feishu_app_secret: Optional[str] = Field(default=None, alias="FEISHU_APP_SECRET")
     feishu_bot_verification_token: str = Field(
@@ -32,11 +43,91 @@ class Settings(BaseSettings):
     )
 
     dashscope_api_key: Optional[str] = Field(default=None, alias="DASHSCOPE_API_KEY")
+    dashscope_base_url: str = Field(
+        default="https://dashscope.aliyuncs.com", alias="DASHSCOPE_BASE_URL"
+    )
     qwen_model: str = Field(default="qwen-max", alias="QWEN_MODEL")
     qwen_api_mode: Literal["text", "compatible"] = Field(
         default="text", alias="QWEN_API_MODE"
     )
 
+    qwen_deadline_seconds: float = Field(default=90.0, alias="QWEN_DEADLINE_SECONDS")
+    qwen_rpm: int = Field(default=0, alias="QWEN_REQUESTS_PER_MINUTE")
+    qwen_tpm: int = Field(default=0, alias="QWEN_TOKENS_PER_MINUTE")
+    qwen_max_in_flight: int = Field(default=8, alias="QWEN_MAX_IN_FLIGHT")
+    qwen_aimd_max_concurrency: int = Field(default=0, alias="QWEN_AIMD_MAX_CONCURRENCY")
+    qwen_aimd_min_concurrency: int = Field(default=1, alias="QWEN_AIMD_MIN_CONCURRENCY")
+    qwen_aimd_initial_concurrency: int = Field(
+        default=4, alias="QWEN_AIMD_INITIAL_CONCURRENCY"
+    )
+    qwen_aimd_latency_target_seconds: float = Field(
+        default=20.0, alias="QWEN_AIMD_LATENCY_TARGET_SECONDS"
+    )
+    qwen_aimd_decrease_factor: float = Field(default=0.5, alias="QWEN_AIMD_DECREASE_FACTOR")
+    qwen_breaker_failure_threshold: int = Field(
+        default=5, alias="QWEN_BREAKER_FAILURE_THRESHOLD"
+    )
+    qwen_breaker_reset_seconds: float = Field(
+        default=30.0, alias="QWEN_BREAKER_RESET_SECONDS"
+    )
+    qwen_hedge_enabled: bool = Field(default=False, alias="QWEN_HEDGE_ENABLED")
+    qwen_hedge_percentile: float = Field(default=0.95, alias="QWEN_HEDGE_PERCENTILE")
+    qwen_hedge_budget_ratio: float = Field(
+        default=0.1, alias="QWEN_HEDGE_BUDGET_RATIO"
+    )
+    qwen_hedge_min_samples: int = Field(default=20, alias="QWEN_HEDGE_MIN_SAMPLES")
+    qwen_routing_rules: str = Field(default="", alias="QWEN_ROUTING_RULES")
+    qwen_router_window: int = Field(default=50, alias="QWEN_ROUTER_WINDOW")
+    qwen_router_max_error_rate: float = Field(
+        default=0.5, alias="QWEN_ROUTER_MAX_ERROR_RATE"
+    )
+    qwen_router_max_latency_seconds: float = Field(
+        default=0.0, alias="QWEN_ROUTER_MAX_LATENCY_SECONDS"
+    )
+    qwen_router_sample_ttl_seconds: float = Field(
+        default=300.0, alias="QWEN_ROUTER_SAMPLE_TTL_SECONDS"
+    )
+    retranslate_backlog_path: str = Field(
+        default="./data/retranslate_backlog.jsonl", alias="RETRANSLATE_BACKLOG_PATH"
+    )
+    qwen_max_input_tokens: int = Field(default=6000, alias="QWEN_MAX_INPUT_TOKENS")
+    qwen_prompt_okr_share: float = Field(default=0.3, alias="QWEN_PROMPT_OKR_SHARE")
+    qwen_compact_output: bool = Field(default=False, alias="QWEN_COMPACT_OUTPUT")
+    qwen_triage_mode: Literal["off", "heuristic", "model"] = Field(
+        default="off", alias="QWEN_TRIAGE_MODE"
+    )
+    qwen_triage_model: str = Field(default="qwen-turbo", alias="QWEN_TRIAGE_MODEL")
+    qwen_triage_min_confidence: float = Field(
+        default=0.7, alias="QWEN_TRIAGE_MIN_CONFIDENCE"
+    )
+    qwen_triage_periods: str = Field(default="daily", alias="QWEN_TRIAGE_PERIODS")
+    qwen_chunk_tokens: int = Field(default=0, alias="QWEN_CHUNK_TOKENS")
+    qwen_chunk_threshold_tokens: int = Field(
+        default=4000, alias="QWEN_CHUNK_THRESHOLD_TOKENS"
+    )
+    qwen_chunk_max_chunks: int = Field(default=12, alias="QWEN_CHUNK_MAX_CHUNKS")
+    qwen_chunk_reduce_summary: bool = Field(default=True, alias="QWEN_CHUNK_REDUCE_SUMMARY")
+    qwen_incremental: bool = Field(default=False, alias="QWEN_INCREMENTAL")
+    qwen_incremental_max_age_days: float = Field(
+        default=3.0, alias="QWEN_INCREMENTAL_MAX_AGE_DAYS"
+    )
+    qwen_incremental_max_diff_ratio: float = Field(
+        default=0.6, alias="QWEN_INCREMENTAL_MAX_DIFF_RATIO"
+    )
+    qwen_batch_max_tokens: int = Field(default=0, alias="QWEN_BATCH_MAX_TOKENS")
+    qwen_batch_max_reports: int = Field(default=8, alias="QWEN_BATCH_MAX_REPORTS")
+    qwen_stream: bool = Field(default=False, alias="QWEN_STREAM")
+    qwen_stream_idle_timeout: float = Field(
+        default=30.0, alias="QWEN_STREAM_IDLE_TIMEOUT_SECONDS"
+    )
+    llm_cache_path: str = Field(default="./data/llm_cache.db", alias="LLM_CACHE_PATH")
+    llm_cache_ttl_seconds: float = Field(
+        default=7 * 86400.0, alias="LLM_CACHE_TTL_SECONDS"
+    )
+    llm_cache_max_bytes: int = Field(
+        default=64 * 1024 * 1024, alias="LLM_CACHE_MAX_BYTES"
+    )
+
     storage_driver: StorageDriver = Field(default="csv", alias="STORAGE_DRIVER")
     csv_path: str = Field(default="./data/reports_slim.csv", alias="CSV_PATH")
 
@@ -81,8 +172,51 @@ class Settings(BaseSettings):
         default=False, alias="AUTO_SYNC_RUN_ON_START"
     )
 
+    webhook_max_body_bytes: int = Field(
+        default=1_048_576, alias="WEBHOOK_MAX_BODY_BYTES"
+    )
+
+    ingest_queue_path: str = Field(
+        default="./data/ingest_queue.db", alias="INGEST_QUEUE_PATH"
+    )
+    ingest_queue_max_depth: int = Field(default=1000, alias="INGEST_QUEUE_MAX_DEPTH")
+    ingest_workers: int = Field(default=4, alias="INGEST_WORKERS")
+    ingest_max_attempts: int = Field(default=3, alias="INGEST_MAX_ATTEMPTS")
+
+    report_coalesce_seconds: float = Field(
+        default=0.0, alias="REPORT_COALESCE_SECONDS"
+    )
+    report_coalesce_max_messages: int = Field(
+        default=10, alias="REPORT_COALESCE_MAX_MESSAGES"
+    )
+    message_gate_enabled: bool = Field(default=False, alias="MESSAGE_GATE_ENABLED")
+    message_gate_min_report_chars: int = Field(
+        default=15, alias="MESSAGE_GATE_MIN_REPORT_CHARS"
+    )
+    message_gate_no_progress_max_chars: int = Field(
+        default=40, alias="MESSAGE_GATE_NO_PROGRESS_MAX_CHARS"
+    )
+
+    dedupe_index_path: str = Field(
+        default="./data/event_dedupe.db", alias="DEDUPE_INDEX_PATH"
+    )
+    dedupe_ttl_seconds: float = Field(default=86400.0, alias="DEDUPE_TTL_SECONDS")
+    dedupe_max_entries: int = Field(default=10000, alias="DEDUPE_MAX_ENTRIES")
+
     request_timeout: float = Field(default=10.0, alias="REQUEST_TIMEOUT_SECONDS")
     http_trust_env: bool = Field(default=False, alias="HTTP_TRUST_ENV")
+    http_http2: bool = Field(default=False, alias="HTTP_HTTP2")
+    http_max_connections: int = Field(default=50, alias="HTTP_MAX_CONNECTIONS")
+    http_max_keepalive_connections: int = Field(
+        default=20, alias="HTTP_MAX_KEEPALIVE_CONNECTIONS"
+    )
+    http_keepalive_expiry: float = Field(default=60.0, alias="HTTP_KEEPALIVE_EXPIRY")
+    http_retry_max_attempts: int = Field(default=3, alias="HTTP_RETRY_MAX_ATTEMPTS")
+    http_retry_deadline_seconds: float = Field(
+        default=30.0, alias="HTTP_RETRY_DEADLINE_SECONDS"
+    )
+    http_retry_base_delay: float = Field(default=0.5, alias="HTTP_RETRY_BASE_DELAY")
+    http_retry_max_delay: float = Field(default=8.0, alias="HTTP_RETRY_MAX_DELAY")
 
     model_config = SettingsConfigDict(populate_by_name=True, extra="ignore")
 
@@ -96,9 +230,19 @@ class Settings(BaseSettings):
     def _validate_okr_source(cls, value: OKRSourceType) -> OKRSourceType:
         return value.lower()  # type: ignore[return-value]
 
-    @field_validator("csv_path", "okr_cache_path", mode="before")
+    @field_validator(
+        "csv_path",
+        "okr_cache_path",
+        "ingest_queue_path",
+        "dedupe_index_path",
+        "llm_cache_path",
+        "retranslate_backlog_path",
+        mode="before",
+    )
     @classmethod
     def _expand_path(cls, value: str) -> str:
+        if not value:
+            return value
         return str(Path(value).expanduser())
 
     @field_validator("auto_sync_time")
@@ -118,11 +262,9 @@ class Settings(BaseSettings):
 
     @model_validator(mode="after")
     def _adjust_qwen_mode(self) -> "Settings":
-        if (
-            self.qwen_api_mode == "text"
-            and self.qwen_model.lower() in {"qwen-plus", "qwen-long", "qwen-turbo"}
-        ):
-            object.__setattr__(self, "qwen_api_mode", "compatible")
+        mode = resolve_api_mode(self.qwen_model, self.qwen_api_mode)
+        if mode != self.qwen_api_mode:
+            object.__setattr__(self, "qwen_api_mode", mode)
         return self
 
     def parse_report_rules(self) -> list[tuple[str, str]]:
@@ -0,0 +1,372 @@
+"""Synthetic report history and OKR cache shaped like production data.
+
+    python -m src.devtools.dataset --reports 2000000 --users 3000 --objectives 3 \\
+        --years 3 --seed 7 --out-dir ./data/synthetic
+
+writes ``reports_slim.csv`` (the :class:`~src.storage.csv_store.CSVStorage`
+columns, readable by ``StoredReport.from_csv_row``) and ``okr_cache.json`` (the
+format ``sync_okrs`` writes and ``CacheOKRSource`` reads). Rows are generated
+and written one at a time, so multi-GB files need no more memory than small
+ones. The same seed always produces the same files.
+"""
+from __future__ import annotations
+
+import argparse
+import calendar
+import csv
+import json
+import random
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ..schemas import HRExtract, NeedItem, OKRAlignment, ReportIn, RiskItem, StoredReport
+from ..storage.csv_store import CSVStorage
+from ..utils.logger import get_logger, setup_logging
+from ..utils.period import detect_period
+
+logger = get_logger(__name__)
+
+_SURNAMES = "王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗郑梁谢宋唐许韩冯邓曹"
+_GIVEN_NAMES = (
+    "伟", "芳", "娜", "敏", "静", "磊", "洋", "艳", "勇", "军", "杰", "娟", "涛", "明",
+    "超", "秀英", "晓东", "建华", "丽华", "志强", "婷婷", "浩然", "子涵", "雨欣",
+)
+PROJECTS = (
+    "支付中台", "会员系统", "数据看板", "订单服务", "推荐引擎", "客服工单",
+    "移动端App", "风控平台", "结算系统", "搜索服务",
+)
+WORK_ITEMS = (
+    "完成{p}接口联调",
+    "修复{p}线上偶发报错",
+    "推进{p}自动化测试覆盖率",
+    "优化{p}查询性能",
+    "评审{p}新版需求",
+    "整理{p}技术文档并同步",
+    "配合测试完成{p}回归",
+    "上线{p}灰度版本",
+    "梳理{p}监控告警规则",
+    "与产品对齐{p}迭代范围",
+)
+PLAN_ITEMS = (
+    "继续推进{p}灰度发布",
+    "补齐{p}单元测试",
+    "跟进{p}性能压测结果",
+    "准备{p}阶段评审材料",
+    "完成{p}剩余缺陷修复",
+)
+RISK_ITEMS: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "medium": (
+        ("第三方接口依赖存在延期风险", "提前与对方确认排期并准备降级方案"),
+        ("测试环境不稳定，联调有卡点", "申请独立测试环境"),
+        ("人手紧张，进度可能延迟", "协调其他小组临时支援"),
+        ("需求变更频繁，排期存在风险", "与产品确认冻结范围"),
+    ),
+    "high": (
+        ("生产环境出现故障，影响部分用户下单", "已回滚版本并排查根因"),
+        ("关键依赖无法按期交付，项目阻塞", "升级至项目负责人协调资源"),
+        ("核心成员离职，交接存在严重缺口", "安排交接并补充招聘"),
+    ),
+}
+NEED_ITEMS = (("协调测试资源", "项目经理"), ("申请服务器扩容", "运维"), ("确认需求优先级", "产品经理"))
+SUMMARY_PHRASES = (
+    "按计划推进核心功能开发",
+    "完成了阶段性交付并同步给相关同事",
+    "重点处理线上问题并优化稳定性",
+    "推进跨团队协作事项",
+    "整理文档并准备下一阶段评审",
+)
+_OBJECTIVES = (
+    "提升{p}交付质量与效率",
+    "保障{p}稳定运行",
+    "完成{p}新版本上线",
+    "降低{p}运营成本",
+)
+_KR_TARGETS = ("线上故障数降低50%", "自动化测试覆盖率达到80%", "核心接口P99延迟低于200ms", "按期交付率达到95%")
+_PERIOD_WORDS = {
+    "daily": ("日报", "今日", "明日"),
+    "weekly": ("周报", "本周", "下周"),
+    "monthly": ("月报", "本月", "下月"),
+}
+LEVELS = ("low", "medium", "high")
+
+
+@dataclass(frozen=True)
+class DatasetConfig:
+    reports: int = 10_000
+    users: int = 200
+    objectives: int = 3
+    krs_per_objective: int = 3
+    days: int = 730
+    end: date = field(default_factory=date.today)
+    seed: int = 7
+    # Share of low / medium / high risk reports.
+    risk_mix: Tuple[float, float, float] = (0.65, 0.27, 0.08)
+    period_mix: Tuple[float, float, float] = (0.7, 0.25, 0.05)
+    # Reports that mention one of the author's KRs.
+    kr_mention_share: float = 0.8
+    # Rows stored by the offline fallback, flagged for retranslation.
+    offline_share: float = 0.01
+
+    @property
+    def start(self) -> date:
+        return self.end - timedelta(days=max(0, self.days - 1))
+
+
+def user_id(index: int) -> str:
+    return f"ou_mock_{index}"
+
+
+def user_name(index: int, seed: int = 7) -> str:
+    rng = random.Random(f"{seed}:name:{index}")
+    return rng.choice(_SURNAMES) + rng.choice(_GIVEN_NAMES)
+
+
+def pick_level(rng: random.Random, mix: Sequence[float] = DatasetConfig.risk_mix) -> str:
+    return rng.choices(LEVELS, weights=mix)[0]
+
+
+def report_text(
+    rng: random.Random,
+    period_type: str = "daily",
+    level: str = "low",
+    kr: Optional[int] = None,
+    project: Optional[str] = None,
+) -> str:
+    """One report as people write them: done, OKR progress, risks, next steps."""
+    title, this_period, next_period = _PERIOD_WORDS[period_type]
+    project = project or rng.choice(PROJECTS)
+    done = [item.format(p=project) for item in rng.sample(WORK_ITEMS, rng.randint(2, 4))]
+    lines = [title, f"{this_period}完成：" + "；".join(done)]
+    if kr is not None:
+        lines.append(f"OKR 进展：推进 KR{kr}，当前进度 {rng.randint(10, 95)}%")
+    if level != "low":
+        lines.append("风险：" + rng.choice(RISK_ITEMS[level])[0])
+    if level == "high":
+        lines.append("需要支持：" + rng.choice(NEED_ITEMS)[0])
+    lines.append(f"{next_period}计划：" + rng.choice(PLAN_ITEMS).format(p=project))
+    return "\n".join(lines)
+
+
+def okr_months(config: DatasetConfig) -> List[date]:
+    """First day of every month the dataset covers."""
+    month = config.start.replace(day=1)
+    months = []
+    while month <= config.end:
+        months.append(month)
+        month = (month + timedelta(days=32)).replace(day=1)
+    return months
+
+
+def user_objectives(config: DatasetConfig, user: int, month: date) -> List[Dict[str, Any]]:
+    """One user's objectives for one month, as ``sync_okrs`` stores them."""
+    rng = random.Random(f"{config.seed}:okr:{user}:{month.isoformat()}")
+    period_end = month.replace(day=calendar.monthrange(month.year, month.month)[1])
+    objectives = []
+    for objective in range(1, config.objectives + 1):
+        project = rng.choice(PROJECTS)
+        targets = rng.sample(_KR_TARGETS, len(_KR_TARGETS))
+        krs = []
+        for kr in range(1, config.krs_per_objective + 1):
+            number = (objective - 1) * config.krs_per_objective + kr
+            krs.append(
+                {
+                    "id": f"KR{number}",
+                    "title": project + targets[(kr - 1) % len(targets)],
+                    "progress": f"{rng.randint(0, 100)}%",
+                }
+            )
+        objectives.append(
+            {
+                "id": f"O{objective}",
+                "title": rng.choice(_OBJECTIVES).format(p=project),
+                "period_start": month.isoformat(),
+                "period_end": period_end.isoformat(),
+                "krs": krs,
+            }
+        )
+    return objectives
+
+
+def okr_brief(objectives: List[Dict[str, Any]]) -> str:
+    """The brief ``CacheOKRSource`` builds from these objectives."""
+    parts: List[str] = []
+    for objective in objectives:
+        parts.append(
+            f"{objective['id']} {objective['title']} "
+            f"({objective['period_start']}~{objective['period_end']})"
+        )
+        for kr in objective["krs"]:
+            parts.append(f"- {kr['id']} {kr['title']} {kr['progress']}")
+    return "\n".join(parts)
+
+
+def _timestamp(rng: random.Random, config: DatasetConfig, index: int) -> datetime:
+    # Evenly spread over the window, so rows come out roughly in time order.
+    span = config.days * 86400
+    offset = (index + rng.random()) * span / max(1, config.reports)
+    moment = datetime.combine(config.start, datetime.min.time()) + timedelta(seconds=offset)
+    if moment.weekday() >= 5:  # weekend reports land on Friday
+        moment -= timedelta(days=moment.weekday() - 4)
+    # Most reports go out at the end of the working day.
+    minutes = int(min(max(rng.gauss(18.5 * 60, 70), 9 * 60), 23 * 60 + 59))
+    return moment.replace(
+        hour=minutes // 60, minute=minutes % 60, second=rng.randrange(60), microsecond=0
+    )
+
+
+def _extract(
+    rng: random.Random, config: DatasetConfig, name: str, text: str, level: str, kr: Optional[int]
+) -> HRExtract:
+    if rng.random() < config.offline_share:
+        return HRExtract(
+            hr_summary=f"(离线模式) {text[:180]}",
+            risks=[],
+            needs=[],
+            okr_alignment=OKRAlignment(
+                hit_objectives=[], hit_krs=[], gaps=["AI 未能解析，需人工确认进展。"], confidence=0.1
+            ),
+            next_actions=["保持日报节奏，补充风险与需求。"],
+            risk_level="medium" if "风险" in text else "low",
+            needs_retranslation=True,
+        )
+    risks: List[RiskItem] = []
+    needs: List[NeedItem] = []
+    if level != "low":
+        item, mitigation = rng.choice(RISK_ITEMS[level])
+        risks.append(RiskItem(item=item, likelihood=level, mitigation=mitigation))
+    if level == "high":
+        topic, owner = rng.choice(NEED_ITEMS)
+        needs.append(NeedItem(topic=topic, owner=owner))
+    tone = {"low": "整体进展顺利", "medium": "存在风险需关注", "high": "出现阻塞需尽快介入"}[level]
+    objective = (kr - 1) // config.krs_per_objective + 1 if kr else None
+    return HRExtract(
+        hr_summary=f"{name}{rng.choice(SUMMARY_PHRASES)}，{tone}。",
+        risks=risks,
+        needs=needs,
+        okr_alignment=OKRAlignment(
+            hit_objectives=[f"O{objective}"] if objective else [],
+            hit_krs=[f"KR{kr}"] if kr else [],
+            gaps=[] if kr else ["本期工作与OKR的关联不够明确"],
+            confidence=round(rng.uniform(0.55, 0.95) if kr else rng.uniform(0.2, 0.5), 2),
+        ),
+        next_actions=[rng.choice(PLAN_ITEMS).format(p=rng.choice(PROJECTS))],
+        risk_level=level,
+    )
+
+
+def generate_reports(config: DatasetConfig) -> Iterator[StoredReport]:
+    """Yield ``config.reports`` records lazily, oldest first."""
+    rng = random.Random(config.seed)
+    users = max(1, config.users)
+    krs = max(1, config.objectives * config.krs_per_objective)
+    briefs: Dict[Tuple[int, date], str] = {}
+    for index in range(config.reports):
+        # Skewed so some people report far more often than others.
+        user = min(users - 1, int(users * rng.random() ** 1.5))
+        message_ts = _timestamp(rng, config, index)
+        period_type = rng.choices(("daily", "weekly", "monthly"), weights=config.period_mix)[0]
+        level = pick_level(rng, config.risk_mix)
+        kr = rng.randint(1, krs) if rng.random() < config.kr_mention_share else None
+        text = report_text(rng, period_type, level, kr)
+        detected, period_start, period_end = detect_period(text, message_ts.date())
+        month = message_ts.date().replace(day=1)
+        brief = briefs.get((user, month))
+        if brief is None:
+            if len(briefs) > 4 * users:  # months go by in order; drop the old ones
+                briefs.clear()
+            brief = briefs[(user, month)] = okr_brief(user_objectives(config, user, month))
+        name = user_name(user, config.seed)
+        yield StoredReport(
+            report=ReportIn(
+                user_id=user_id(user),
+                user_name=name,
+                period_type=detected,
+                period_start=period_start,
+                period_end=period_end,
+                raw_text=text,
+                message_ts=message_ts,
+            ),
+            hr_extract=_extract(rng, config, name, text, level, kr),
+            okr_brief=brief,
+        )
+
+
+def write_reports_csv(path: Path, config: DatasetConfig, progress_every: int = 0) -> int:
+    """Stream ``generate_reports`` into a CSV with ``CSVStorage``'s header."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)
+    headers = CSVStorage(str(path)).headers  # also writes the header row
+    written = 0
+    with path.open("a", newline="", encoding="utf-8") as fp:
+        writer = csv.DictWriter(fp, fieldnames=headers)
+        for record in generate_reports(config):
+            writer.writerow(record.to_csv_row())
+            written += 1
+            if progress_every and written % progress_every == 0:
+                logger.info("dataset_progress", extra={"rows": written, "bytes": fp.tell()})
+    return written
+
+
+def write_okr_cache(path: Path, config: DatasetConfig) -> int:
+    """Stream the OKR cache for every user and month, one user at a time."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    months = okr_months(config)
+    with path.open("w", encoding="utf-8") as fp:
+        fp.write('{"users": [\n')
+        for user in range(max(1, config.users)):
+            objectives = [
+                objective for month in months for objective in user_objectives(config, user, month)
+            ]
+            entry = {"user_id": user_id(user), "objectives": objectives}
+            fp.write((",\n" if user else "") + json.dumps(entry, ensure_ascii=False))
+        fp.write("\n]}\n")
+    return max(1, config.users)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic report CSV and OKR cache.")
+    parser.add_argument("--reports", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--objectives", type=int, default=3, help="objectives per user per month")
+    parser.add_argument("--krs-per-objective", type=int, default=3)
+    parser.add_argument("--years", type=float, default=2.0, help="history length, ending today")
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today(), help="YYYY-MM-DD")
+    parser.add_argument("--risk-mix", default="0.65,0.27,0.08", help="low,medium,high shares")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out-dir", default="./data/synthetic")
+    parser.add_argument("--skip-okrs", action="store_true")
+    parser.add_argument("--skip-reports", action="store_true")
+    args = parser.parse_args()
+    risk_mix = tuple(float(share) for share in args.risk_mix.split(","))
+    if len(risk_mix) != 3:
+        parser.error("--risk-mix takes three comma-separated shares")
+    setup_logging()
+    config = DatasetConfig(
+        reports=args.reports,
+        users=args.users,
+        objectives=args.objectives,
+        krs_per_objective=args.krs_per_objective,
+        days=max(1, round(args.years * 365)),
+        end=args.end,
+        seed=args.seed,
+        risk_mix=risk_mix,
+    )
+    out_dir = Path(args.out_dir)
+    if not args.skip_okrs:
+        users = write_okr_cache(out_dir / "okr_cache.json", config)
+        logger.info(
+            "dataset_okrs_written", extra={"users": users, "path": str(out_dir / "okr_cache.json")}
+        )
+    if not args.skip_reports:
+        rows = write_reports_csv(out_dir / "reports_slim.csv", config, progress_every=100_000)
+        logger.info(
+            "dataset_reports_written", extra={"rows": rows, "path": str(out_dir / "reports_slim.csv")}
+        )
+
+
+if __name__ == "__main__":
+    main()
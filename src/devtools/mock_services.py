@@ -0,0 +1,451 @@
+"""Local stand-in for the DashScope and Feishu endpoints this service calls.
+
+Lets load and latency work run without real credentials:
+
+    python -m src.devtools.mock_services --port 9000 --latency lognormal:800:0.4 \\
+        --ms-per-token 4 --throttle-rate 0.05 --error-rate 0.01
+
+then start the app with ``DASHSCOPE_BASE_URL=http://127.0.0.1:9000`` and
+``FEISHU_BASE_URL=http://127.0.0.1:9000``. Model output is deterministic: the
+same report text always produces the same extract, in the full or compact
+schema, single or batched, streamed or not.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import socket
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from ..ai.qwen import CHAT_COMPLETION_PATH, COMPACT_KEYS, TEXT_GENERATION_PATH
+from ..ai.tokens import HIGH_RISK_KEYWORDS, MEDIUM_RISK_KEYWORDS, estimate_tokens
+from ..feishu.api_client import SEND_MESSAGE_PATH, TENANT_TOKEN_PATH
+from ..feishu.report_fetch import REPORT_QUERY_PATH
+from ..okr.sync_job import OKR_BATCH_GET_PATH
+from .dataset import (
+    PLAN_ITEMS,
+    PROJECTS,
+    RISK_ITEMS,
+    SUMMARY_PHRASES,
+    WORK_ITEMS,
+    user_id,
+    user_name,
+)
+
+_REPORT_SECTION_RE = re.compile(
+    r"【(?:报告文本|本次报告相对上一份的新增或变化内容)】\n(.*?)(?:\n\n【|\Z)", re.DOTALL
+)
+_KR_RE = re.compile(r"KR\d+")
+_COMPACT_NESTED = {
+    "risks": {"item": "i", "likelihood": "l", "mitigation": "m"},
+    "needs": {"topic": "t", "owner": "o"},
+    "okr_alignment": {"hit_objectives": "o", "hit_krs": "k", "gaps": "g", "confidence": "c"},
+}
+_COMPACT_TOP = {value: key for key, value in COMPACT_KEYS.items()}
+_SHORT_LEVELS = {"low": "l", "medium": "m", "high": "h"}
+
+
+@dataclass(frozen=True)
+class LatencyModel:
+    """Latency distribution in milliseconds, e.g. ``lognormal:800:0.4``.
+
+    ``fixed:MS`` · ``uniform:LOW:HIGH`` · ``normal:MEAN:STD`` ·
+    ``lognormal:MEDIAN:SIGMA`` · ``exp:MEAN``
+    """
+
+    kind: str = "fixed"
+    params: tuple = (0.0,)
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        kind, _, rest = spec.strip().partition(":")
+        kind = kind.lower()
+        arity = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exp": 1}
+        if kind not in arity:
+            raise ValueError(f"Unknown latency distribution: {spec!r}")
+        params = tuple(float(value) for value in rest.split(":") if value) if rest else ()
+        if len(params) != arity[kind]:
+            raise ValueError(f"{kind} latency takes {arity[kind]} parameter(s): {spec!r}")
+        return cls(kind, params)
+
+    def sample(self, rng: random.Random) -> float:
+        """One latency draw in seconds (never negative)."""
+        if self.kind == "uniform":
+            value = rng.uniform(*self.params)
+        elif self.kind == "normal":
+            value = rng.gauss(*self.params)
+        elif self.kind == "lognormal":
+            median, sigma = self.params
+            value = rng.lognormvariate(math.log(max(median, 1e-3)), sigma)
+        elif self.kind == "exp":
+            value = rng.expovariate(1.0 / self.params[0]) if self.params[0] > 0 else 0.0
+        else:
+            value = self.params[0]
+        return max(0.0, value) / 1000.0
+
+
+@dataclass(frozen=True)
+class MockConfig:
+    latency: LatencyModel = LatencyModel("fixed", (50.0,))
+    ms_per_token: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: float = 1.0
+    feishu_latency: LatencyModel = LatencyModel("fixed", (0.0,))
+    # Fault injection applies to DashScope only unless this is set.
+    feishu_faults: bool = False
+    reports_per_rule: int = 50
+    users: int = 20
+    seed: int = 7
+    stream_chunk_chars: int = 8
+
+
+def _rng_for(text: str) -> random.Random:
+    return random.Random(int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big"))
+
+
+def _level_for(text: str) -> str:
+    lowered = text.lower()
+    if any(word in lowered for word in HIGH_RISK_KEYWORDS):
+        return "high"
+    if any(word in lowered for word in MEDIUM_RISK_KEYWORDS):
+        return "medium"
+    return "low"
+
+
+def mock_extract(report_text: str) -> Dict[str, Any]:
+    """Deterministic extract for one report text (full schema)."""
+    rng = _rng_for(report_text)
+    level = _level_for(report_text)
+    krs = list(dict.fromkeys(_KR_RE.findall(report_text)))
+    risks = []
+    if level != "low":
+        item, mitigation = rng.choice(RISK_ITEMS[level])
+        risks.append({"item": item, "likelihood": level, "mitigation": mitigation})
+    return {
+        "hr_summary": f"本期{rng.choice(SUMMARY_PHRASES)}，整体进展{'需要关注' if risks else '顺利'}。",
+        "risks": risks,
+        "needs": [{"topic": "协调测试资源", "owner": "项目经理"}] if level == "high" else [],
+        "okr_alignment": {
+            "hit_objectives": ["O1"] if krs else [],
+            "hit_krs": krs,
+            "gaps": [] if krs else ["本期工作与OKR的关联不够明确"],
+            "confidence": round(0.5 + rng.random() * 0.4, 2),
+        },
+        "next_actions": [rng.choice(PLAN_ITEMS).format(p=rng.choice(PROJECTS))],
+        "risk_level": level,
+    }
+
+
+def to_compact(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a full-schema extract onto the compact keys the client can ask for."""
+
+    def short(item: Dict[str, Any], nested: Dict[str, str]) -> Dict[str, Any]:
+        return {
+            nested.get(key, key): _SHORT_LEVELS.get(value, value) if key == "likelihood" else value
+            for key, value in item.items()
+        }
+
+    result: Dict[str, Any] = {}
+    for key, value in payload.items():
+        nested = _COMPACT_NESTED.get(key, {})
+        if isinstance(value, list):
+            value = [short(item, nested) if isinstance(item, dict) else item for item in value]
+        elif isinstance(value, dict):
+            value = short(value, nested)
+        elif key == "risk_level":
+            value = _SHORT_LEVELS[value]
+        result[_COMPACT_TOP.get(key, key)] = value
+    return result
+
+
+def mock_completion(prompt: str) -> str:
+    """The JSON text DashScope would return for ``prompt``."""
+    sections = _REPORT_SECTION_RE.findall(prompt)
+    if '"okr": true, "c": 0.0' in prompt:  # triage stage
+        text = sections[0] if sections else prompt
+        level = _level_for(text)
+        payload: Dict[str, Any] = {
+            "v": _SHORT_LEVELS[level],
+            "okr": bool(_KR_RE.search(text)),
+            "c": 0.9 if level == "low" else 0.75,
+            "s": mock_extract(text)["hr_summary"],
+        }
+        return json.dumps(payload, ensure_ascii=False)
+    if '{"hr_summary": ""}' in prompt:  # map-reduce summary
+        return json.dumps({"hr_summary": mock_extract(prompt)["hr_summary"]}, ensure_ascii=False)
+    compact = "键名：" in prompt
+    extracts = [mock_extract(text) for text in sections] or [mock_extract(prompt)]
+    if compact:
+        extracts = [to_compact(extract) for extract in extracts]
+    if '{"reports": [...]}' in prompt:
+        return json.dumps(
+            {"reports": [{"index": index, **extract} for index, extract in enumerate(extracts)]},
+            ensure_ascii=False,
+        )
+    return json.dumps(extracts[0], ensure_ascii=False)
+
+
+def mock_report_items(rule_id: str, config: MockConfig, start_ts: int, end_ts: int) -> List[Dict[str, Any]]:
+    rng = random.Random(f"{config.seed}:{rule_id}")
+    span = max(1, end_ts - start_ts)
+    items = []
+    for index in range(config.reports_per_rule):
+        user = index % max(1, config.users)
+        project = rng.choice(PROJECTS)
+        done = "；".join(item.format(p=project) for item in rng.sample(WORK_ITEMS, 2))
+        fields = [{"field_name": "今日完成", "field_value": f"{done}，推进 KR{rng.randint(1, 3)}"}]
+        if rng.random() < 0.3:
+            risk = rng.choice(RISK_ITEMS["medium"])[0]
+            fields.append({"field_name": "风险与求助", "field_value": risk})
+        items.append(
+            {
+                "task_id": f"{rule_id}-{index}",
+                "rule_id": rule_id,
+                "rule_name": "研发日报",
+                "from_user_id": user_id(user),
+                "from_user_name": user_name(user, config.seed),
+                "commit_time": start_ts + (index * 7919) % span,
+                "form_contents": fields,
+            }
+        )
+    return items
+
+
+def mock_okr(okr_id: str, config: MockConfig) -> Dict[str, Any]:
+    rng = random.Random(f"{config.seed}:{okr_id}")
+    owner = user_id(rng.randrange(max(1, config.users)))
+    return {
+        "id": okr_id,
+        "name": "2024 年 5 月 OKR",
+        "owner": {"open_id": owner},
+        "objective_list": [
+            {
+                "id": f"{okr_id}-o{objective}",
+                "content": f"目标{objective}：提升交付质量与效率",
+                "kr_list": [
+                    {
+                        "id": f"{okr_id}-o{objective}-kr{kr}",
+                        "content": f"KR{kr} 关键指标{kr}达到目标值",
+                        "progress_rate": {"percent": rng.randint(0, 100)},
+                    }
+                    for kr in range(1, 4)
+                ],
+            }
+            for objective in range(1, 3)
+        ],
+    }
+
+
+@dataclass
+class MockState:
+    requests: Counter = field(default_factory=Counter)
+    faults: Counter = field(default_factory=Counter)
+    messages: List[Dict[str, Any]] = field(default_factory=list)
+    message_uuids: Set[str] = field(default_factory=set)
+    output_tokens: int = 0
+
+
+def build_mock_app(config: Optional[MockConfig] = None) -> FastAPI:
+    config = config or MockConfig()
+    app = FastAPI(title="DashScope/Feishu mock")
+    state = MockState()
+    rng = random.Random(config.seed)
+    app.state.mock = state
+
+    async def fault(route: str, latency: LatencyModel, inject: bool) -> Optional[JSONResponse]:
+        state.requests[route] += 1
+        roll = rng.random() if inject else 1.0
+        if roll < config.throttle_rate:
+            state.faults["429"] += 1
+            return JSONResponse(
+                {"code": "Throttling.RateQuota", "message": "Requests rate limit exceeded"},
+                status_code=429,
+                headers={"Retry-After": f"{config.retry_after:g}"},
+            )
+        await asyncio.sleep(latency.sample(rng))
+        if roll < config.throttle_rate + config.error_rate:
+            state.faults["500"] += 1
+            return JSONResponse({"code": "InternalError", "message": "mock failure"}, status_code=500)
+        return None
+
+    async def generation_delay(text: str) -> None:
+        tokens = estimate_tokens(text)
+        state.output_tokens += tokens
+        if config.ms_per_token > 0:
+            await asyncio.sleep(config.ms_per_token * tokens / 1000)
+
+    def stream(text: str, compatible: bool) -> StreamingResponse:
+        step = max(1, config.stream_chunk_chars)
+        per_chunk = config.ms_per_token * step / 1000
+
+        async def events() -> AsyncIterator[bytes]:
+            state.output_tokens += estimate_tokens(text)
+            for start in range(0, len(text), step):
+                delta = text[start : start + step]
+                if compatible:
+                    event: Dict[str, Any] = {"choices": [{"delta": {"content": delta}}]}
+                else:
+                    event = {"output": {"text": delta}}
+                yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode("utf-8")
+                if per_chunk > 0:
+                    await asyncio.sleep(per_chunk)
+            if compatible:
+                yield b"data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post(TEXT_GENERATION_PATH)
+    async def text_generation(request: Request) -> Any:
+        body = await request.json()
+        failure = await fault("text_generation", config.latency, True)
+        if failure is not None:
+            return failure
+        messages = (body.get("input") or {}).get("messages") or []
+        prompt = messages[-1]["content"] if messages else (body.get("input") or {}).get("prompt", "")
+        text = mock_completion(prompt)
+        if request.headers.get("X-DashScope-SSE") == "enable":
+            return stream(text, compatible=False)
+        await generation_delay(text)
+        return {"output": {"text": text}, "usage": {"output_tokens": estimate_tokens(text)}}
+
+    @app.post(CHAT_COMPLETION_PATH)
+    async def chat_completion(request: Request) -> Any:
+        body = await request.json()
+        failure = await fault("chat_completion", config.latency, True)
+        if failure is not None:
+            return failure
+        text = mock_completion(body["messages"][-1]["content"])
+        if body.get("stream"):
+            return stream(text, compatible=True)
+        await generation_delay(text)
+        return {"choices": [{"message": {"role": "assistant", "content": text}}]}
+
+    @app.post(TENANT_TOKEN_PATH)
+    async def tenant_token() -> Any:
+        failure = await fault("tenant_token", config.feishu_latency, config.feishu_faults)
+        if failure is not None:
+            return failure
+        return {"code": 0, "msg": "ok", "tenant_access_token": "t-mock-token", "expire": 7200}
+
+    @app.post(SEND_MESSAGE_PATH.split("?", 1)[0])
+    async def send_message(request: Request) -> Any:
+        body = await request.json()
+        failure = await fault("send_message", config.feishu_latency, config.feishu_faults)
+        if failure is not None:
+            return failure
+        uuid = body.get("uuid")
+        if not uuid or uuid not in state.message_uuids:
+            if uuid:
+                state.message_uuids.add(uuid)
+            state.messages.append(body)
+        return {"code": 0, "msg": "success", "data": {"message_id": f"om_mock_{len(state.messages)}"}}
+
+    @app.post(REPORT_QUERY_PATH)
+    async def report_query(request: Request) -> Any:
+        body = await request.json()
+        failure = await fault("report_query", config.feishu_latency, config.feishu_faults)
+        if failure is not None:
+            return failure
+        items = mock_report_items(
+            str(body.get("rule_id", "")),
+            config,
+            int(body.get("commit_start_time") or 0),
+            int(body.get("commit_end_time") or 0),
+        )
+        offset = int(body.get("page_token") or 0)
+        size = max(1, int(body.get("page_size") or 20))
+        page = items[offset : offset + size]
+        has_more = offset + size < len(items)
+        return {
+            "code": 0,
+            "msg": "success",
+            "data": {
+                "items": page,
+                "has_more": has_more,
+                "page_token": str(offset + size) if has_more else "",
+            },
+        }
+
+    @app.get(OKR_BATCH_GET_PATH)
+    async def okr_batch_get(request: Request) -> Any:
+        failure = await fault("okr_batch_get", config.feishu_latency, config.feishu_faults)
+        if failure is not None:
+            return failure
+        okr_ids = request.query_params.getlist("okr_ids")
+        return {"code": 0, "msg": "success", "data": {"okr_list": [mock_okr(i, config) for i in okr_ids]}}
+
+    @app.get("/mock/stats")
+    async def stats() -> Dict[str, Any]:
+        return {
+            "requests": dict(state.requests),
+            "faults": dict(state.faults),
+            "messages_sent": len(state.messages),
+            "output_tokens": state.output_tokens,
+        }
+
+    return app
+
+
+def start_mock_server(config: Optional[MockConfig] = None) -> Tuple[uvicorn.Server, str]:
+    """Serve the stand-in from a daemon thread on a free 127.0.0.1 port.
+
+    Returns the server (set ``should_exit`` to stop it) and its base URL.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(build_mock_app(config), host="127.0.0.1", port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, f"http://127.0.0.1:{port}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a local DashScope/Feishu stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", default="fixed:50", help="DashScope time to first byte (ms)")
+    parser.add_argument("--ms-per-token", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 500 responses")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of 429 responses")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--feishu-latency", default="fixed:0")
+    parser.add_argument("--feishu-faults", action="store_true", help="inject faults into Feishu too")
+    parser.add_argument("--reports-per-rule", type=int, default=50)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    config = MockConfig(
+        latency=LatencyModel.parse(args.latency),
+        ms_per_token=args.ms_per_token,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        feishu_latency=LatencyModel.parse(args.feishu_latency),
+        feishu_faults=args.feishu_faults,
+        reports_per_rule=args.reports_per_rule,
+        users=args.users,
+        seed=args.seed,
+    )
+    uvicorn.run(build_mock_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
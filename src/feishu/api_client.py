@@ -4,19 +4,19 @@ import asyncio
 import time
 import json
 from typing import Any, Dict, Optional
+from uuid import uuid4
 
 import httpx
 
+from ..utils.http import get_shared_client
 from ..utils.logger import get_logger
+from ..utils.retry import RetryPolicy, call_with_retry
 
 logger = get_logger(__name__)
 
-TENANT_TOKEN_URL = (
-    "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal"
-)
-SEND_MESSAGE_URL = (
-    "https://open.feishu.cn/open-apis/im/v1/messages?receive_id_type=chat_id"
-)
+FEISHU_BASE_URL = "https://open.feishu.cn"
+TENANT_TOKEN_PATH = "/open-apis/auth/v3/tenant_access_token/internal"
+SEND_MESSAGE_PATH = "/open-apis/im/v1/messages?receive_id_type=chat_id"
 
 
 class FeishuAPIClient:
@@ -27,6 +27,9 @@ class FeishuAPIClient:
         default_chat_id: Optional[str],
         timeout: float = 10.0,
         trust_env: bool = False,
+        http_client: Optional[httpx.AsyncClient] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        base_url: str = FEISHU_BASE_URL,
     ) -> None:
         self.app_id = app_id
         self.app_secret = app_secret
@@ -36,6 +39,25 @@ class FeishuAPIClient:
         self._tenant_token: Optional[str] = None
         self._tenant_token_expiry: float = 0.0
         self._lock = asyncio.Lock()
+        self._client = http_client
+        self._owned_client: Optional[httpx.AsyncClient] = None
+        self.retry_policy = retry_policy or RetryPolicy(attempt_timeout=timeout)
+        self.base_url = base_url.rstrip("/")
+
+    def _http_client(self) -> httpx.AsyncClient:
+        if self._client is not None:
+            return self._client
+        shared = get_shared_client()
+        if shared is not None:
+            return shared
+        if self._owned_client is None or self._owned_client.is_closed:
+            self._owned_client = httpx.AsyncClient(trust_env=self.trust_env)
+        return self._owned_client
+
+    async def aclose(self) -> None:
+        if self._owned_client is not None:
+            await self._owned_client.aclose()
+            self._owned_client = None
 
     async def send_card(self, card_payload: Dict[str, Any], chat_id: Optional[str] = None) -> None:
         target_chat = chat_id or self.default_chat_id
@@ -54,18 +76,24 @@ class FeishuAPIClient:
             "receive_id": target_chat,
             "msg_type": "interactive",
             "content": json.dumps(card_payload, ensure_ascii=False),
+            # Feishu drops repeats of the same uuid, so a retried send never
+            # posts the card twice.
+            "uuid": str(uuid4()),
         }
-        async with httpx.AsyncClient(
-            timeout=self.timeout, trust_env=self.trust_env
-        ) as client:
-            response = await client.post(SEND_MESSAGE_URL, headers=headers, json=body)
-            if response.status_code in {429, 500, 502, 503}:
+
+        async def send(timeout: float) -> httpx.Response:
+            response = await self._http_client().post(
+                self.base_url + SEND_MESSAGE_PATH, headers=headers, json=body, timeout=timeout
+            )
+            if response.status_code >= 400:
                 logger.error(
-                    "feishu_send_retryable",
+                    "feishu_send_failed",
                     extra={"status_code": response.status_code, "body": response.text},
                 )
-                response.raise_for_status()
             response.raise_for_status()
+            return response
+
+        await call_with_retry(self.retry_policy, send, label="feishu_send_card")
         logger.info(
             "feishu_card_sent",
             extra={"chat_id": target_chat, "status": "success"},
@@ -78,12 +106,18 @@ class FeishuAPIClient:
             if not self.app_id or not self.app_secret:
                 raise RuntimeError("Feishu app credentials are required to send cards.")
             payload = {"app_id": self.app_id, "app_secret": self.app_secret}
-            async with httpx.AsyncClient(
-                timeout=self.timeout, trust_env=self.trust_env
-            ) as client:
-                response = await client.post(TENANT_TOKEN_URL, json=payload)
+
+            async def request_token(timeout: float) -> httpx.Response:
+                response = await self._http_client().post(
+                    self.base_url + TENANT_TOKEN_PATH, json=payload, timeout=timeout
+                )
                 response.raise_for_status()
-                data = response.json()
+                return response
+
+            response = await call_with_retry(
+                self.retry_policy, request_token, label="feishu_tenant_token"
+            )
+            data = response.json()
             if data.get("code") != 0:
                 raise RuntimeError(f"Failed to retrieve tenant token: {data}")
             self._tenant_token = data["tenant_access_token"]
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import suppress
+from dataclasses import dataclass, field
+from typing import Any, AsyncContextManager, Awaitable, Callable, Dict, List, Optional
+
+from ..schemas import ReportIn
+from ..utils.logger import get_logger
+from ..utils.period import detect_period
+
+logger = get_logger(__name__)
+
+ReportSink = Callable[[ReportIn], Awaitable[Any]]
+
+
+@dataclass
+class _PendingReport:
+    reports: List[ReportIn] = field(default_factory=list)
+    waiters: List[asyncio.Future[None]] = field(default_factory=list)
+    timer: Optional[asyncio.Task[None]] = None
+    first_seen: float = 0.0
+
+
+class ReportCoalescer:
+    """Debounce consecutive messages from one user into a single report.
+
+    Every new message restarts the user's ``window_seconds`` timer. The buffer
+    is flushed when the timer fires, when ``max_messages`` is reached, or once
+    ``max_delay_seconds`` has passed since the first buffered message.
+
+    :meth:`add` returns a future per message that settles once the merged report
+    has been through ``sink``, so the caller can hold off acknowledging the
+    message until then. Flushes run under ``limiter`` when one is given.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float,
+        sink: ReportSink,
+        max_messages: int = 10,
+        max_delay_seconds: Optional[float] = None,
+        limiter: Optional[AsyncContextManager[Any]] = None,
+    ) -> None:
+        self.window_seconds = window_seconds
+        self.sink = sink
+        self.max_messages = max(1, max_messages)
+        self.max_delay_seconds = max_delay_seconds or window_seconds * 4
+        self.limiter = limiter
+        self._pending: Dict[str, _PendingReport] = {}
+        self._lock = asyncio.Lock()
+        self._messages_in = 0
+        self._reports_out = 0
+        self._flush_failures = 0
+
+    async def add(self, report: ReportIn) -> asyncio.Future[None]:
+        loop = asyncio.get_running_loop()
+        waiter: asyncio.Future[None] = loop.create_future()
+        async with self._lock:
+            self._messages_in += 1
+            pending = self._pending.get(report.user_id)
+            if pending is None:
+                pending = _PendingReport(first_seen=loop.time())
+                self._pending[report.user_id] = pending
+            pending.reports.append(report)
+            pending.waiters.append(waiter)
+            if pending.timer is not None:
+                pending.timer.cancel()
+            elapsed = loop.time() - pending.first_seen
+            if len(pending.reports) >= self.max_messages:
+                delay = 0.0
+            else:
+                delay = min(self.window_seconds, max(0.0, self.max_delay_seconds - elapsed))
+            pending.timer = asyncio.create_task(self._flush_later(report.user_id, delay))
+        return waiter
+
+    async def _flush_later(self, user_id: str, delay: float) -> None:
+        await asyncio.sleep(delay)
+        async with self._lock:
+            pending = self._pending.pop(user_id, None)
+        if pending is not None:
+            await self._emit(pending)
+
+    async def flush_all(self) -> None:
+        async with self._lock:
+            pending_items = list(self._pending.values())
+            self._pending.clear()
+        for pending in pending_items:
+            if pending.timer is not None:
+                pending.timer.cancel()
+                with suppress(asyncio.CancelledError):
+                    await pending.timer
+            await self._emit(pending)
+
+    async def _emit(self, pending: _PendingReport) -> None:
+        merged = merge_reports(pending.reports)
+        self._reports_out += 1
+        logger.info(
+            "report_coalesced",
+            extra={"user_id": merged.user_id, "messages": len(pending.reports)},
+        )
+        try:
+            if self.limiter is not None:
+                async with self.limiter:
+                    await self.sink(merged)
+            else:
+                await self.sink(merged)
+        except asyncio.CancelledError:
+            # Source messages stay unacknowledged and are replayed later.
+            for waiter in pending.waiters:
+                waiter.cancel()
+            raise
+        except Exception as exc:
+            # Hand the failure to every source message so each can be retried.
+            self._flush_failures += 1
+            logger.warning(
+                "report_coalesce_flush_failed",
+                extra={"user_id": merged.user_id, "messages": len(pending.reports)},
+            )
+            for waiter in pending.waiters:
+                if not waiter.done():
+                    waiter.set_exception(exc)
+            return
+        for waiter in pending.waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "window_seconds": self.window_seconds,
+            "pending_users": len(self._pending),
+            "messages_in": self._messages_in,
+            "reports_out": self._reports_out,
+            "flush_failures": self._flush_failures,
+        }
+
+
+def merge_reports(reports: List[ReportIn]) -> ReportIn:
+    """Merge a user's consecutive messages, oldest first, into one report."""
+    ordered = sorted(reports, key=lambda item: item.message_ts)
+    first = ordered[0]
+    if len(ordered) == 1:
+        return first
+    raw_text = "\n".join(item.raw_text for item in ordered if item.raw_text.strip())
+    period_type, period_start, period_end = detect_period(
+        raw_text, first.message_ts.date()
+    )
+    return first.model_copy(
+        update={
+            "raw_text": raw_text,
+            "period_type": period_type,
+            "period_start": period_start,
+            "period_end": period_end,
+        }
+    )
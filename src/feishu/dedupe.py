@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..schemas import FeishuWebhookEnvelope
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_events (
+    key TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_seen_events_expires ON seen_events (expires_at);
+"""
+
+
+def dedupe_keys(envelope: FeishuWebhookEnvelope) -> List[str]:
+    keys: List[str] = []
+    if envelope.header.event_id:
+        keys.append(f"event:{envelope.header.event_id}")
+    if envelope.event.message.message_id:
+        keys.append(f"message:{envelope.event.message.message_id}")
+    return keys
+
+
+class EventDeduplicator:
+    """In-memory LRU of recently seen webhook keys, backed by a SQLite index.
+
+    The LRU answers the hot path (Feishu redelivers within seconds); the disk
+    index keeps the history across restarts for ``ttl_seconds``.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float = 86400.0,
+        max_entries: int = 10000,
+        prune_every: int = 500,
+    ) -> None:
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self.prune_every = max(1, prune_every)
+        self._memory: "OrderedDict[str, float]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._inserts = 0
+        self._duplicates = 0
+        self._accepted = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        conn.commit()
+        self._conn = conn
+        return conn
+
+    async def check_and_mark(self, keys: Iterable[str]) -> bool:
+        """Return True when any key was already seen; otherwise record all keys."""
+        return await asyncio.to_thread(self._check_and_mark, list(keys))
+
+    async def forget(self, keys: Iterable[str]) -> None:
+        await asyncio.to_thread(self._forget, list(keys))
+
+    def _check_and_mark(self, keys: List[str]) -> bool:
+        if not keys:
+            return False
+        now = time.time()
+        with self._lock:
+            if any(self._seen(key, now) for key in keys):
+                self._duplicates += 1
+                return True
+            expires_at = now + self.ttl_seconds
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO seen_events (key, expires_at) VALUES (?, ?)",
+                [(key, expires_at) for key in keys],
+            )
+            self._inserts += 1
+            if self._inserts % self.prune_every == 0:
+                conn.execute("DELETE FROM seen_events WHERE expires_at <= ?", (now,))
+            conn.commit()
+            for key in keys:
+                self._remember(key, expires_at)
+            self._accepted += 1
+            return False
+
+    def _seen(self, key: str, now: float) -> bool:
+        expires_at = self._memory.get(key)
+        if expires_at is not None:
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                return True
+            del self._memory[key]
+            return False
+        row = self._connect().execute(
+            "SELECT expires_at FROM seen_events WHERE key = ?", (key,)
+        ).fetchone()
+        if row is not None and row[0] > now:
+            self._remember(key, float(row[0]))
+            return True
+        return False
+
+    def _remember(self, key: str, expires_at: float) -> None:
+        self._memory[key] = expires_at
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _forget(self, keys: List[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._memory.pop(key, None)
+            conn = self._connect()
+            conn.executemany("DELETE FROM seen_events WHERE key = ?", [(k,) for k in keys])
+            conn.commit()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "duplicates": self._duplicates,
+            "accepted": self._accepted,
+            "memory_entries": len(self._memory),
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from contextlib import suppress
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingest_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    enqueued_at REAL NOT NULL,
+    claimed_at REAL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_ingest_jobs_status ON ingest_jobs (status, id);
+"""
+
+
+class IngestQueueFull(RuntimeError):
+    """Raised when the queue already holds ``max_depth`` unfinished jobs."""
+
+
+@dataclass
+class IngestJob:
+    job_id: int
+    payload: Dict[str, Any]
+    attempts: int
+    enqueued_at: float
+
+
+class SQLiteIngestQueue:
+    """Durable FIFO of webhook payloads backed by a local SQLite file.
+
+    Jobs survive process restarts: anything still ``claimed`` when the queue is
+    reopened is put back to ``pending`` so it gets replayed.
+    """
+
+    def __init__(self, path: str, max_depth: int = 1000, max_attempts: int = 3) -> None:
+        self.path = Path(path)
+        self.max_depth = max(1, max_depth)
+        self.max_attempts = max(1, max_attempts)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        recovered = conn.execute(
+            "UPDATE ingest_jobs SET status = 'pending', claimed_at = NULL "
+            "WHERE status = 'claimed'"
+        ).rowcount
+        conn.commit()
+        if recovered:
+            logger.warning(
+                "ingest_queue_recovered", extra={"jobs": recovered, "path": str(self.path)}
+            )
+        self._conn = conn
+        return conn
+
+    async def enqueue(self, payload: Dict[str, Any]) -> int:
+        return await asyncio.to_thread(self._enqueue, payload)
+
+    async def claim(self) -> Optional[IngestJob]:
+        return await asyncio.to_thread(self._claim)
+
+    async def ack(self, job_id: int) -> None:
+        await asyncio.to_thread(self._ack, job_id)
+
+    async def fail(self, job_id: int, error: str) -> None:
+        await asyncio.to_thread(self._fail, job_id, error)
+
+    async def stats(self) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.stats_sync)
+
+    def _enqueue(self, payload: Dict[str, Any]) -> int:
+        body = json.dumps(payload, ensure_ascii=False)
+        with self._lock:
+            conn = self._connect()
+            (depth,) = conn.execute(
+                "SELECT COUNT(*) FROM ingest_jobs WHERE status IN ('pending', 'claimed')"
+            ).fetchone()
+            if depth >= self.max_depth:
+                raise IngestQueueFull(f"Ingest queue is full ({depth} jobs).")
+            cursor = conn.execute(
+                "INSERT INTO ingest_jobs (payload, enqueued_at) VALUES (?, ?)",
+                (body, time.time()),
+            )
+            conn.commit()
+            return int(cursor.lastrowid)
+
+    def _claim(self) -> Optional[IngestJob]:
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT id, payload, attempts, enqueued_at FROM ingest_jobs "
+                "WHERE status = 'pending' ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE ingest_jobs SET status = 'claimed', claimed_at = ? WHERE id = ?",
+                (time.time(), row[0]),
+            )
+            conn.commit()
+        return IngestJob(
+            job_id=int(row[0]),
+            payload=json.loads(row[1]),
+            attempts=int(row[2]),
+            enqueued_at=float(row[3]),
+        )
+
+    def _ack(self, job_id: int) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM ingest_jobs WHERE id = ?", (job_id,))
+            conn.commit()
+
+    def _fail(self, job_id: int, error: str) -> None:
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT attempts FROM ingest_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return
+            attempts = int(row[0]) + 1
+            status = "dead" if attempts >= self.max_attempts else "pending"
+            conn.execute(
+                "UPDATE ingest_jobs SET status = ?, attempts = ?, claimed_at = NULL, "
+                "last_error = ? WHERE id = ?",
+                (status, attempts, error[:500], job_id),
+            )
+            conn.commit()
+        if status == "dead":
+            logger.error(
+                "ingest_job_dead", extra={"job_id": job_id, "attempts": attempts, "error": error}
+            )
+
+    def stats_sync(self) -> Dict[str, Any]:
+        with self._lock:
+            conn = self._connect()
+            counts = dict(
+                conn.execute(
+                    "SELECT status, COUNT(*) FROM ingest_jobs GROUP BY status"
+                ).fetchall()
+            )
+            (oldest,) = conn.execute(
+                "SELECT MIN(enqueued_at) FROM ingest_jobs "
+                "WHERE status IN ('pending', 'claimed')"
+            ).fetchone()
+        pending = int(counts.get("pending", 0))
+        claimed = int(counts.get("claimed", 0))
+        return {
+            "depth": pending + claimed,
+            "pending": pending,
+            "in_flight": claimed,
+            "dead": int(counts.get("dead", 0)),
+            "max_depth": self.max_depth,
+            "oldest_age_seconds": round(time.time() - oldest, 3) if oldest else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+JobProcessor = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class IngestWorkerPool:
+    """Fixed-size pool of asyncio workers draining a :class:`SQLiteIngestQueue`.
+
+    A processor may return an :class:`asyncio.Future` for work it has accepted
+    but not finished (e.g. a message held in a coalescing window). The job then
+    stays claimed, freeing the worker, and is acked or failed once the future
+    settles. ``slots`` caps how many jobs are processed at once; hand it to
+    anything that finishes deferred work so it counts against the same cap.
+    """
+
+    def __init__(
+        self,
+        queue: SQLiteIngestQueue,
+        processor: JobProcessor,
+        workers: int = 4,
+        poll_interval: float = 1.0,
+    ) -> None:
+        self.queue = queue
+        self.processor = processor
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self._tasks: List[asyncio.Task[None]] = []
+        self._deferred: Dict[asyncio.Task[None], asyncio.Future[Any]] = {}
+        self.slots = asyncio.Semaphore(self.workers)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._busy = 0
+        self._busy_seconds = 0.0
+        self._started_at = 0.0
+        self._processed = 0
+        self._failed = 0
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._started_at = time.monotonic()
+        self._tasks = [
+            asyncio.create_task(self._run(index)) for index in range(self.workers)
+        ]
+        logger.info("ingest_workers_started", extra={"workers": self.workers})
+
+    async def stop(self, drain: Optional[Callable[[], Awaitable[Any]]] = None) -> None:
+        """Stop the workers, then settle deferred jobs before closing the queue.
+
+        ``drain`` is awaited once no more jobs are being claimed and should
+        finish whatever the deferred futures wait on. Jobs whose futures are
+        still unsettled afterwards stay claimed and are replayed on next start.
+        """
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        if drain is not None:
+            try:
+                await drain()
+            except Exception:
+                logger.exception("ingest_drain_failed")
+        deferred = dict(self._deferred)
+        for task, pending in deferred.items():
+            if not pending.done():
+                task.cancel()
+        await asyncio.gather(*deferred, return_exceptions=True)
+        await asyncio.to_thread(self.queue.close)
+
+    def notify(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self, index: int) -> None:
+        assert self._wakeup is not None
+        while True:
+            job = await self.queue.claim()
+            if job is None:
+                self._wakeup.clear()
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                continue
+            self._busy += 1
+            started = time.monotonic()
+            try:
+                async with self.slots:
+                    result = await self.processor(job.payload)
+            except asyncio.CancelledError:
+                # Leave the job claimed; it is recovered on next start.
+                raise
+            except Exception as exc:
+                await self._fail(job, exc, index)
+            else:
+                if isinstance(result, asyncio.Future):
+                    task = asyncio.create_task(self._settle(job, result, index))
+                    self._deferred[task] = result
+                    task.add_done_callback(self._deferred.pop)
+                else:
+                    self._processed += 1
+                    await self.queue.ack(job.job_id)
+            finally:
+                self._busy -= 1
+                self._busy_seconds += time.monotonic() - started
+
+    async def _settle(self, job: IngestJob, pending: asyncio.Future[Any], index: int) -> None:
+        try:
+            await pending
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            await self._fail(job, exc, index)
+        else:
+            self._processed += 1
+            await self.queue.ack(job.job_id)
+
+    async def _fail(self, job: IngestJob, exc: Exception, index: int) -> None:
+        self._failed += 1
+        logger.exception(
+            "ingest_job_failed",
+            extra={"job_id": job.job_id, "worker": index, "attempts": job.attempts + 1},
+            exc_info=exc,
+        )
+        await self.queue.fail(job.job_id, str(exc) or repr(exc))
+
+    def metrics(self) -> Dict[str, Any]:
+        uptime = time.monotonic() - self._started_at if self._started_at else 0.0
+        capacity = uptime * self.workers
+        return {
+            "workers": self.workers,
+            "busy_workers": self._busy,
+            "utilisation": round(self._busy / self.workers, 3),
+            "utilisation_avg": round(self._busy_seconds / capacity, 3) if capacity else 0.0,
+            "processed": self._processed,
+            "failed": self._failed,
+            "deferred": len(self._deferred),
+            "running": bool(self._tasks),
+        }
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Literal
+
+from ..ai.tokens import HIGH_RISK_KEYWORDS, MEDIUM_RISK_KEYWORDS, OKR_ID_RE
+from ..config import Settings
+from ..utils.logger import get_logger
+from ..utils.period import DAILY_KEYWORDS, MONTHLY_KEYWORDS, WEEKLY_KEYWORDS
+
+logger = get_logger(__name__)
+
+GateDecision = Literal["drop", "template", "full"]
+
+# Whole-message acknowledgements and chit-chat; never a report.
+ACK_PHRASES = {
+    "收到",
+    "好的",
+    "好",
+    "嗯",
+    "嗯嗯",
+    "ok",
+    "okay",
+    "谢谢",
+    "感谢",
+    "多谢",
+    "了解",
+    "明白",
+    "知道了",
+    "辛苦了",
+    "没问题",
+    "早",
+    "早上好",
+    "晚安",
+    "在吗",
+    "thanks",
+    "thx",
+    "got it",
+    "+1",
+    "1",
+}
+# Short updates that only say nothing happened; a template extract is enough.
+NO_PROGRESS_KEYWORDS = (
+    "无进展",
+    "没有进展",
+    "暂无进展",
+    "无更新",
+    "暂无更新",
+    "没有更新",
+    "同昨日",
+    "同上",
+    "请假",
+    "休假",
+    "调休",
+    "no update",
+    "no progress",
+    "nothing new",
+)
+_RISK_KEYWORDS = tuple(keyword.lower() for keyword in HIGH_RISK_KEYWORDS + MEDIUM_RISK_KEYWORDS)
+_PERIOD_KEYWORDS = tuple(
+    keyword.lower() for keyword in DAILY_KEYWORDS | WEEKLY_KEYWORDS | MONTHLY_KEYWORDS
+)
+_LIST_MARKER_RE = re.compile(r"^\s*(\d+[.、)）]|[-*•·]|【[^】]+】)", re.MULTILINE)
+_ACK_STRIP_RE = re.compile(r"[\s!！。.,，~～、?？]+")
+
+
+@dataclass(frozen=True)
+class GateResult:
+    decision: GateDecision
+    reason: str
+
+
+def _is_symbolic(text: str) -> bool:
+    """Only emoji, punctuation and whitespace (or Feishu ``[表情]`` codes)."""
+    text = re.sub(r"\[[^\]\s]{1,8}\]", "", text)
+    return all(
+        char.isspace() or unicodedata.category(char)[0] in ("P", "S", "C") for char in text
+    )
+
+
+class MessageGate:
+    """Local pre-filter deciding whether a chat message is worth an LLM call."""
+
+    def __init__(self, min_report_chars: int = 15, no_progress_max_chars: int = 40) -> None:
+        self.min_report_chars = min_report_chars
+        self.no_progress_max_chars = no_progress_max_chars
+        self._decisions: Counter[str] = Counter()
+        self._reasons: Counter[str] = Counter()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "MessageGate | None":
+        if not settings.message_gate_enabled:
+            return None
+        return cls(
+            min_report_chars=settings.message_gate_min_report_chars,
+            no_progress_max_chars=settings.message_gate_no_progress_max_chars,
+        )
+
+    def classify(self, text: str) -> GateResult:
+        stripped = (text or "").strip()
+        lowered = stripped.lower()
+        if not stripped or _is_symbolic(stripped):
+            return GateResult("drop", "empty")
+        if _ACK_STRIP_RE.sub(" ", lowered).strip() in ACK_PHRASES:
+            return GateResult("drop", "acknowledgement")
+        # However short, a message naming a risk is never answered from a template.
+        if any(keyword in lowered for keyword in _RISK_KEYWORDS):
+            return GateResult("full", "risk_keyword")
+        # Nor is one that names an objective or KR ("KR2 完成"): it is progress.
+        if OKR_ID_RE.search(stripped):
+            return GateResult("full", "okr_id")
+        length = len(stripped)
+        if length <= self.no_progress_max_chars and any(
+            keyword in lowered for keyword in NO_PROGRESS_KEYWORDS
+        ):
+            return GateResult("template", "no_progress")
+        if any(keyword in lowered for keyword in _PERIOD_KEYWORDS):
+            return GateResult("full", "period_keyword")
+        if length >= self.min_report_chars or len(_LIST_MARKER_RE.findall(stripped)) >= 2:
+            return GateResult("full", "content")
+        return GateResult("template", "too_short")
+
+    def record(self, result: GateResult, user_id: str) -> None:
+        self._decisions[result.decision] += 1
+        self._reasons[result.reason] += 1
+        logger.info(
+            "message_gate",
+            extra={"user_id": user_id, "decision": result.decision, "reason": result.reason},
+        )
+
+    def metrics(self) -> Dict[str, Any]:
+        total = sum(self._decisions.values())
+        skipped = self._decisions["drop"] + self._decisions["template"]
+        return {
+            "decisions": dict(self._decisions),
+            "reasons": dict(self._reasons),
+            "llm_skip_rate": round(skipped / total, 3) if total else 0.0,
+        }
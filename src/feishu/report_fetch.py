@@ -6,25 +6,28 @@ import json
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta, time
 from pathlib import Path
-from typing import Iterable, List, Optional, Dict
+from typing import Iterable, List, Optional, Dict, Tuple
 
 import httpx
 
-from ..ai.qwen import QwenClient
+from ..ai.qwen import build_qwen_client
 from ..config import get_settings
-from ..feishu.api_client import FeishuAPIClient
+from ..feishu.api_client import FEISHU_BASE_URL, FeishuAPIClient
 from ..feishu.cards import build_summary_card
 from ..okr.source import OKRSource, build_okr_source
 from ..okr.sync_job import fetch_tenant_access_token
 from ..schemas import ReportIn, StoredReport
 from ..storage import build_storage
 from ..storage.base import StorageDriver
+from ..storage.retranslate import RetranslationBacklog
+from ..utils.http import shared_http_client
 from ..utils.logger import get_logger
+from ..utils.retry import RetryPolicy, call_with_retry
 from ..utils.period import detect_period
 
 logger = get_logger(__name__)
 
-REPORT_QUERY_URL = "https://open.feishu.cn/open-apis/report/v1/tasks/query"
+REPORT_QUERY_PATH = "/open-apis/report/v1/tasks/query"
 
 
 @dataclass
@@ -98,7 +101,10 @@ async def _fetch_reports_for_rule(
     start_ts: int,
     end_ts: int,
     period_type: str,
+    retry_policy: Optional[RetryPolicy] = None,
+    base_url: str = FEISHU_BASE_URL,
 ) -> List[ReportTask]:
+    retry_policy = retry_policy or RetryPolicy()
     headers = {"Authorization": f"Bearer {token}"}
     page_token = ""
     results: List[ReportTask] = []
@@ -110,24 +116,34 @@ async def _fetch_reports_for_rule(
             "page_size": 20,
             "rule_id": rule_id,
         }
-        response = await client.post(REPORT_QUERY_URL, headers=headers, json=body)
-        try:
-            response.raise_for_status()
-        except httpx.HTTPStatusError as exc:
-            try:
-                detail = response.json()
-            except Exception:
-                detail = response.text
-            logger.error(
-                "report_query_error",
-                extra={
-                    "status_code": response.status_code,
-                    "detail": detail,
-                    "rule_id": rule_id,
-                    "request_body": body,
-                },
+
+        async def query(timeout: float) -> httpx.Response:
+            response = await client.post(
+                base_url.rstrip("/") + REPORT_QUERY_PATH,
+                headers=headers,
+                json=body,
+                timeout=timeout,
             )
-            raise exc
+            try:
+                response.raise_for_status()
+            except httpx.HTTPStatusError as exc:
+                try:
+                    detail = response.json()
+                except Exception:
+                    detail = response.text
+                logger.error(
+                    "report_query_error",
+                    extra={
+                        "status_code": response.status_code,
+                        "detail": detail,
+                        "rule_id": rule_id,
+                        "request_body": body,
+                    },
+                )
+                raise exc
+            return response
+
+        response = await call_with_retry(retry_policy, query, label="report_query")
         payload = response.json()
         if payload.get("code") != 0:
             raise RuntimeError(f"query report failed: {payload}")
@@ -155,6 +171,25 @@ async def _fetch_reports_for_rule(
     return results
 
 
+def _chain_by_user(
+    pending: List[Tuple[ReportTask, ReportIn, str]],
+) -> List[List[Tuple[ReportTask, ReportIn, str]]]:
+    """Split into rounds holding at most one report per user, oldest first.
+
+    Round ``n`` holds each user's ``n``-th report, so by the time it runs the
+    report just before it has been translated and can serve as its baseline.
+    """
+    rounds: List[List[Tuple[ReportTask, ReportIn, str]]] = []
+    seen: Dict[str, int] = {}
+    for item in sorted(pending, key=lambda item: item[1].message_ts):
+        position = seen.get(item[1].user_id, 0)
+        seen[item[1].user_id] = position + 1
+        if position == len(rounds):
+            rounds.append([])
+        rounds[position].append(item)
+    return rounds
+
+
 async def fetch_reports(start_ts: Optional[int] = None, end_ts: Optional[int] = None) -> None:
     settings = get_settings()
     rules = settings.parse_report_rules()
@@ -164,8 +199,12 @@ async def fetch_reports(start_ts: Optional[int] = None, end_ts: Optional[int] =
     if not settings.feishu_tenant_app_id or not settings.feishu_tenant_app_secret:
         raise RuntimeError("Tenant app credentials are required to fetch reports.")
 
+    retry_policy = RetryPolicy.from_settings(settings)
     token = await fetch_tenant_access_token(
-        settings.feishu_tenant_app_id, settings.feishu_tenant_app_secret
+        settings.feishu_tenant_app_id,
+        settings.feishu_tenant_app_secret,
+        retry_policy=retry_policy,
+        base_url=settings.feishu_base_url,
     )
 
     now_ts = int(datetime.utcnow().timestamp())
@@ -187,26 +226,36 @@ async def fetch_reports(start_ts: Optional[int] = None, end_ts: Optional[int] =
 
     storage: StorageDriver = build_storage(settings)
     okr_source: OKRSource = build_okr_source(settings)
-    feishu_client = FeishuAPIClient(
-        app_id=settings.feishu_app_id,
-        app_secret=settings.feishu_app_secret,
-        default_chat_id=settings.feishu_default_chat_id,
-        timeout=settings.request_timeout,
-        trust_env=settings.http_trust_env,
-    )
-    qwen_client = QwenClient(
-        api_key=settings.dashscope_api_key,
-        model=settings.qwen_model,
-        timeout=settings.request_timeout,
-        api_mode=settings.qwen_api_mode,
-        trust_env=settings.http_trust_env,
+    backlog = (
+        RetranslationBacklog(settings.retranslate_backlog_path)
+        if settings.retranslate_backlog_path
+        else None
     )
 
-    async with httpx.AsyncClient(timeout=settings.request_timeout, trust_env=settings.http_trust_env) as client:
+    async with shared_http_client(settings) as client:
+        feishu_client = FeishuAPIClient(
+            app_id=settings.feishu_app_id,
+            app_secret=settings.feishu_app_secret,
+            default_chat_id=settings.feishu_default_chat_id,
+            timeout=settings.request_timeout,
+            trust_env=settings.http_trust_env,
+            http_client=client,
+            retry_policy=retry_policy,
+            base_url=settings.feishu_base_url,
+        )
+        qwen_client = build_qwen_client(settings, http_client=client)
         for rule_id, period in rules:
             tasks = await _fetch_reports_for_rule(
-                client, token, rule_id, start_ts, end_ts, period
+                client,
+                token,
+                rule_id,
+                start_ts,
+                end_ts,
+                period,
+                retry_policy,
+                base_url=settings.feishu_base_url,
             )
+            pending: List[Tuple[ReportTask, ReportIn, str]] = []
             for task in tasks:
                 if task.task_id in processed:
                     continue
@@ -225,20 +274,41 @@ async def fetch_reports(start_ts: Optional[int] = None, end_ts: Optional[int] =
                 okr_brief = await okr_source.get_okr_brief(
                     report.user_id, period_start, period_end
                 )
-                extract = await qwen_client.generate_hr_extract(report, okr_brief)
-                record = StoredReport(report=report, hr_extract=extract, okr_brief=okr_brief)
-                await storage.save(record)
-                card = build_summary_card(report, extract)
-                await feishu_client.send_card(card)
-                processed.add(task.task_id)
-                logger.info(
-                    "report_task_processed",
-                    extra={
-                        "task_id": task.task_id,
-                        "user_id": report.user_id,
-                        "period_type": report.period_type,
-                    },
+                pending.append((task, report, okr_brief))
+            if not pending:
+                continue
+            # Short reports are packed several per prompt when batching is on.
+            rounds = [pending]
+            if qwen_client.incremental is not None:
+                rounds = _chain_by_user(pending)
+            latest: Dict[str, Optional[StoredReport]] = {}
+            for batch in rounds:
+                previous = None
+                if qwen_client.incremental is not None:
+                    for _, report, _ in batch:
+                        if report.user_id not in latest:
+                            latest[report.user_id] = await storage.latest_for_user(report.user_id)
+                    previous = [latest[report.user_id] for _, report, _ in batch]
+                extracts = await qwen_client.generate_hr_extracts(
+                    [(report, okr_brief) for _, report, okr_brief in batch], previous
                 )
+                for (task, report, okr_brief), extract in zip(batch, extracts):
+                    record = StoredReport(report=report, hr_extract=extract, okr_brief=okr_brief)
+                    await storage.save(record)
+                    latest[report.user_id] = record
+                    if extract.needs_retranslation and backlog is not None:
+                        await backlog.add(report, okr_brief)
+                    card = build_summary_card(report, extract)
+                    await feishu_client.send_card(card)
+                    processed.add(task.task_id)
+                    logger.info(
+                        "report_task_processed",
+                        extra={
+                            "task_id": task.task_id,
+                            "user_id": report.user_id,
+                            "period_type": report.period_type,
+                        },
+                    )
 
     _save_processed(cache_path, processed)
     logger.info("report_fetch_completed", extra={"processed": len(processed)})
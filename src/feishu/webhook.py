@@ -2,19 +2,23 @@ from __future__ import annotations
 
 import json
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, AsyncContextManager, Dict, Optional
 
 from fastapi import HTTPException, status
 
 from ..ai.qwen import QwenClient
+from ..ai.triage import TriageResult, light_extract
 from ..config import Settings
 from ..okr.source import OKRSource
-from ..schemas import FeishuWebhookEnvelope, ReportIn, StoredReport
+from ..schemas import FeishuWebhookEnvelope, HRExtract, ReportIn, StoredReport
 from ..storage.base import StorageDriver
+from ..storage.retranslate import RetranslationBacklog
 from ..utils.logger import get_logger
 from ..utils.period import detect_period
 from .api_client import FeishuAPIClient
 from .cards import build_summary_card
+from .coalesce import ReportCoalescer
+from .message_gate import GateResult, MessageGate
 
 logger = get_logger(__name__)
 
@@ -27,12 +31,25 @@ class FeishuWebhookHandler:
         storage: StorageDriver,
         okr_source: OKRSource,
         feishu_client: FeishuAPIClient,
+        coalesce_limiter: Optional[AsyncContextManager[Any]] = None,
     ) -> None:
         self.settings = settings
         self.qwen_client = qwen_client
         self.storage = storage
         self.okr_source = okr_source
         self.feishu_client = feishu_client
+        self.backlog: RetranslationBacklog | None = None
+        if settings.retranslate_backlog_path:
+            self.backlog = RetranslationBacklog(settings.retranslate_backlog_path)
+        self.coalescer: ReportCoalescer | None = None
+        if settings.report_coalesce_seconds > 0:
+            self.coalescer = ReportCoalescer(
+                settings.report_coalesce_seconds,
+                self.process_report,
+                max_messages=settings.report_coalesce_max_messages,
+                limiter=coalesce_limiter,
+            )
+        self.gate = MessageGate.from_settings(settings)
 
     async def handle(
         self, payload: Dict[str, Any] | FeishuWebhookEnvelope, *, validate_token: bool = True
@@ -43,11 +60,27 @@ class FeishuWebhookHandler:
             envelope = FeishuWebhookEnvelope.model_validate(payload)
         if validate_token:
             self._validate_token(envelope)
+        report = self.build_report(envelope)
+        gate_result = None
+        if self.gate is not None:
+            gate_result = self.gate.classify(report.raw_text)
+            if gate_result.decision == "drop":
+                # Dropped before coalescing so acks never merge into a report.
+                self.gate.record(gate_result, report.user_id)
+                return {"ok": True, "skipped": gate_result.reason}
+        if self.coalescer is not None:
+            # Settles once the merged report is processed; see IngestWorkerPool.
+            flushed = await self.coalescer.add(report)
+            return {"ok": True, "coalesced": True, "flushed": flushed}
+        await self.process_report(report, gate_result)
+        return {"ok": True}
+
+    def build_report(self, envelope: FeishuWebhookEnvelope) -> ReportIn:
         message = envelope.event.message
         text = self._extract_text(message.message_type, message.content)
         message_ts = _parse_timestamp(message.create_time)
         period_type, period_start, period_end = detect_period(text, message_ts.date())
-        report = ReportIn(
+        return ReportIn(
             user_id=message.sender.preferred_user_id,
             user_name=message.sender.name or message.sender.preferred_user_id,
             period_type=period_type,
@@ -56,13 +89,24 @@ class FeishuWebhookHandler:
             raw_text=text,
             message_ts=message_ts,
         )
+
+    async def process_report(
+        self, report: ReportIn, gate_result: Optional[GateResult] = None
+    ) -> None:
+        """Translate, store and announce one report.
+
+        ``gate_result`` is the gate's verdict on this exact text when the caller
+        already has it; merged (coalesced) reports are classified here.
+        """
         okr_brief = await self.okr_source.get_okr_brief(
-            report.user_id, period_start, period_end
+            report.user_id, report.period_start, report.period_end
         )
-        extract = await self.qwen_client.generate_hr_extract(report, okr_brief)
+        extract = await self._extract(report, okr_brief, gate_result)
         card = build_summary_card(report, extract)
         record = StoredReport(report=report, hr_extract=extract, okr_brief=okr_brief)
         await self.storage.save(record)
+        if extract.needs_retranslation and self.backlog is not None:
+            await self.backlog.add(report, okr_brief)
         await self.feishu_client.send_card(card)
         logger.info(
             "webhook_processed",
@@ -72,7 +116,25 @@ class FeishuWebhookHandler:
                 "okr_brief_len": len(okr_brief),
             },
         )
-        return {"ok": True}
+
+    async def _extract(
+        self, report: ReportIn, okr_brief: str, gate_result: Optional[GateResult]
+    ) -> HRExtract:
+        if self.gate is not None:
+            result = gate_result or self.gate.classify(report.raw_text)
+            self.gate.record(result, report.user_id)
+            if result.decision != "full":
+                summary = " ".join(report.raw_text.split()) or "本期无内容。"
+                return light_extract(TriageResult("low", False, 0.9, summary), report)
+        previous = None
+        if self.qwen_client.incremental is not None:
+            previous = await self.storage.latest_for_user(report.user_id)
+        return await self.qwen_client.generate_hr_extract(report, okr_brief, previous)
+
+    async def aclose(self) -> None:
+        """Flush any reports still waiting in the coalescing window."""
+        if self.coalescer is not None:
+            await self.coalescer.flush_all()
 
     def _validate_token(self, envelope: FeishuWebhookEnvelope) -> None:
         expected = self.settings.feishu_bot_verification_token
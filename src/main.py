@@ -2,15 +2,26 @@ from __future__ import annotations
 
 import asyncio
 import json
+import uuid
 from contextlib import suppress
 from datetime import datetime, timedelta, time as dt_time
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
 from fastapi import FastAPI, HTTPException, Request, status
 
-from .ai.qwen import QwenClient
+from .ai.breaker import breaker_metrics
+from .ai.concurrency import concurrency_metrics
+from .ai.hedging import hedge_metrics
+from .ai.incremental import incremental_metrics
+from .ai.json_repair import json_repair_metrics
+from .ai.qwen import QwenClient, build_qwen_client
+from .ai.ratelimit import rate_limiter_metrics
+from .ai.router import router_metrics
+from .ai.triage import cascade_metrics
 from .config import Settings, get_settings
 from .feishu.api_client import FeishuAPIClient
+from .feishu.dedupe import EventDeduplicator, dedupe_keys
+from .feishu.ingest_queue import IngestQueueFull, IngestWorkerPool, SQLiteIngestQueue
 from .feishu.report_fetch import fetch_reports
 from .feishu.webhook import FeishuWebhookHandler
 from .okr.source import OKRSource, build_okr_source
@@ -18,10 +29,20 @@ from .okr.sync_job import sync_okrs
 from .schemas import FeishuWebhookEnvelope
 from .storage import build_storage
 from .storage.base import StorageDriver
+from .utils.http import close_shared_client, http_pool_stats, open_shared_client
 from .utils.logger import get_logger, setup_logging
+from .utils.retry import RetryPolicy
+
+try:  # optional: faster bytes -> dict decoding
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is absent
+    orjson = None
 
 logger = get_logger(__name__)
 
+REPORT_EVENT_TYPES = {"im.message.receive_v1"}
+REPORT_MESSAGE_TYPES = {"text", "post"}
+
 
 def create_app(
     settings: Optional[Settings] = None,
@@ -34,19 +55,41 @@ def create_app(
     settings = settings or get_settings()
     storage = storage or build_storage(settings)
     okr_source = okr_source or build_okr_source(settings)
-    qwen_client = qwen_client or QwenClient(
-        api_key=settings.dashscope_api_key,
-        model=settings.qwen_model,
-        timeout=settings.request_timeout,
-        api_mode=settings.qwen_api_mode,
-        trust_env=settings.http_trust_env,
-    )
+    qwen_client = qwen_client or build_qwen_client(settings)
     feishu_client = feishu_client or FeishuAPIClient(
         app_id=settings.feishu_app_id,
         app_secret=settings.feishu_app_secret,
         default_chat_id=settings.feishu_default_chat_id,
         timeout=settings.request_timeout,
         trust_env=settings.http_trust_env,
+        retry_policy=RetryPolicy.from_settings(settings),
+        base_url=settings.feishu_base_url,
+    )
+
+    ingest_queue = SQLiteIngestQueue(
+        settings.ingest_queue_path,
+        max_depth=settings.ingest_queue_max_depth,
+        max_attempts=settings.ingest_max_attempts,
+    )
+
+    deduplicator = EventDeduplicator(
+        settings.dedupe_index_path,
+        ttl_seconds=settings.dedupe_ttl_seconds,
+        max_entries=settings.dedupe_max_entries,
+    )
+
+    async def _process_job(payload: Dict[str, Any]) -> Optional[asyncio.Future[None]]:
+        envelope = FeishuWebhookEnvelope.model_validate(payload)
+        result = await handler.handle(envelope, validate_token=False)
+        # A coalesced message is acked only once its merged report is processed.
+        return result.get("flushed")
+
+    # With adaptive concurrency the controller sets the pace; the pool only
+    # needs enough workers to reach its ceiling.
+    worker_pool = IngestWorkerPool(
+        ingest_queue,
+        _process_job,
+        workers=max(settings.ingest_workers, settings.qwen_aimd_max_concurrency),
     )
     handler = FeishuWebhookHandler(
         settings=settings,
@@ -54,49 +97,116 @@ def create_app(
         storage=storage,
         okr_source=okr_source,
         feishu_client=feishu_client,
+        coalesce_limiter=worker_pool.slots,
     )
 
     app = FastAPI(title="Feishu HR Translator")
     app.state.auto_sync_task: Optional[asyncio.Task[None]] = None
+    app.state.ingest_queue = ingest_queue
+    app.state.worker_pool = worker_pool
+    app.state.deduplicator = deduplicator
+    # In-memory providers are read on the event loop that mutates them; only
+    # the ones backed by SQLite, or updated from worker threads, go to a thread.
+    # Both maps may name the same section; their dicts are merged.
+    app.state.metrics_providers: Dict[str, Callable[[], Dict[str, Any]]] = {
+        "ingest": worker_pool.metrics,
+        "http_pool": http_pool_stats,
+        "qwen_limits": rate_limiter_metrics,
+        "qwen_breakers": breaker_metrics,
+        "qwen_hedging": hedge_metrics,
+        "qwen_routing": router_metrics,
+        "qwen_json": json_repair_metrics,
+        "qwen_cascade": cascade_metrics,
+        "qwen_incremental": incremental_metrics,
+        "qwen_concurrency": concurrency_metrics,
+    }
+    app.state.blocking_metrics_providers: Dict[str, Callable[[], Dict[str, Any]]] = {
+        "ingest": ingest_queue.stats_sync,
+        "dedupe": deduplicator.metrics,
+    }
+    if getattr(qwen_client, "cache", None) is not None:
+        app.state.blocking_metrics_providers["llm_cache"] = qwen_client.cache.metrics
+    if handler.coalescer is not None:
+        app.state.metrics_providers["coalesce"] = handler.coalescer.metrics
+    if handler.gate is not None:
+        app.state.metrics_providers["message_gate"] = handler.gate.metrics
 
     @app.get("/healthz")
     async def healthz() -> dict[str, bool]:
         return {"ok": True}
 
+    @app.get("/metrics")
+    async def metrics() -> Dict[str, Any]:
+        blocking = dict(app.state.blocking_metrics_providers)
+        sections: Dict[str, Dict[str, Any]] = {
+            name: await asyncio.to_thread(provider) for name, provider in blocking.items()
+        }
+        for name, provider in app.state.metrics_providers.items():
+            sections[name] = {**sections.get(name, {}), **provider()}
+        return sections
+
     @app.post("/webhook/feishu")
-    async def feishu_webhook(request: Request) -> dict[str, bool]:
+    async def feishu_webhook(request: Request) -> Dict[str, Any]:
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit():
+            _check_body_size(int(content_length), settings)
         raw_body = await request.body()
-        try:
-            payload_data = json.loads(raw_body.decode("utf-8"))
-        except UnicodeDecodeError:
-            payload_data = json.loads(raw_body.decode("utf-8", errors="ignore"))
-        except json.JSONDecodeError as exc:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid JSON payload: {exc}",
-            ) from exc
-        payload = _normalize_webhook_payload(payload_data, settings)
-        if payload.get("type") == "url_verification" and "challenge" in payload:
-            return {"challenge": payload["challenge"]}
+        _check_body_size(len(raw_body), settings)
+        payload_data = _decode_webhook_body(raw_body)
 
-        envelope = FeishuWebhookEnvelope.model_validate(payload)
-        _validate_webhook_token(envelope, settings)
-
-        async def _process_webhook() -> None:
-            try:
-                await handler.handle(envelope, validate_token=False)
-            except Exception:
-                logger.exception(
-                    "webhook_processing_failed",
-                    extra={"event_id": envelope.header.event_id},
+        # Cheap checks on the raw dict before any model is built.
+        if payload_data.get("type") == "url_verification" and "challenge" in payload_data:
+            _validate_webhook_token(payload_data.get("token"), settings)
+            return {"challenge": payload_data["challenge"]}
+        if isinstance(payload_data.get("event"), dict):
+            _validate_webhook_token(_raw_header_token(payload_data), settings)
+            skip_reason = _non_report_reason(payload_data)
+            if skip_reason:
+                logger.info(
+                    "webhook_ignored",
+                    extra={
+                        "reason": skip_reason,
+                        "event_id": (payload_data.get("header") or {}).get("event_id"),
+                    },
                 )
+                return {"ok": True}
 
-        asyncio.create_task(_process_webhook())
+        payload = _normalize_webhook_payload(payload_data, settings)
+        envelope = FeishuWebhookEnvelope.model_validate(payload)
+
+        keys = dedupe_keys(envelope)
+        if await deduplicator.check_and_mark(keys):
+            logger.info(
+                "webhook_duplicate_skipped",
+                extra={
+                    "event_id": envelope.header.event_id,
+                    "message_id": envelope.event.message.message_id,
+                },
+            )
+            return {"ok": True}
+
+        try:
+            job_id = await ingest_queue.enqueue(payload)
+        except IngestQueueFull as exc:
+            await deduplicator.forget(keys)
+            logger.warning(
+                "webhook_queue_full", extra={"event_id": envelope.header.event_id}
+            )
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)
+            ) from exc
+        worker_pool.notify()
+        logger.info(
+            "webhook_enqueued",
+            extra={"event_id": envelope.header.event_id, "job_id": job_id},
+        )
         return {"ok": True}
 
     @app.on_event("startup")
     async def on_startup() -> None:
         logger.info("app_startup", extra={"storage_driver": settings.storage_driver})
+        await open_shared_client(settings)
+        await worker_pool.start()
         if settings.auto_sync_enabled:
             lookback_hours = max(1, settings.auto_sync_lookback_hours)
             auto_sync_time = settings.get_auto_sync_time()
@@ -161,6 +271,12 @@ def create_app(
             task.cancel()
             with suppress(asyncio.CancelledError):
                 await task
+        await worker_pool.stop(drain=handler.aclose)
+        await close_shared_client()
+        await asyncio.to_thread(deduplicator.close)
+        cache = getattr(qwen_client, "cache", None)
+        if cache is not None:
+            await asyncio.to_thread(cache.close)
 
     return app
 
@@ -168,14 +284,11 @@ def create_app(
 app = create_app()
 
 
-def _validate_webhook_token(
-    envelope: FeishuWebhookEnvelope, settings: Settings
-) -> None:
+def _validate_webhook_token(incoming: Optional[str], settings: Settings) -> None:
     expected = settings.feishu_bot_verification_token
     if not expected:
         logger.warning("verification_token_not_configured")
         return
-    incoming = envelope.header.token
     if incoming != expected:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -183,6 +296,79 @@ def _validate_webhook_token(
         )
 
 
+def _check_body_size(size: int, settings: Settings) -> None:
+    if size > settings.webhook_max_body_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"Webhook payload exceeds {settings.webhook_max_body_bytes} bytes.",
+        )
+
+
+def _loads(raw_body: bytes) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(raw_body)
+        except orjson.JSONDecodeError as exc:
+            # Report bad encoding the way json.loads does, so callers can tell it apart.
+            if "not valid UTF-8" in str(exc):
+                raise UnicodeDecodeError("utf-8", raw_body, 0, len(raw_body), str(exc)) from exc
+            raise
+    return json.loads(raw_body)
+
+
+def _decode_webhook_body(raw_body: bytes) -> Dict[str, Any]:
+    """Parse the request bytes directly, without an intermediate str copy."""
+    try:
+        data = _loads(raw_body)
+    except UnicodeDecodeError:
+        # Retry once, dropping undecodable bytes.
+        data = _decode_lenient(raw_body)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid JSON payload: {exc}",
+        ) from exc
+    if not isinstance(data, dict):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Webhook payload must be a JSON object.",
+        )
+    return data
+
+
+def _decode_lenient(raw_body: bytes) -> Any:
+    try:
+        return json.loads(raw_body.decode("utf-8", errors="ignore"))
+    except json.JSONDecodeError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid JSON payload: {exc}",
+        ) from exc
+
+
+def _raw_header_token(payload: Dict[str, Any]) -> Optional[str]:
+    header = payload.get("header")
+    if isinstance(header, dict):
+        return header.get("token")
+    return payload.get("token")
+
+
+def _non_report_reason(payload: Dict[str, Any]) -> Optional[str]:
+    """Return why an event can be acknowledged without processing, if any."""
+    header = payload.get("header")
+    if isinstance(header, dict):
+        event_type = header.get("event_type")
+        if event_type and event_type not in REPORT_EVENT_TYPES:
+            return f"event_type:{event_type}"
+    message = payload["event"].get("message")
+    if not isinstance(message, dict):
+        return "missing_message"
+    message_type = message.get("message_type")
+    if message_type not in REPORT_MESSAGE_TYPES:
+        return f"message_type:{message_type}"
+    return None
+
+
 def _normalize_webhook_payload(
     payload: Dict[str, Any], settings: Settings
 ) -> Dict[str, Any]:
@@ -192,7 +378,7 @@ def _normalize_webhook_payload(
     if {"user_id", "user_name", "text"} <= payload.keys():
         now_ms = int(datetime.utcnow().timestamp() * 1000)
         message = {
-            "message_id": payload.get("message_id", "demo-message"),
+            "message_id": payload.get("message_id") or f"demo-{uuid.uuid4().hex}",
             "message_type": "text",
             "content": json.dumps({"text": payload["text"]}, ensure_ascii=False),
             "create_time": str(now_ms),
@@ -205,7 +391,7 @@ def _normalize_webhook_payload(
         return {
             "schema": "2.0",
             "header": {
-                "event_id": payload.get("event_id", "demo-event"),
+                "event_id": payload.get("event_id") or f"demo-{uuid.uuid4().hex}",
                 "token": token,
             },
             "event": {"message": message},
@@ -7,26 +7,40 @@ import re
 from datetime import date
 from pathlib import Path
 from collections import defaultdict
-from typing import Any, DefaultDict, Dict, Iterable, List, Set
+from typing import Any, DefaultDict, Dict, Iterable, List, Optional, Set
 
 import httpx
 
 from ..config import get_settings
+from ..feishu.api_client import FEISHU_BASE_URL, TENANT_TOKEN_PATH
 from ..utils.logger import get_logger
+from ..utils.retry import RetryPolicy, call_with_retry
 
 logger = get_logger(__name__)
 
-TOKEN_URL = "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal"
-OKR_BATCH_GET_URL = "https://open.feishu.cn/open-apis/okr/v1/okrs/batch_get"
+OKR_BATCH_GET_PATH = "/open-apis/okr/v1/okrs/batch_get"
 
 
-async def fetch_tenant_access_token(app_id: str, app_secret: str) -> str:
+async def fetch_tenant_access_token(
+    app_id: str,
+    app_secret: str,
+    retry_policy: Optional[RetryPolicy] = None,
+    base_url: str = FEISHU_BASE_URL,
+) -> str:
     async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.post(
-            TOKEN_URL,
-            json={"app_id": app_id, "app_secret": app_secret},
+
+        async def request_token(timeout: float) -> httpx.Response:
+            response = await client.post(
+                base_url.rstrip("/") + TENANT_TOKEN_PATH,
+                json={"app_id": app_id, "app_secret": app_secret},
+                timeout=timeout,
+            )
+            response.raise_for_status()
+            return response
+
+        response = await call_with_retry(
+            retry_policy or RetryPolicy(), request_token, label="tenant_token"
         )
-        response.raise_for_status()
         payload = response.json()
     if payload.get("code") != 0:
         raise RuntimeError(f"Failed to fetch tenant token: {payload}")
@@ -168,7 +182,10 @@ async def fetch_okrs_detail(
     okr_ids: List[str],
     timeout: float,
     trust_env: bool,
+    retry_policy: Optional[RetryPolicy] = None,
+    base_url: str = FEISHU_BASE_URL,
 ) -> List[Dict[str, Any]]:
+    retry_policy = retry_policy or RetryPolicy(attempt_timeout=timeout)
     headers = {"Authorization": f"Bearer {token}"}
     okr_records: List[Dict[str, Any]] = []
     async with httpx.AsyncClient(timeout=timeout, trust_env=trust_env) as client:
@@ -178,24 +195,34 @@ async def fetch_okrs_detail(
                 "user_id_type": "open_id",
                 "lang": "zh_cn",
             }
-            response = await client.get(OKR_BATCH_GET_URL, params=params, headers=headers)
-            try:
-                response.raise_for_status()
-            except httpx.HTTPStatusError as exc:
-                detail = ""
-                try:
-                    detail = json.dumps(response.json(), ensure_ascii=False)
-                except Exception:
-                    detail = response.text
-                logger.error(
-                    "okr_fetch_error",
-                    extra={
-                        "status": response.status_code,
-                        "detail": detail,
-                        "okr_ids": batch,
-                    },
+
+            async def get_batch(attempt_timeout: float) -> httpx.Response:
+                response = await client.get(
+                    base_url.rstrip("/") + OKR_BATCH_GET_PATH,
+                    params=params,
+                    headers=headers,
+                    timeout=attempt_timeout,
                 )
-                raise exc
+                try:
+                    response.raise_for_status()
+                except httpx.HTTPStatusError as exc:
+                    detail = ""
+                    try:
+                        detail = json.dumps(response.json(), ensure_ascii=False)
+                    except Exception:
+                        detail = response.text
+                    logger.error(
+                        "okr_fetch_error",
+                        extra={
+                            "status": response.status_code,
+                            "detail": detail,
+                            "okr_ids": batch,
+                        },
+                    )
+                    raise exc
+                return response
+
+            response = await call_with_retry(retry_policy, get_batch, label="okr_batch_get")
             payload = response.json()
             if payload.get("code") != 0:
                 raise RuntimeError(f"Failed to fetch OKR data: {payload}")
@@ -212,8 +239,12 @@ async def sync_okrs() -> None:
     if not okr_ids:
         raise RuntimeError("FEISHU_OKR_IDS must be configured to sync OKR data.")
 
+    retry_policy = RetryPolicy.from_settings(settings)
     token = await fetch_tenant_access_token(
-        settings.feishu_tenant_app_id, settings.feishu_tenant_app_secret
+        settings.feishu_tenant_app_id,
+        settings.feishu_tenant_app_secret,
+        retry_policy=retry_policy,
+        base_url=settings.feishu_base_url,
     )
     logger.info(
         "okr_sync_start",
@@ -225,6 +256,8 @@ async def sync_okrs() -> None:
         okr_ids,
         timeout=settings.request_timeout,
         trust_env=settings.http_trust_env,
+        retry_policy=retry_policy,
+        base_url=settings.feishu_base_url,
     )
     overrides = _parse_overrides(settings.feishu_okr_owner_overrides)
     cache_payload = _normalise_okrs(okr_records, overrides)
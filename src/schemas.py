@@ -94,6 +94,10 @@ class HRExtract(BaseModel):
     okr_alignment: OKRAlignment
     next_actions: List[str]
     risk_level: RiskLevel
+    # Set on offline fallback extracts so the report can be re-translated later.
+    needs_retranslation: bool = False
+    # Set on triage and message-gate extracts that never went through the model.
+    light: bool = False
 
 
 class StoredReport(BaseModel):
@@ -101,6 +105,53 @@ class StoredReport(BaseModel):
     hr_extract: HRExtract
     okr_brief: str
 
+    @classmethod
+    def from_csv_row(cls, row: Dict[str, str]) -> "StoredReport":
+        """Rebuild a record from :meth:`to_csv_row` output (lists are '; '-joined)."""
+
+        def split(value: Optional[str]) -> List[str]:
+            return [item for item in (value or "").split("; ") if item]
+
+        risks = []
+        for entry in split(row.get("risks")):
+            item, _, likelihood = entry.rpartition("(")
+            likelihood = likelihood.rstrip(")")
+            if item and likelihood in ("low", "medium", "high"):
+                risks.append(RiskItem(item=item, likelihood=likelihood, mitigation=""))
+            else:
+                risks.append(RiskItem(item=entry, likelihood="medium", mitigation=""))
+        needs = []
+        for entry in split(row.get("needs")):
+            topic, _, owner = entry.rpartition(":")
+            if not topic:
+                topic, owner = owner, ""
+            needs.append(NeedItem(topic=topic, owner=None if owner in ("", "-") else owner))
+        report = ReportIn(
+            user_id=row["user_id"],
+            user_name=row.get("user_name") or row["user_id"],
+            period_type=row["period_type"],
+            period_start=row["period_start"],
+            period_end=row["period_end"],
+            raw_text=row.get("raw_text") or "",
+            message_ts=row["message_ts"],
+        )
+        extract = HRExtract(
+            hr_summary=row.get("hr_summary") or "",
+            risks=risks,
+            needs=needs,
+            okr_alignment=OKRAlignment(
+                hit_objectives=split(row.get("hit_objectives")),
+                hit_krs=split(row.get("hit_krs")),
+                gaps=split(row.get("okr_gaps")),
+                confidence=float(row.get("okr_confidence") or 0.0),
+            ),
+            next_actions=split(row.get("next_actions")),
+            risk_level=row.get("risk_level") or "medium",
+            needs_retranslation=(row.get("hr_summary") or "").startswith("(离线模式)"),
+            light=row.get("light") == "true",
+        )
+        return cls(report=report, hr_extract=extract, okr_brief=row.get("okr_brief") or "")
+
     def to_csv_row(self) -> Dict[str, Any]:
         return {
             "user_id": self.report.user_id,
@@ -126,4 +177,5 @@ class StoredReport(BaseModel):
             "okr_confidence": f"{self.hr_extract.okr_alignment.confidence:.2f}",
             "next_actions": "; ".join(self.hr_extract.next_actions),
             "okr_brief": self.okr_brief,
+            "light": "true" if self.hr_extract.light else "false",
         }
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import abc
-from typing import Protocol
+from typing import Optional, Protocol
 
 from ..schemas import StoredReport
 
@@ -17,3 +17,6 @@ class StorageDriver(abc.ABC):
         """Persist the structured report."""
         raise NotImplementedError
 
+    async def latest_for_user(self, user_id: str) -> Optional[StoredReport]:
+        """Most recent stored report of ``user_id``; ``None`` when unsupported."""
+        return None
@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import asyncio
 import csv
+import threading
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional
 
 from ..schemas import StoredReport
 from ..utils.logger import get_logger
@@ -34,8 +35,13 @@ class CSVStorage(StorageDriver):
             "okr_confidence",
             "next_actions",
             "okr_brief",
+            # Appended last so rows stay readable under an older header.
+            "light",
         ]
         self._ensure_header()
+        # user_id -> newest row, built on first lookup and kept current by save().
+        self._latest: Optional[Dict[str, Dict[str, str]]] = None
+        self._lock = threading.Lock()
 
     def _ensure_header(self) -> None:
         if not self.path.exists() or self.path.stat().st_size == 0:
@@ -46,11 +52,46 @@ class CSVStorage(StorageDriver):
     async def save(self, record: StoredReport) -> None:
         await asyncio.to_thread(self._write_row, record)
 
+    async def latest_for_user(self, user_id: str) -> Optional[StoredReport]:
+        return await asyncio.to_thread(self._latest_for_user, user_id)
+
+    def _latest_for_user(self, user_id: str) -> Optional[StoredReport]:
+        with self._lock:
+            if self._latest is None:
+                self._latest = self._build_index()
+            row = self._latest.get(user_id)
+        if row is None:
+            return None
+        try:
+            return StoredReport.from_csv_row(row)
+        except ValueError:
+            logger.warning("csv_row_unreadable", extra={"user_id": user_id})
+            return None
+
+    def _build_index(self) -> Dict[str, Dict[str, str]]:
+        latest: Dict[str, Dict[str, str]] = {}
+        with self.path.open("r", newline="", encoding="utf-8") as fp:
+            for row in csv.DictReader(fp):
+                self._remember(latest, row)
+        logger.info("csv_latest_index_built", extra={"users": len(latest)})
+        return latest
+
+    @staticmethod
+    def _remember(latest: Dict[str, Dict[str, str]], row: Dict[str, str]) -> None:
+        user_id = row.get("user_id") or ""
+        current = latest.get(user_id)
+        # ISO timestamps compare correctly as strings.
+        if current is None or (row.get("message_ts") or "") >= (current.get("message_ts") or ""):
+            latest[user_id] = row
+
     def _write_row(self, record: StoredReport) -> None:
         row = record.to_csv_row()
-        with self.path.open("a", newline="", encoding="utf-8") as fp:
-            writer = csv.DictWriter(fp, fieldnames=self.headers)
-            writer.writerow(row)
+        with self._lock:
+            with self.path.open("a", newline="", encoding="utf-8") as fp:
+                writer = csv.DictWriter(fp, fieldnames=self.headers)
+                writer.writerow(row)
+            if self._latest is not None:
+                self._remember(self._latest, {key: str(value) for key, value in row.items()})
         logger.info(
             "report_saved",
             extra={
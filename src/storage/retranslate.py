@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+from typing import List, Tuple
+
+from ..schemas import ReportIn
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class RetranslationBacklog:
+    """Append-only JSONL of reports saved with an offline (fallback) extract."""
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+
+    async def add(self, report: ReportIn, okr_brief: str) -> None:
+        await asyncio.to_thread(self._append, report, okr_brief)
+
+    def _append(self, report: ReportIn, okr_brief: str) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(
+            {"report": report.model_dump(mode="json"), "okr_brief": okr_brief},
+            ensure_ascii=False,
+        )
+        with self.path.open("a", encoding="utf-8") as fp:
+            fp.write(line + "\n")
+        logger.info(
+            "report_marked_for_retranslation",
+            extra={"user_id": report.user_id, "path": str(self.path)},
+        )
+
+    def load(self) -> List[Tuple[ReportIn, str]]:
+        if not self.path.exists():
+            return []
+        items: List[Tuple[ReportIn, str]] = []
+        with self.path.open("r", encoding="utf-8") as fp:
+            for line in fp:
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                items.append((ReportIn.model_validate(data["report"]), data["okr_brief"]))
+        return items
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+from ..config import Settings
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ConnectionStats:
+    """Counts requests vs. freshly opened connections via httpcore trace events."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+        self.http2_requests = 0
+
+    async def on_request(self, request: httpx.Request) -> None:
+        self.requests += 1
+        request.extensions["trace"] = self._trace
+
+    async def _trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self.new_connections += 1
+        elif event_name == "connection.start_tls.complete":
+            self.tls_handshakes += 1
+        elif event_name == "http2.send_request_headers.started":
+            self.http2_requests += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        reused = max(0, self.requests - self.new_connections)
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reused_connections": reused,
+            "reuse_ratio": round(reused / self.requests, 3) if self.requests else 0.0,
+            "tls_handshakes": self.tls_handshakes,
+            "http2_requests": self.http2_requests,
+        }
+
+
+def build_http_client(
+    settings: Settings, stats: Optional[ConnectionStats] = None
+) -> httpx.AsyncClient:
+    """Create a keep-alive connection pool sized from settings."""
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry,
+    )
+    event_hooks = {"request": [stats.on_request]} if stats is not None else None
+    http2 = settings.http_http2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning(
+                "http2_unavailable", extra={"message": "pip install 'httpx[http2]'"}
+            )
+            http2 = False
+    return httpx.AsyncClient(
+        timeout=settings.request_timeout,
+        limits=limits,
+        http2=http2,
+        trust_env=settings.http_trust_env,
+        event_hooks=event_hooks,
+    )
+
+
+_shared_client: Optional[httpx.AsyncClient] = None
+_shared_stats = ConnectionStats()
+
+
+async def open_shared_client(settings: Settings) -> httpx.AsyncClient:
+    """Open the process-wide pool (idempotent)."""
+    global _shared_client
+    if _shared_client is None or _shared_client.is_closed:
+        _shared_client = build_http_client(settings, _shared_stats)
+        logger.info(
+            "http_pool_opened",
+            extra={
+                "http2": settings.http_http2,
+                "max_connections": settings.http_max_connections,
+                "max_keepalive": settings.http_max_keepalive_connections,
+            },
+        )
+    return _shared_client
+
+
+def get_shared_client() -> Optional[httpx.AsyncClient]:
+    if _shared_client is None or _shared_client.is_closed:
+        return None
+    return _shared_client
+
+
+async def close_shared_client() -> None:
+    global _shared_client
+    client, _shared_client = _shared_client, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
+        logger.info("http_pool_closed", extra=_shared_stats.snapshot())
+
+
+@asynccontextmanager
+async def shared_http_client(settings: Settings) -> AsyncIterator[httpx.AsyncClient]:
+    """Borrow the shared pool, opening (and later closing) it if nobody else has."""
+    existing = get_shared_client()
+    if existing is not None:
+        yield existing
+        return
+    client = await open_shared_client(settings)
+    try:
+        yield client
+    finally:
+        await close_shared_client()
+
+
+def http_pool_stats() -> Dict[str, Any]:
+    return {"open": get_shared_client() is not None, **_shared_stats.snapshot()}
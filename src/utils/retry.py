@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import httpx
+
+from ..config import Settings
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Transport failures, timeouts and 408/429/5xx are retryable; other 4xx are fatal."""
+    status = getattr(exc, "status_code", None)
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    return isinstance(exc, (httpx.TransportError, asyncio.TimeoutError))
+
+
+def retry_after_hint(exc: BaseException) -> Optional[float]:
+    hint = getattr(exc, "retry_after", None)
+    if hint is not None:
+        return float(hint)
+    if isinstance(exc, httpx.HTTPStatusError):
+        value = exc.response.headers.get("retry-after")
+        try:
+            return max(0.0, float(value)) if value else None
+        except ValueError:
+            return None
+    return None
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Attempts, end-to-end deadline and decorrelated-jitter backoff for one call."""
+
+    max_attempts: int = 3
+    deadline: float = 30.0
+    attempt_timeout: float = 10.0
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    min_attempt_timeout: float = 1.0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "RetryPolicy":
+        return cls(
+            max_attempts=settings.http_retry_max_attempts,
+            deadline=settings.http_retry_deadline_seconds,
+            attempt_timeout=settings.request_timeout,
+            base_delay=settings.http_retry_base_delay,
+            max_delay=settings.http_retry_max_delay,
+        )
+
+    def start(self) -> "RetryState":
+        return RetryState(self)
+
+
+class RetryState:
+    """Budget for one logical call: attempts used, time left, previous delay."""
+
+    def __init__(
+        self,
+        policy: RetryPolicy,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        self.policy = policy
+        self.attempts = 0
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._deadline_at = clock() + policy.deadline
+        self._previous_delay = policy.base_delay
+
+    def remaining(self) -> float:
+        return max(0.0, self._deadline_at - self._clock())
+
+    def attempt_timeout(self) -> float:
+        """Per-attempt timeout: an even share of the time left, at least ``attempt_timeout``.
+
+        Sharing what is left lets a retry after a timed-out attempt use the rest
+        of the deadline; it is never longer than the deadline allows.
+        """
+        self.attempts += 1
+        remaining = self.remaining()
+        attempts_left = max(1, self.policy.max_attempts - self.attempts + 1)
+        share = max(self.policy.attempt_timeout, remaining / attempts_left)
+        return max(0.001, min(share, remaining))
+
+    def next_delay(
+        self,
+        exc: BaseException,
+        classify: Callable[[BaseException], bool] = is_retryable,
+    ) -> Optional[float]:
+        """Sleep before the next attempt, or ``None`` when the call should give up."""
+        if not classify(exc) or self.attempts >= self.policy.max_attempts:
+            return None
+        policy = self.policy
+        delay = min(
+            policy.max_delay,
+            self._rng.uniform(policy.base_delay, self._previous_delay * 3),
+        )
+        self._previous_delay = delay
+        hint = retry_after_hint(exc)
+        if hint is not None:
+            delay = max(delay, hint)
+        if delay + policy.min_attempt_timeout > self.remaining():
+            return None
+        return delay
+
+
+async def call_with_retry(
+    policy: RetryPolicy,
+    call: Callable[[float], Awaitable[T]],
+    *,
+    classify: Callable[[BaseException], bool] = is_retryable,
+    label: str = "",
+) -> T:
+    """Await ``call(timeout)`` until it succeeds, fails fatally or the budget runs out."""
+    state = policy.start()
+    while True:
+        timeout = state.attempt_timeout()
+        try:
+            return await asyncio.wait_for(call(timeout), timeout=state.remaining() or 0.001)
+        except Exception as exc:
+            delay = state.next_delay(exc, classify)
+            if delay is None:
+                raise
+            logger.warning(
+                "http_retry",
+                extra={
+                    "call": label,
+                    "attempt": state.attempts,
+                    "delay": round(delay, 3),
+                    "error": str(exc) or repr(exc),
+                    "error_type": type(exc).__name__,
+                },
+            )
+            await asyncio.sleep(delay)
@@ -0,0 +1,120 @@
+import asyncio
+import time
+from datetime import datetime
+
+import httpx
+import pytest
+
+from src.ai.breaker import BreakerConfig, CircuitBreaker, get_circuit_breaker
+from src.ai.qwen import QwenClient
+from src.schemas import ReportIn
+from src.storage.retranslate import RetranslationBacklog
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def _report() -> ReportIn:
+    now = datetime.utcnow()
+    return ReportIn(
+        user_id="u_1",
+        user_name="测试",
+        period_type="daily",
+        period_start=now.date(),
+        period_end=now.date(),
+        raw_text="日报：接口联调，存在风险",
+        message_ts=now,
+    )
+
+
+def test_breaker_opens_and_probes_once():
+    breaker = CircuitBreaker("m", failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.allow_request() is False
+
+    time.sleep(0.06)
+    assert breaker.allow_request() is True  # the single probe
+    assert breaker.state == "half_open"
+    assert breaker.allow_request() is False
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    assert breaker.allow_request() is True
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.metrics()["trips"] == 2
+
+
+def test_lost_probe_is_released_or_expires():
+    breaker = CircuitBreaker("m", failure_threshold=1, reset_timeout=0.0, probe_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False
+    breaker.release_probe()
+    assert breaker.allow_request() is True
+
+    # A probe that never reports back is given up after probe_timeout.
+    assert breaker.allow_request() is False
+    time.sleep(0.06)
+    assert breaker.allow_request() is True
+    assert breaker.state == "half_open"
+
+
+@pytest.mark.anyio("asyncio")
+async def test_cancelled_probe_does_not_wedge_the_breaker():
+    started = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        started.set()
+        await asyncio.sleep(10)
+        raise AssertionError("unreachable")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    config = BreakerConfig(failure_threshold=1, reset_timeout=0.0)
+    breaker = get_circuit_breaker("qwen-breaker-cancel", config)
+    breaker.record_failure()
+    qwen = QwenClient(
+        api_key="test", model="qwen-breaker-cancel", http_client=client, max_retries=1, breaker=config
+    )
+    probe = asyncio.create_task(qwen.generate_hr_extract(_report(), "OKR"))
+    await started.wait()
+    assert breaker.allow_request() is False
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+    assert breaker.state == "half_open"
+    assert breaker.allow_request() is True
+    await client.aclose()
+
+
+@pytest.mark.anyio("asyncio")
+async def test_open_breaker_serves_fallback_without_network(tmp_path):
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        raise httpx.ConnectError("down")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    config = BreakerConfig(failure_threshold=1, reset_timeout=60)
+    qwen = QwenClient(
+        api_key="test", model="qwen-breaker", http_client=client, max_retries=1, breaker=config
+    )
+    first = await qwen.generate_hr_extract(_report(), "OKR")
+    second = await qwen.generate_hr_extract(_report(), "OKR")
+    assert calls == 1
+    assert first.needs_retranslation and second.needs_retranslation
+    assert get_circuit_breaker("qwen-breaker", config).metrics()["short_circuited"] == 1
+
+    backlog = RetranslationBacklog(str(tmp_path / "backlog.jsonl"))
+    await backlog.add(_report(), "OKR")
+    [(report, okr_brief)] = backlog.load()
+    assert report.user_id == "u_1" and okr_brief == "OKR"
+    await client.aclose()
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import time
+from datetime import datetime
+
+import httpx
+import pytest
+
+from src.ai.chunking import ChunkConfig, merge_extracts, split_sections
+from src.ai.qwen import QwenClient
+from src.ai.tokens import estimate_tokens
+from src.schemas import HRExtract, NeedItem, OKRAlignment, ReportIn, RiskItem
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def _monthly_text(sections: int = 4, lines: int = 25) -> str:
+    parts = []
+    for section in range(sections):
+        parts.append(f"【第{section + 1}部分 模块{section}】")
+        parts.extend(f"模块{section}事项{line}：推进开发与联调，同步进展" for line in range(lines))
+    return "\n".join(parts)
+
+
+def _extract(summary, risks=(), krs=(), level="low", needs=()) -> HRExtract:
+    return HRExtract(
+        hr_summary=summary,
+        risks=[RiskItem(item=item, likelihood=likelihood, mitigation=m) for item, likelihood, m in risks],
+        needs=[NeedItem(topic=topic, owner=owner) for topic, owner in needs],
+        okr_alignment=OKRAlignment(
+            hit_objectives=["O1"], hit_krs=list(krs), gaps=[], confidence=0.5
+        ),
+        next_actions=["继续推进"],
+        risk_level=level,
+    )
+
+
+def test_split_sections_respects_headings_and_size():
+    text = _monthly_text()
+    chunks = split_sections(text, 700)
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 700 for chunk in chunks)
+    assert all(chunk.startswith("【第") for chunk in chunks)
+    assert "\n".join(chunks) == text
+    assert len(split_sections(text, 100, max_chunks=3)) <= 3
+    assert split_sections("单行" * 500, 300) and all(
+        estimate_tokens(chunk) <= 300 for chunk in split_sections("单行" * 500, 300)
+    )
+
+
+def test_merge_extracts_is_deterministic():
+    merged = merge_extracts(
+        [
+            _extract("第一部分", [("第三方依赖延期", "medium", "")], ["KR1"], needs=[("测试资源", None)]),
+            _extract(
+                "第二部分",
+                [("第三方依赖延期！", "high", "增加备用方案"), ("人手不足", "low", "")],
+                ["KR2", "KR1"],
+                level="high",
+                needs=[("测试资源", "HR")],
+            ),
+        ]
+    )
+    assert merged.hr_summary == "第一部分；第二部分"
+    assert [(risk.item, risk.likelihood) for risk in merged.risks] == [
+        ("第三方依赖延期！", "high"),
+        ("人手不足", "low"),
+    ]
+    assert merged.needs[0].owner == "HR" and len(merged.needs) == 1
+    assert merged.okr_alignment.hit_krs == ["KR1", "KR2"]
+    assert merged.risk_level == "high" and merged.next_actions == ["继续推进"]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_chunked_extract_runs_chunks_concurrently_and_reduces_summary():
+    in_flight = 0
+    peak = 0
+    prompts = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        prompt = json.loads(request.content)["input"]["messages"][-1]["content"]
+        prompts.append(prompt)
+        if "hr_summary\": \"\"}" in prompt:
+            text = json.dumps({"hr_summary": "合并总结"}, ensure_ascii=False)
+            return httpx.Response(200, json={"output": {"text": text}})
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.1)
+        in_flight -= 1
+        part = prompt.split("【第", 1)[1][:3]
+        payload = _extract(f"部分{part}", [("联调延期", "medium", "")], ["KR1"]).model_dump()
+        return httpx.Response(200, json={"output": {"text": json.dumps(payload, ensure_ascii=False)}})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    qwen = QwenClient(
+        api_key="test",
+        model="qwen-max",
+        http_client=client,
+        chunking=ChunkConfig(chunk_tokens=700, threshold_tokens=1000),
+    )
+    now = datetime.utcnow()
+    report = ReportIn(
+        user_id="u_1",
+        user_name="测试",
+        period_type="monthly",
+        period_start=now.date(),
+        period_end=now.date(),
+        raw_text=_monthly_text(),
+        message_ts=now,
+    )
+    started = time.monotonic()
+    result = await qwen.generate_hr_extract(report, "O1 目标")
+    elapsed = time.monotonic() - started
+
+    chunk_calls = len(prompts) - 1
+    assert chunk_calls > 2 and peak == chunk_calls
+    assert elapsed < 0.1 * chunk_calls
+    assert result.hr_summary == "合并总结" and not result.needs_retranslation
+    assert len(result.risks) == 1 and result.okr_alignment.hit_krs == ["KR1"]
+    await client.aclose()
@@ -0,0 +1,71 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.feishu.coalesce import ReportCoalescer, merge_reports
+from src.schemas import ReportIn
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def _report(user_id: str, text: str, offset: int = 0) -> ReportIn:
+    ts = datetime(2024, 5, 8, 9, 0) + timedelta(seconds=offset)
+    return ReportIn(
+        user_id=user_id,
+        user_name=user_id,
+        period_type="daily",
+        period_start=ts.date(),
+        period_end=ts.date(),
+        raw_text=text,
+        message_ts=ts,
+    )
+
+
+def test_merge_reports_orders_and_redetects_period():
+    merged = merge_reports(
+        [_report("u1", "本周周报第二部分", 30), _report("u1", "第一部分：完成灰度", 0)]
+    )
+    assert merged.raw_text == "第一部分：完成灰度\n本周周报第二部分"
+    assert merged.period_type == "weekly"
+    assert merged.message_ts == datetime(2024, 5, 8, 9, 0)
+
+
+@pytest.mark.anyio("asyncio")
+async def test_coalescer_debounces_per_user():
+    flushed = []
+
+    async def sink(report):
+        flushed.append(report)
+
+    coalescer = ReportCoalescer(0.05, sink)
+    await coalescer.add(_report("u1", "a", 0))
+    await coalescer.add(_report("u2", "x", 1))
+    await coalescer.add(_report("u1", "b", 2))
+    await asyncio.sleep(0.15)
+
+    by_user = {report.user_id: report.raw_text for report in flushed}
+    assert by_user == {"u1": "a\nb", "u2": "x"}
+    assert coalescer.metrics()["messages_in"] == 3
+    assert coalescer.metrics()["reports_out"] == 2
+
+
+@pytest.mark.anyio("asyncio")
+async def test_coalescer_flush_all_and_max_messages():
+    flushed = []
+
+    async def sink(report):
+        flushed.append(report.raw_text)
+
+    coalescer = ReportCoalescer(60, sink, max_messages=2)
+    await coalescer.add(_report("u1", "a", 0))
+    await coalescer.add(_report("u1", "b", 1))
+    await asyncio.sleep(0.01)
+    assert flushed == ["a\nb"]
+
+    await coalescer.add(_report("u2", "c", 2))
+    await coalescer.flush_all()
+    assert flushed == ["a\nb", "c"]
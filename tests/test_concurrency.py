@@ -0,0 +1,101 @@
+import asyncio
+import json
+from datetime import datetime
+
+import httpx
+import pytest
+
+from src.ai.concurrency import AdaptiveConcurrencyLimiter, AIMDConfig, get_concurrency_limiter
+from src.ai.qwen import QwenClient
+from src.schemas import ReportIn
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def _report(index: int) -> ReportIn:
+    now = datetime.utcnow()
+    return ReportIn(
+        user_id=f"u_{index}",
+        user_name="测试",
+        period_type="daily",
+        period_start=now.date(),
+        period_end=now.date(),
+        raw_text="日报内容",
+        message_ts=now,
+    )
+
+
+def _payload() -> str:
+    return json.dumps(
+        {
+            "hr_summary": "进展正常",
+            "risks": [],
+            "needs": [],
+            "okr_alignment": {"hit_objectives": [], "hit_krs": [], "gaps": [], "confidence": 0.5},
+            "next_actions": [],
+            "risk_level": "low",
+        },
+        ensure_ascii=False,
+    )
+
+
+def test_aimd_grows_additively_and_shrinks_multiplicatively():
+    limiter = AdaptiveConcurrencyLimiter(
+        AIMDConfig(initial=2, min_limit=1, max_limit=4, latency_target=1.0, cooldown=0.0)
+    )
+    for _ in range(3):  # 2 -> 2.5 -> 2.9 -> 3.24
+        limiter.record_success(0.1)
+    assert limiter.limit == 3
+    for _ in range(20):
+        limiter.record_success(0.1)
+    assert limiter.limit == 4
+    limiter.record_overload("throttled")
+    assert limiter.limit == 2
+    limiter.record_success(5.0)  # latency spike
+    assert limiter.limit == 1
+    limiter.record_overload("timeout")
+    assert limiter.limit == 1
+    metrics = limiter.metrics()
+    assert metrics["decreases"] == {"throttled": 1, "latency": 1, "timeout": 1}
+    assert [entry["limit"] for entry in metrics["history"]][:3] == [3, 4, 2]
+
+
+def test_cooldown_absorbs_a_burst_of_failures():
+    limiter = AdaptiveConcurrencyLimiter(AIMDConfig(initial=8, cooldown=60.0))
+    for _ in range(5):
+        limiter.record_overload("throttled")
+    assert limiter.limit == 4
+
+
+@pytest.mark.anyio("asyncio")
+async def test_qwen_batch_runs_concurrently_and_backs_off_on_429():
+    in_flight = 0
+    peak = 0
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak, calls
+        calls += 1
+        if calls == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.02)
+        in_flight -= 1
+        return httpx.Response(200, json={"output": {"text": _payload()}})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    config = AIMDConfig(initial=4, min_limit=1, max_limit=8, cooldown=60.0)
+    qwen = QwenClient(api_key="test", model="qwen-max", http_client=client, concurrency=config)
+    results = await qwen.generate_hr_extracts([(_report(index), "OKR") for index in range(12)])
+
+    assert all(result.hr_summary == "进展正常" for result in results)
+    controller = get_concurrency_limiter(config)
+    metrics = controller.metrics()
+    assert metrics["decreases"] == {"throttled": 1}
+    assert 1 < peak <= 4
+    assert metrics["in_flight"] == 0 and metrics["limit"] >= 2
+    await client.aclose()
@@ -0,0 +1,67 @@
+import csv
+import json
+from datetime import date, timedelta
+from itertools import islice
+
+import pytest
+
+from src.devtools.dataset import (
+    DatasetConfig,
+    generate_reports,
+    okr_months,
+    user_id,
+    write_okr_cache,
+    write_reports_csv,
+)
+from src.okr.source import CacheOKRSource
+from src.schemas import StoredReport
+from src.storage.csv_store import CSVStorage
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def test_reports_are_seeded_and_generated_lazily():
+    config = DatasetConfig(reports=10**9, users=50, days=3 * 365, end=date(2024, 12, 31), seed=3)
+    first = [record.model_dump() for record in islice(generate_reports(config), 200)]
+    again = [record.model_dump() for record in islice(generate_reports(config), 200)]
+    other = [record.model_dump() for record in islice(generate_reports(DatasetConfig(seed=4)), 200)]
+    assert first == again and first != other
+    levels = {row["hr_extract"]["risk_level"] for row in first}
+    assert levels == {"low", "medium", "high"}
+
+
+def test_csv_matches_storage_and_spans_the_window(tmp_path):
+    config = DatasetConfig(reports=400, users=30, days=2 * 365, end=date(2024, 6, 30))
+    path = tmp_path / "reports_slim.csv"
+    assert write_reports_csv(path, config) == 400
+    storage = CSVStorage(str(path))
+    with path.open(encoding="utf-8") as fp:
+        assert fp.readline().strip() == ",".join(storage.headers)
+    with path.open(newline="", encoding="utf-8") as fp:
+        rows = list(csv.DictReader(fp))
+    records = [StoredReport.from_csv_row(row) for row in rows]
+    stamps = sorted(record.report.message_ts for record in records)
+    assert stamps[0].date() < config.start + timedelta(days=30)
+    assert stamps[-1].date() > config.end - timedelta(days=30)
+    assert all(stamp.weekday() < 5 for stamp in stamps)
+    assert {record.report.period_type for record in records} == {"daily", "weekly", "monthly"}
+    assert storage._latest_for_user(records[0].report.user_id) is not None
+
+
+@pytest.mark.anyio("asyncio")
+async def test_okr_cache_matches_the_stored_briefs(tmp_path):
+    config = DatasetConfig(reports=50, users=5, objectives=2, days=62, end=date(2024, 5, 31))
+    path = tmp_path / "okr_cache.json"
+    write_okr_cache(path, config)
+    cache = json.loads(path.read_text(encoding="utf-8"))
+    assert [user["user_id"] for user in cache["users"]] == [user_id(index) for index in range(5)]
+    assert len(cache["users"][0]["objectives"]) == 2 * len(okr_months(config)) == 6
+
+    source = CacheOKRSource(str(path))
+    for record in islice(generate_reports(config), 20):
+        month = record.report.message_ts.date().replace(day=1)
+        brief = await source.get_okr_brief(record.report.user_id, month, month)
+        assert brief == record.okr_brief
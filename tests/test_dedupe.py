@@ -0,0 +1,46 @@
+import pytest
+
+from src.feishu.dedupe import EventDeduplicator
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio("asyncio")
+async def test_duplicate_detected_by_any_key(tmp_path):
+    dedupe = EventDeduplicator(str(tmp_path / "d.db"))
+    assert await dedupe.check_and_mark(["event:e1", "message:m1"]) is False
+    assert await dedupe.check_and_mark(["event:e2", "message:m1"]) is True
+    assert await dedupe.check_and_mark(["event:e1"]) is True
+    assert dedupe.metrics()["duplicates"] == 2
+    dedupe.close()
+
+
+@pytest.mark.anyio("asyncio")
+async def test_index_survives_restart_and_expires(tmp_path):
+    path = str(tmp_path / "d.db")
+    dedupe = EventDeduplicator(path, max_entries=1)
+    await dedupe.check_and_mark(["event:e1"])
+    await dedupe.check_and_mark(["event:e2"])  # evicts e1 from memory only
+    assert await dedupe.check_and_mark(["event:e1"]) is True
+    dedupe.close()
+
+    reopened = EventDeduplicator(path)
+    assert await reopened.check_and_mark(["event:e2"]) is True
+    reopened.close()
+
+    expired = EventDeduplicator(str(tmp_path / "e.db"), ttl_seconds=-1)
+    await expired.check_and_mark(["event:e1"])
+    assert await expired.check_and_mark(["event:e1"]) is False
+    expired.close()
+
+
+@pytest.mark.anyio("asyncio")
+async def test_forget_allows_redelivery(tmp_path):
+    dedupe = EventDeduplicator(str(tmp_path / "d.db"))
+    await dedupe.check_and_mark(["event:e1"])
+    await dedupe.forget(["event:e1"])
+    assert await dedupe.check_and_mark(["event:e1"]) is False
+    dedupe.close()
@@ -1,4 +1,5 @@
 import json
+import time
 from datetime import datetime
 
 from fastapi.testclient import TestClient
@@ -20,6 +21,15 @@ class MemoryStorage(StorageDriver):
         self.records.append(record)
 
 
+def _wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
 def _build_extract() -> HRExtract:
     return HRExtract(
         hr_summary="完成支付接口灰度，风险可控。",
@@ -76,6 +86,8 @@ def test_end_to_end_webhook(tmp_path, monkeypatch):
         csv_path=str(csv_path),
         okr_source="cache",
         okr_cache_path=str(okr_cache_path),
+        ingest_queue_path=str(tmp_path / "ingest.db"),
+        dedupe_index_path=str(tmp_path / "dedupe.db"),
     )
     storage = CSVStorage(str(csv_path))
     okr_source = build_okr_source(settings)
@@ -87,8 +99,6 @@ def test_end_to_end_webhook(tmp_path, monkeypatch):
         qwen_client=qwen,
         okr_source=okr_source,
     )
-    client = TestClient(app)
-
     payload = {
         "schema": "2.0",
         "header": {"event_id": "abc", "token": "secret"},
@@ -103,13 +113,26 @@ def test_end_to_end_webhook(tmp_path, monkeypatch):
         },
     }
 
-    response = client.post("/webhook/feishu", json=payload)
-    assert response.status_code == 200
-    assert response.json()["ok"] is True
+    with TestClient(app) as client:
+        response = client.post("/webhook/feishu", json=payload)
+        assert response.status_code == 200
+        assert response.json()["ok"] is True
+        redelivery = client.post("/webhook/feishu", json=payload)
+        assert redelivery.status_code == 200
+
+        def _rows():
+            return csv_path.read_text(encoding="utf-8").strip().splitlines()
+
+        assert _wait_for(lambda: len(_rows()) == 2)
+        assert "张三" in _rows()[1]
+
+        def _ingest_metrics():
+            return client.get("/metrics").json()["ingest"]
 
-    rows = csv_path.read_text(encoding="utf-8").strip().splitlines()
-    assert len(rows) == 2
-    assert "张三" in rows[1]
+        assert _wait_for(lambda: _ingest_metrics()["processed"] == 1)
+        assert _ingest_metrics()["depth"] == 0
+        assert len(_rows()) == 2
+        assert client.get("/metrics").json()["dedupe"]["duplicates"] == 1
 
 
 def test_simple_payload_normalization(tmp_path, monkeypatch):
@@ -128,6 +151,8 @@ def test_simple_payload_normalization(tmp_path, monkeypatch):
         csv_path=str(csv_path),
         okr_source="cache",
         okr_cache_path=str(okr_cache_path),
+        ingest_queue_path=str(tmp_path / "ingest.db"),
+        dedupe_index_path=str(tmp_path / "dedupe.db"),
         dashscope_api_key="fake",
     )
     storage = CSVStorage(str(csv_path))
@@ -150,3 +175,36 @@ def test_simple_payload_normalization(tmp_path, monkeypatch):
     response = client.post("/webhook/feishu", json=payload)
     assert response.status_code == 200
     assert response.json()["ok"] is True
+
+
+def test_webhook_fast_path_rejections(tmp_path):
+    settings = Settings(
+        feishu_bot_verification_token="secret",
+        csv_path=str(tmp_path / "reports.csv"),
+        okr_cache_path=str(tmp_path / "okr.json"),
+        ingest_queue_path=str(tmp_path / "ingest.db"),
+        dedupe_index_path=str(tmp_path / "dedupe.db"),
+        webhook_max_body_bytes=2048,
+    )
+    app = create_app(settings=settings, qwen_client=DummyQwenClient(_build_extract()))
+    client = TestClient(app)
+
+    challenge = {"type": "url_verification", "challenge": "c1", "token": "secret"}
+    assert client.post("/webhook/feishu", json=challenge).json() == {"challenge": "c1"}
+
+    # Token is rejected before the (malformed) envelope is validated.
+    forged = {"header": {"token": "wrong"}, "event": {"message": {}}}
+    assert client.post("/webhook/feishu", json=forged).status_code == 401
+
+    image = {
+        "header": {"event_id": "e-img", "token": "secret"},
+        "event": {"message": {"message_type": "image"}},
+    }
+    assert client.post("/webhook/feishu", json=image).json() == {"ok": True}
+    assert app.state.ingest_queue.stats_sync()["depth"] == 0
+
+    oversized = {"user_id": "u", "user_name": "n", "text": "x" * 4096}
+    assert client.post("/webhook/feishu", json=oversized).status_code == 413
+    assert client.post("/webhook/feishu", content=b"[1, 2]").status_code == 400
+    malformed = client.post("/webhook/feishu", content=b'{"user_id": "u",')
+    assert malformed.status_code == 400 and "Invalid JSON payload" in malformed.json()["detail"]
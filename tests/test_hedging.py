@@ -0,0 +1,137 @@
+import asyncio
+import json
+from datetime import datetime
+
+import httpx
+import pytest
+
+from src.ai.hedging import HedgeConfig, HedgeTracker, get_hedge_tracker, run_hedged
+from src.ai.qwen import QwenClient
+from src.ai.ratelimit import RateLimitConfig, get_rate_limiter
+from src.schemas import ReportIn
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def _warm_tracker(**overrides) -> HedgeTracker:
+    options = {"min_samples": 5, "min_delay": 0.0, "budget_ratio": 0.5, **overrides}
+    config = HedgeConfig(**options)
+    tracker = HedgeTracker(config)
+    for _ in range(5):
+        tracker.record_latency(0.02)
+    tracker.requests = 10
+    return tracker
+
+
+@pytest.mark.anyio("asyncio")
+async def test_hedge_wins_when_primary_stalls():
+    tracker = _warm_tracker()
+    calls = []
+    cancelled = asyncio.Event()
+
+    async def call():
+        index = len(calls)
+        calls.append(index)
+        if index == 0:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        return f"result-{index}"
+
+    assert await run_hedged(tracker, call) == "result-1"
+    assert cancelled.is_set()
+    metrics = tracker.metrics()
+    assert metrics["hedges"] == 1 and metrics["win_rate"] == 1.0
+
+
+@pytest.mark.anyio("asyncio")
+async def test_hedge_budget_and_cold_start():
+    cold = HedgeTracker(HedgeConfig(min_samples=5))
+    calls = 0
+
+    async def slow():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    assert await run_hedged(cold, slow) == "ok"
+    assert calls == 1 and cold.hedges == 0
+
+    exhausted = _warm_tracker(budget_ratio=0.0)
+    calls = 0
+    assert await run_hedged(exhausted, slow) == "ok"
+    assert calls == 1
+
+
+@pytest.mark.anyio("asyncio")
+async def test_failed_primary_falls_back_to_hedge():
+    tracker = _warm_tracker()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        if len(calls) == 1:
+            await asyncio.sleep(0.05)
+            raise ValueError("bad json")
+        await asyncio.sleep(0.1)
+        return "late-but-valid"
+
+    assert await run_hedged(tracker, call) == "late-but-valid"
+
+
+@pytest.mark.anyio("asyncio")
+async def test_client_hedge_takes_own_slot_and_must_parse():
+    payload = {
+        "hr_summary": "总结",
+        "risks": [],
+        "needs": [],
+        "okr_alignment": {"hit_objectives": [], "hit_krs": [], "gaps": [], "confidence": 0.5},
+        "next_actions": [],
+        "risk_level": "low",
+    }
+    config = HedgeConfig(min_samples=1, min_delay=0.0, budget_ratio=1.0)
+    tracker = get_hedge_tracker("qwen-hedge-parse", config)
+    tracker.record_latency(0.02)
+    limits = RateLimitConfig(max_in_flight=2)
+    calls = []
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal peak
+        calls.append(1)
+        first = len(calls) == 1
+        peak = max(peak, get_rate_limiter("qwen-hedge-parse", limits).metrics()["in_flight"])
+        # The primary answers first, but with output that does not parse.
+        await asyncio.sleep(0.05 if first else 0.1)
+        text = "not a report" if first else json.dumps(payload, ensure_ascii=False)
+        return httpx.Response(200, json={"output": {"text": text}})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    qwen = QwenClient(
+        api_key="test",
+        model="qwen-hedge-parse",
+        http_client=client,
+        hedge=config,
+        rate_limits=limits,
+    )
+    now = datetime.utcnow()
+    report = ReportIn(
+        user_id="u_1",
+        user_name="测试",
+        period_type="daily",
+        period_start=now.date(),
+        period_end=now.date(),
+        raw_text="日报内容",
+        message_ts=now,
+    )
+    result = await qwen.generate_hr_extract(report, "OKR")
+    assert result.hr_summary == "总结" and not result.needs_retranslation
+    assert len(calls) == 2 and peak == 2
+    assert tracker.hedge_wins == 1
+    await client.aclose()
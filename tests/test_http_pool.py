@@ -0,0 +1,47 @@
+import pytest
+
+from src.ai.qwen import QwenClient
+from src.config import Settings
+from src.utils.http import (
+    ConnectionStats,
+    get_shared_client,
+    http_pool_stats,
+    shared_http_client,
+)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio("asyncio")
+async def test_shared_pool_lifecycle_and_reuse_by_qwen():
+    settings = Settings(http_max_connections=5, http_max_keepalive_connections=2)
+    qwen = QwenClient(api_key="k", model="qwen-max")
+    assert get_shared_client() is None
+
+    async with shared_http_client(settings) as client:
+        assert qwen._http_client() is client
+        async with shared_http_client(settings) as nested:
+            assert nested is client
+        assert not client.is_closed
+        assert http_pool_stats()["open"] is True
+
+    assert client.is_closed
+    assert get_shared_client() is None
+    own = qwen._http_client()
+    assert own is qwen._http_client()
+    await qwen.aclose()
+
+
+@pytest.mark.anyio("asyncio")
+async def test_connection_stats_counts_reuse():
+    stats = ConnectionStats()
+    for _ in range(3):
+        await stats.on_request(type("Req", (), {"extensions": {}})())
+    await stats._trace("connection.connect_tcp.complete", {})
+    snapshot = stats.snapshot()
+    assert snapshot["requests"] == 3
+    assert snapshot["reused_connections"] == 2
+    assert snapshot["reuse_ratio"] == pytest.approx(0.667)
@@ -0,0 +1,170 @@
+import json
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from src.ai.incremental import IncrementalConfig, diff_report, incremental_metrics
+from src.ai.qwen import QwenClient
+from src.ai.triage import TriageResult, light_extract
+from src.feishu.report_fetch import _chain_by_user
+from src.schemas import HRExtract, NeedItem, OKRAlignment, ReportIn, RiskItem, StoredReport
+from src.storage.csv_store import CSVStorage
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+BASE_TEXT = "\n".join(
+    [
+        "【规则】研发日报",
+        "完成支付接口联调，覆盖主要场景",
+        "整理周会纪要并同步给团队",
+        "推进 KR2 自动化测试覆盖率到 65%",
+        "跟进第三方通道的稳定性问题",
+    ]
+)
+
+
+def _report(raw_text: str, ts: datetime, user_id: str = "u_1") -> ReportIn:
+    return ReportIn(
+        user_id=user_id,
+        user_name="测试",
+        period_type="daily",
+        period_start=ts.date(),
+        period_end=ts.date(),
+        raw_text=raw_text,
+        message_ts=ts,
+    )
+
+
+def _stored(report: ReportIn, summary: str = "上次解读") -> StoredReport:
+    extract = HRExtract(
+        hr_summary=summary,
+        risks=[RiskItem(item="第三方通道不稳定", likelihood="medium", mitigation="")],
+        needs=[NeedItem(topic="协调测试资源", owner="HR")],
+        okr_alignment=OKRAlignment(
+            hit_objectives=["O1"], hit_krs=["KR2"], gaps=[], confidence=0.6
+        ),
+        next_actions=["继续联调"],
+        risk_level="medium",
+    )
+    return StoredReport(report=report, hr_extract=extract, okr_brief="O1 提升质量")
+
+
+def test_diff_keeps_only_changed_lines_and_config_rejects_bad_baselines():
+    current = BASE_TEXT.replace("65%", "70%") + "\n新增：申请压测环境"
+    delta = diff_report(BASE_TEXT, current)
+    assert delta.changed_lines == ["推进 KR2 自动化测试覆盖率到 70%", "新增：申请压测环境"]
+    assert 0 < delta.ratio < 0.6
+
+    config = IncrementalConfig()
+    now = datetime(2024, 5, 2, 18)
+    previous = _stored(_report(BASE_TEXT, now - timedelta(days=1)))
+    assert config.delta_for(_report(current, now), previous) is not None
+    assert config.delta_for(_report(current, now), None) is None
+    stale = _stored(_report(BASE_TEXT, now - timedelta(days=10)))
+    assert config.delta_for(_report(current, now), stale) is None
+    assert config.delta_for(_report("全部改写的新内容", now), previous) is None
+    offline = previous.model_copy(
+        update={"hr_extract": previous.hr_extract.model_copy(update={"needs_retranslation": True})}
+    )
+    assert config.delta_for(_report(current, now), offline) is None
+    light = previous.model_copy(
+        update={
+            "hr_extract": light_extract(
+                TriageResult("low", False, 0.9, "例行日报"), previous.report
+            )
+        }
+    )
+    assert config.delta_for(_report(current, now), light) is None
+    round_tripped = StoredReport.from_csv_row(
+        {key: str(value) for key, value in light.to_csv_row().items()}
+    )
+    assert config.delta_for(_report(current, now), round_tripped) is None
+    # A model extract that happens to suggest the same next step is still a baseline.
+    same_actions = previous.model_copy(
+        update={
+            "hr_extract": previous.hr_extract.model_copy(
+                update={"next_actions": light.hr_extract.next_actions}
+            )
+        }
+    )
+    assert config.delta_for(_report(current, now), same_actions) is not None
+
+
+def test_fetched_reports_chain_oldest_first_per_user():
+    day = datetime(2024, 5, 1, 18)
+    pending = [
+        (None, _report("三", day + timedelta(days=2)), ""),
+        (None, _report("甲", day + timedelta(hours=1), user_id="u_2"), ""),
+        (None, _report("一", day), ""),
+        (None, _report("二", day + timedelta(days=1)), ""),
+    ]
+    rounds = _chain_by_user(pending)
+    assert [[report.raw_text for _, report, _ in batch] for batch in rounds] == [
+        ["一", "甲"],
+        ["二"],
+        ["三"],
+    ]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_csv_latest_for_user_round_trips_and_tracks_saves(tmp_path):
+    storage = CSVStorage(str(tmp_path / "reports.csv"))
+    day = datetime(2024, 5, 1, 18)
+    await storage.save(_stored(_report(BASE_TEXT, day + timedelta(days=1)), "第二天"))
+    await storage.save(_stored(_report(BASE_TEXT, day), "第一天"))
+    await storage.save(_stored(_report("其他人", day, user_id="u_2")))
+
+    latest = await CSVStorage(str(tmp_path / "reports.csv")).latest_for_user("u_1")
+    assert latest is not None and latest.hr_extract.hr_summary == "第二天"
+    assert latest.report.raw_text == BASE_TEXT
+    assert latest.hr_extract.risks[0].item == "第三方通道不稳定"
+    assert latest.hr_extract.needs[0].owner == "HR"
+    assert latest.hr_extract.okr_alignment.hit_krs == ["KR2"]
+    assert await storage.latest_for_user("missing") is None
+
+    assert (await storage.latest_for_user("u_1")).hr_extract.hr_summary == "第二天"
+    await storage.save(_stored(_report(BASE_TEXT, day + timedelta(days=2)), "第三天"))
+    assert (await storage.latest_for_user("u_1")).hr_extract.hr_summary == "第三天"
+
+
+@pytest.mark.anyio("asyncio")
+async def test_incremental_prompt_sends_diff_and_previous_summary():
+    prompts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        prompts.append(json.loads(request.content)["input"]["messages"][-1]["content"])
+        payload = {
+            "hr_summary": "本次解读",
+            "risks": [],
+            "needs": [],
+            "okr_alignment": {"hit_objectives": [], "hit_krs": [], "gaps": [], "confidence": 0.5},
+            "next_actions": [],
+            "risk_level": "low",
+        }
+        return httpx.Response(200, json={"output": {"text": json.dumps(payload, ensure_ascii=False)}})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    qwen = QwenClient(
+        api_key="test", model="qwen-max", http_client=client, incremental=IncrementalConfig()
+    )
+    now = datetime(2024, 5, 2, 18)
+    previous = _stored(_report(BASE_TEXT, now - timedelta(days=1)))
+    current = BASE_TEXT + "\n新增：申请压测环境"
+    before = incremental_metrics()
+
+    result = await qwen.generate_hr_extract(_report(current, now), "O1 提升质量", previous)
+    assert result.hr_summary == "本次解读"
+    assert "上次解读" in prompts[0] and "新增：申请压测环境" in prompts[0]
+    assert "整理周会纪要" not in prompts[0]
+
+    await qwen.generate_hr_extract(_report(current, now), "O1 提升质量")
+    assert "整理周会纪要" in prompts[1]
+    after = incremental_metrics()
+    assert after["used"] - before["used"] == 1
+    assert after["estimated_input_tokens_saved"] > before["estimated_input_tokens_saved"]
+    await client.aclose()
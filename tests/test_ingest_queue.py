@@ -0,0 +1,150 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from src.feishu.coalesce import ReportCoalescer
+from src.feishu.ingest_queue import IngestQueueFull, IngestWorkerPool, SQLiteIngestQueue
+from src.schemas import ReportIn
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio("asyncio")
+async def test_queue_is_bounded_and_fifo(tmp_path):
+    queue = SQLiteIngestQueue(str(tmp_path / "q.db"), max_depth=2)
+    await queue.enqueue({"n": 1})
+    await queue.enqueue({"n": 2})
+    with pytest.raises(IngestQueueFull):
+        await queue.enqueue({"n": 3})
+
+    job = await queue.claim()
+    assert job.payload == {"n": 1}
+    await queue.ack(job.job_id)
+    stats = await queue.stats()
+    assert stats["depth"] == 1
+    assert stats["oldest_age_seconds"] >= 0
+    queue.close()
+
+
+@pytest.mark.anyio("asyncio")
+async def test_claimed_jobs_are_recovered_after_restart(tmp_path):
+    path = str(tmp_path / "q.db")
+    queue = SQLiteIngestQueue(path)
+    await queue.enqueue({"n": 1})
+    assert await queue.claim() is not None
+    queue.close()
+
+    reopened = SQLiteIngestQueue(path)
+    job = await reopened.claim()
+    assert job is not None and job.payload == {"n": 1}
+    reopened.close()
+
+
+@pytest.mark.anyio("asyncio")
+async def test_worker_pool_drains_and_retries(tmp_path):
+    queue = SQLiteIngestQueue(str(tmp_path / "q.db"), max_attempts=2)
+    seen = []
+
+    async def processor(payload):
+        seen.append(payload["n"])
+        if payload["n"] == 2:
+            raise RuntimeError("boom")
+
+    pool = IngestWorkerPool(queue, processor, workers=2, poll_interval=0.05)
+    await pool.start()
+    for n in (1, 2, 3):
+        await queue.enqueue({"n": n})
+    pool.notify()
+    for _ in range(100):
+        if pool.metrics()["failed"] == 2 and pool.metrics()["processed"] == 2:
+            break
+        await asyncio.sleep(0.02)
+    stats = await queue.stats()
+    await pool.stop()
+
+    assert sorted(seen) == [1, 2, 2, 3]
+    assert stats["depth"] == 0
+    assert stats["dead"] == 1
+
+
+@pytest.mark.anyio("asyncio")
+async def test_coalesced_jobs_stay_claimed_until_flushed(tmp_path):
+    queue = SQLiteIngestQueue(str(tmp_path / "q.db"), max_attempts=3)
+    flushed = []
+
+    async def sink(report):
+        flushed.append(report.raw_text)
+        if len(flushed) == 1:
+            raise RuntimeError("storage down")
+
+    pool = IngestWorkerPool(queue, None, workers=1, poll_interval=0.05)
+    coalescer = ReportCoalescer(0.1, sink, limiter=pool.slots)
+
+    async def processor(payload):
+        ts = datetime(2024, 5, 8, 9, payload["n"])
+        return await coalescer.add(
+            ReportIn(
+                user_id="u1",
+                user_name="u1",
+                period_type="daily",
+                period_start=ts.date(),
+                period_end=ts.date(),
+                raw_text=str(payload["n"]),
+                message_ts=ts,
+            )
+        )
+
+    pool.processor = processor
+    await pool.start()
+    for n in (1, 2):
+        await queue.enqueue({"n": n})
+    pool.notify()
+    await asyncio.sleep(0.05)
+    # Both messages are buffered and neither has been acked.
+    assert (await queue.stats())["in_flight"] == 2 and not flushed
+
+    for _ in range(100):
+        if pool.metrics()["processed"] == 2:
+            break
+        await asyncio.sleep(0.02)
+    stats = await queue.stats()
+    await pool.stop(drain=coalescer.flush_all)
+
+    # The failed flush sent both jobs back through the retry path.
+    assert flushed == ["1\n2", "1\n2"]
+    assert pool.metrics()["failed"] == 2
+    assert stats["depth"] == 0 and stats["dead"] == 0
+
+
+@pytest.mark.anyio("asyncio")
+async def test_stop_drains_deferred_jobs_before_closing(tmp_path):
+    queue = SQLiteIngestQueue(str(tmp_path / "q.db"))
+    held = []
+
+    async def processor(payload):
+        future = asyncio.get_running_loop().create_future()
+        held.append(future)
+        return future
+
+    async def drain():
+        for future in held:
+            future.set_result(None)
+
+    pool = IngestWorkerPool(queue, processor, workers=1, poll_interval=0.05)
+    await pool.start()
+    await queue.enqueue({"n": 1})
+    pool.notify()
+    for _ in range(50):
+        if held:
+            break
+        await asyncio.sleep(0.02)
+    assert pool.metrics()["deferred"] == 1
+    await pool.stop(drain=drain)
+
+    reopened = SQLiteIngestQueue(str(tmp_path / "q.db"))
+    assert (await reopened.stats())["depth"] == 0
+    reopened.close()
@@ -0,0 +1,114 @@
+import json
+
+import pytest
+
+from src.ai.qwen import QwenClient
+from src.config import Settings
+from src.feishu.message_gate import GateResult, MessageGate
+from src.feishu.webhook import FeishuWebhookHandler
+from src.storage.base import StorageDriver
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+class MemoryStorage(StorageDriver):
+    def __init__(self) -> None:
+        self.records = []
+
+    async def save(self, record) -> None:
+        self.records.append(record)
+
+
+class StaticOKR:
+    async def get_okr_brief(self, user_id, start, end) -> str:
+        return "O1 提升质量"
+
+
+class CardSink:
+    def __init__(self) -> None:
+        self.cards = []
+
+    async def send_card(self, card) -> None:
+        self.cards.append(card)
+
+
+class CountingQwen(QwenClient):
+    def __init__(self) -> None:
+        super().__init__(api_key=None, model="dummy")
+        self.calls = 0
+
+    async def generate_hr_extract(self, report, okr_brief, previous=None):
+        self.calls += 1
+        return self._fallback_extract(report)
+
+
+def _envelope(text: str, message_id: str) -> dict:
+    return {
+        "header": {"event_id": message_id, "token": "t"},
+        "event": {
+            "message": {
+                "message_id": message_id,
+                "message_type": "text",
+                "content": json.dumps({"text": text}, ensure_ascii=False),
+                "create_time": "1715158800000",
+                "sender": {"user_id": "u_1", "name": "测试"},
+            }
+        },
+    }
+
+
+def test_gate_is_off_by_default():
+    assert MessageGate.from_settings(Settings()) is None
+
+
+def test_gate_decisions():
+    gate = MessageGate()
+    assert gate.classify("收到！").decision == "drop"
+    assert gate.classify("👍👍").decision == "drop"
+    assert gate.classify("[赞]").decision == "drop"
+    assert gate.classify("  ").decision == "drop"
+    assert gate.classify("今天无进展").decision == "template"
+    for risky in ("线上故障，今天无进展", "阻塞了，求助", "请假，项目延期风险"):
+        assert gate.classify(risky) == GateResult("full", "risk_keyword")
+    for progress in ("KR2 完成", "O1KR3 ok", "推进 O2"):
+        assert gate.classify(progress) == GateResult("full", "okr_id")
+    assert gate.classify("没问题！").decision == "drop"
+    assert gate.classify("在开会").decision == "template"
+    assert gate.classify("日报：修复登录").decision == "full"
+    assert gate.classify("完成支付接口灰度发布并补充了回归测试用例").decision == "full"
+    assert gate.classify("1. 灰度\n2. 压测").decision == "full"
+    long_update = "今天无进展，" + "但排查了支付回调超时的原因并和第三方约好明天联调" * 2
+    assert gate.classify(long_update).decision == "full"
+
+
+@pytest.mark.anyio("asyncio")
+async def test_handler_skips_llm_for_gated_messages(tmp_path):
+    qwen = CountingQwen()
+    storage = MemoryStorage()
+    cards = CardSink()
+    settings = Settings(
+        retranslate_backlog_path=str(tmp_path / "backlog.jsonl"),
+        csv_path=str(tmp_path / "reports.csv"),
+        okr_cache_path=str(tmp_path / "okr.json"),
+        message_gate_enabled=True,
+    )
+    handler = FeishuWebhookHandler(settings, qwen, storage, StaticOKR(), cards)
+    classified = []
+    classify = handler.gate.classify
+    handler.gate.classify = lambda text: classified.append(text) or classify(text)
+
+    assert (await handler.handle(_envelope("好的", "m1"), validate_token=False))["skipped"]
+    await handler.handle(_envelope("今天无进展", "m2"), validate_token=False)
+    await handler.handle(_envelope("本周周报：完成支付接口灰度", "m3"), validate_token=False)
+
+    assert qwen.calls == 1
+    assert classified == ["好的", "今天无进展", "本周周报：完成支付接口灰度"]
+    assert len(storage.records) == len(cards.cards) == 2
+    template = storage.records[0].hr_extract
+    assert template.risk_level == "low" and template.hr_summary == "今天无进展"
+    metrics = handler.gate.metrics()
+    assert metrics["decisions"] == {"drop": 1, "template": 1, "full": 1}
+    assert metrics["llm_skip_rate"] == round(2 / 3, 3)
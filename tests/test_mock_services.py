@@ -0,0 +1,99 @@
+from datetime import datetime
+
+import httpx
+import pytest
+
+from src.ai.qwen import QwenClient
+from src.devtools.mock_services import LatencyModel, MockConfig, build_mock_app
+from src.feishu.api_client import FeishuAPIClient
+from src.feishu.report_fetch import _fetch_reports_for_rule
+from src.schemas import ReportIn
+from src.utils.retry import RetryPolicy
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def _report(text: str) -> ReportIn:
+    now = datetime.utcnow()
+    return ReportIn(
+        user_id="u_1",
+        user_name="测试",
+        period_type="daily",
+        period_start=now.date(),
+        period_end=now.date(),
+        raw_text=text,
+        message_ts=now,
+    )
+
+
+def _client(config: MockConfig) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=build_mock_app(config)))
+
+
+def test_latency_model_parsing():
+    assert LatencyModel.parse("fixed:120").sample(None) == 0.12
+    with pytest.raises(ValueError):
+        LatencyModel.parse("pareto:1")
+    with pytest.raises(ValueError):
+        LatencyModel.parse("uniform:10")
+
+
+@pytest.mark.anyio("asyncio")
+async def test_qwen_against_mock_is_deterministic_across_modes():
+    config = MockConfig(latency=LatencyModel.parse("fixed:0"))
+    text = "完成支付接口联调，推进 KR2，第三方依赖存在延期风险"
+    async with _client(config) as client:
+        results = []
+        for options in ({}, {"compact_output": True}, {"stream": True}, {"api_mode": "compatible"}):
+            qwen = QwenClient(
+                api_key="mock", model="qwen-max", http_client=client, base_url="http://mock", **options
+            )
+            results.append(await qwen.generate_hr_extract(_report(text), "O1 目标"))
+    first = results[0]
+    assert first.risk_level == "medium" and first.okr_alignment.hit_krs == ["KR2"]
+    assert not first.needs_retranslation
+    assert all(result.model_dump() == first.model_dump() for result in results)
+
+
+@pytest.mark.anyio("asyncio")
+async def test_mock_throttles_and_client_retries():
+    config = MockConfig(latency=LatencyModel.parse("fixed:0"), throttle_rate=0.5, retry_after=0)
+    async with _client(config) as client:
+        qwen = QwenClient(
+            api_key="mock",
+            model="qwen-max",
+            http_client=client,
+            base_url="http://mock",
+            retry_policy=RetryPolicy(max_attempts=10, base_delay=0.001, max_delay=0.01),
+        )
+        for _ in range(5):
+            assert not (await qwen.generate_hr_extract(_report("日报：整理文档"), "")).needs_retranslation
+        stats = (await client.get("http://mock/mock/stats")).json()
+    assert stats["faults"]["429"] > 0
+    assert stats["requests"]["text_generation"] == 5 + stats["faults"]["429"]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_feishu_endpoints_paginate_and_dedupe_messages():
+    config = MockConfig(reports_per_rule=45)
+    async with _client(config) as client:
+        tasks = await _fetch_reports_for_rule(
+            client, "t", "rule_1", 1714500000, 1714586400, "daily", base_url="http://mock"
+        )
+        feishu = FeishuAPIClient("app", "secret", "chat", http_client=client, base_url="http://mock")
+        await feishu.send_card({"elements": []})
+        await feishu.send_card({"elements": []})
+        stats = (await client.get("http://mock/mock/stats")).json()
+        okrs = (
+            await client.get(
+                "http://mock/open-apis/okr/v1/okrs/batch_get", params={"okr_ids": ["a", "b"]}
+            )
+        ).json()
+    assert len(tasks) == 45 and len({task.task_id for task in tasks}) == 45
+    assert tasks[0].text.startswith("【规则】研发日报")
+    assert stats["requests"]["report_query"] == 3
+    assert stats["requests"]["tenant_token"] == 1 and stats["messages_sent"] == 2
+    assert [okr["id"] for okr in okrs["data"]["okr_list"]] == ["a", "b"]
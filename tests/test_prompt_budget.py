@@ -0,0 +1,70 @@
+from datetime import datetime
+
+from src.ai.prompt_budget import (
+    PromptBudget,
+    budget_okr_brief,
+    budget_report_text,
+    truncate_to_tokens,
+)
+from src.ai.qwen import QwenClient
+from src.ai.tokens import estimate_tokens
+from src.schemas import ReportIn
+
+
+def _long_report() -> str:
+    filler = [f"例行事项{index}：整理文档并同步周会纪要，内容较为常规" for index in range(60)]
+    return "\n".join(
+        ["【规则】研发周报"]
+        + filler[:30]
+        + ["风险：支付接口依赖第三方，联调可能延期一周"]
+        + filler[30:]
+        + ["下一步：推进 KR2 压测"]
+    )
+
+
+def test_report_truncation_keeps_high_value_lines_in_order():
+    text = _long_report()
+    result = budget_report_text(text, 120)
+    assert result.truncated and result.tokens <= 120
+    lines = result.text.splitlines()
+    assert lines[0] == "【规则】研发周报"
+    risk = lines.index("风险：支付接口依赖第三方，联调可能延期一周")
+    assert lines.index("下一步：推进 KR2 压测") > risk
+    assert "已省略" in result.text and result.dropped_lines > 0
+
+
+def test_okr_brief_keeps_objectives_and_mentioned_krs():
+    brief = "\n".join(
+        ["O1 提升交付质量 (2024-05-01~2024-05-31)"]
+        + [f"- KR{index} 无关指标{index}的长期跟踪与复盘工作 30%" for index in range(3, 30)]
+        + ["- KR2 支付链路压测通过 50%"]
+    )
+    result = budget_okr_brief(brief, "本周推进 KR2 压测", 60)
+    assert result.tokens <= 60
+    assert result.text.startswith("O1 提升交付质量")
+    assert "KR2 支付链路压测通过" in result.text
+
+
+def test_truncate_to_tokens_and_short_input_untouched():
+    assert truncate_to_tokens("短文本", 100) == "短文本"
+    cut = truncate_to_tokens("字" * 500, 50)
+    assert estimate_tokens(cut) <= 50 and cut.endswith("…")
+    raw, okr = PromptBudget(max_input_tokens=4000).fit("日报", "O1 目标", overhead_tokens=300)
+    assert not raw.truncated and not okr.truncated
+
+
+def test_rendered_prompt_respects_ceiling():
+    now = datetime.utcnow()
+    report = ReportIn(
+        user_id="u_1",
+        user_name="测试",
+        period_type="weekly",
+        period_start=now.date(),
+        period_end=now.date(),
+        raw_text=_long_report() * 3,
+        message_ts=now,
+    )
+    qwen = QwenClient(api_key="test", model="qwen-test", prompt_budget=PromptBudget(1200))
+    system_prompt, user_prompt = qwen._render_prompts(report, "O1 目标\n- KR2 压测")
+    assert estimate_tokens(system_prompt) + estimate_tokens(user_prompt) <= 1200
+    assert "风险：支付接口依赖第三方" in user_prompt and "请输出 JSON" in user_prompt
@@ -4,8 +4,11 @@ from datetime import datetime
 import httpx
 import pytest
 
+from src.ai.batching import pack_by_tokens
+from src.ai.json_repair import json_repair_metrics, loads_lenient
 from src.ai.qwen import QwenClient
 from src.schemas import HRExtract, ReportIn
+from src.utils.retry import RetryPolicy
 
 
 @pytest.fixture
@@ -125,3 +128,223 @@ async def test_qwen_compatible_mode():
     result = await qwen.generate_hr_extract(_sample_report(), "OKR")
     assert result.hr_summary == "总结"
     await client.aclose()
+
+
+@pytest.mark.anyio("asyncio")
+async def test_qwen_cache_hits_and_skips_fallback(tmp_path):
+    from src.ai.cache import ExtractionCache
+
+    payload = {"output": {"text": json.dumps(_hr_extract_payload(), ensure_ascii=False)}}
+    transport = _mock_transport([httpx.Response(status_code=200, json=payload)])
+    client = httpx.AsyncClient(transport=transport)
+    cache = ExtractionCache(str(tmp_path / "cache.db"))
+    qwen = QwenClient(api_key="test", model="qwen-test", http_client=client, cache=cache)
+
+    report = _sample_report()
+    first = await qwen.generate_hr_extract(report, "OKR")
+    second = await qwen.generate_hr_extract(report, "OKR")  # no response left: must hit cache
+    assert second == first
+    assert cache.metrics()["hits"] == 1
+
+    failing = httpx.AsyncClient(transport=httpx.MockTransport(lambda r: httpx.Response(500)))
+    offline = QwenClient(
+        api_key="test", model="qwen-test", http_client=failing, cache=cache, max_retries=1
+    )
+    other = report.model_copy(update={"raw_text": "另一份日报"})
+    assert (await offline.generate_hr_extract(other, "OKR")).hr_summary.startswith("(离线模式)")
+    assert cache.metrics()["writes"] == 1
+    cache.close()
+    await client.aclose()
+    await failing.aclose()
+
+
+def test_extraction_cache_evicts_least_recently_used(tmp_path):
+    from src.ai.cache import ExtractionCache
+    from src.schemas import HRExtract
+
+    extract = HRExtract.model_validate(_hr_extract_payload())
+    size = len(extract.model_dump_json().encode("utf-8"))
+    cache = ExtractionCache(str(tmp_path / "cache.db"), max_bytes=size * 2)
+    cache._put("a", extract)
+    cache._put("b", extract)
+    assert cache._get("a") is not None  # "b" is now least recently used
+    cache._put("c", extract)
+    assert cache._get("b") is None
+    assert cache.metrics()["evictions"] == 1
+    cache.close()
+
+
+def test_incremental_json_fields_surface_top_level_strings():
+    from src.ai.streaming import IncrementalJSONFields
+
+    scanner = IncrementalJSONFields()
+    assert scanner.feed('```json\n{"hr_summary": "完成\\"灰') == []
+    assert scanner.feed('度\\"", "risks": [{"item": "x"}], "risk') == [
+        ("hr_summary", '完成"灰度"')
+    ]
+    assert scanner.feed('_level": "high"}') == [("risk_level", "high")]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_qwen_streaming_compatible_mode():
+    body = json.dumps(_hr_extract_payload(), ensure_ascii=False)
+    chunks = [body[i : i + 40] for i in range(0, len(body), 40)]
+    sse = "".join(
+        "data: "
+        + json.dumps({"choices": [{"delta": {"content": chunk}}]}, ensure_ascii=False)
+        + "\n\n"
+        for chunk in chunks
+    ) + "data: [DONE]\n\n"
+    seen_requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_requests.append(json.loads(request.content))
+        return httpx.Response(200, content=sse.encode("utf-8"))
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    partial = {}
+    qwen = QwenClient(
+        api_key="test",
+        model="qwen-plus",
+        http_client=client,
+        api_mode="compatible",
+        stream=True,
+        on_partial=lambda field, value: partial.setdefault(field, value),
+    )
+
+    result = await qwen.generate_hr_extract(_sample_report(), "OKR")
+    assert seen_requests[0]["stream"] is True
+    assert result.hr_summary == "总结"
+    assert partial == {"hr_summary": "总结", "risk_level": "medium"}
+    await client.aclose()
+
+
+def test_pack_by_tokens_respects_budget_and_count():
+    costs = [(0, 300), (1, 300), (2, 500), (3, 50), (4, 50), (5, 50)]
+    assert pack_by_tokens(costs, budget=800, max_items=3) == [[0, 1], [2, 3, 4], [5]]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_qwen_batch_splits_array_and_retries_invalid_element_alone():
+    good = _hr_extract_payload()
+    batch = {
+        "reports": [
+            {"index": 1, **good, "hr_summary": "第二份"},
+            {"index": 0, **good, "hr_summary": "第一份"},
+            {"index": 2, "risks": []},
+        ]
+    }
+    single = {**good, "hr_summary": "单独重试"}
+    prompts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        prompts.append(body["input"]["messages"][0]["content"])
+        text = batch if len(prompts) == 1 else single
+        return httpx.Response(200, json={"output": {"text": json.dumps(text, ensure_ascii=False)}})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    qwen = QwenClient(
+        api_key="test", model="qwen-batch", http_client=client, batch_max_tokens=4000
+    )
+    reports = [
+        _sample_report().model_copy(update={"user_id": f"u_{index}"}) for index in range(3)
+    ]
+    results = await qwen.generate_hr_extracts([(report, "OKR") for report in reports])
+    assert [item.hr_summary for item in results] == ["第一份", "第二份", "单独重试"]
+    assert len(prompts) == 2
+    assert "=== 报告 2 ===" in prompts[0] and "u_2" in prompts[1] and "u_0" not in prompts[1]
+    await client.aclose()
+
+
+@pytest.mark.anyio("asyncio")
+async def test_qwen_repairs_fenced_truncated_json_without_retry():
+    text = json.dumps(_hr_extract_payload(), ensure_ascii=False)
+    damaged = "好的，以下是结果：\n```json\n" + text[: text.index('"next_actions"')] + '"next_'
+    transport = _mock_transport(
+        [httpx.Response(status_code=200, json={"output": {"text": damaged}})]
+    )
+    client = httpx.AsyncClient(transport=transport)
+    qwen = QwenClient(api_key="test", model="qwen-test", http_client=client)
+    before = json_repair_metrics()
+
+    result = await qwen.generate_hr_extract(_sample_report(), "OKR")
+    assert result.hr_summary == "总结" and not result.needs_retranslation
+    assert result.okr_alignment.hit_krs == ["KR1"] and result.next_actions == []
+    after = json_repair_metrics()
+    assert after["repaired"] == before["repaired"] + 1
+    assert after["retries"] == before["retries"]
+    await client.aclose()
+
+
+@pytest.mark.anyio("asyncio")
+async def test_qwen_retries_output_truncated_before_the_summary():
+    text = json.dumps(_hr_extract_payload(), ensure_ascii=False)
+    transport = _mock_transport(
+        [
+            httpx.Response(status_code=200, json={"output": {"text": '{"hr_su'}}),
+            httpx.Response(status_code=200, json={"output": {"text": text}}),
+        ]
+    )
+    client = httpx.AsyncClient(transport=transport)
+    qwen = QwenClient(api_key="test", model="qwen-test", http_client=client)
+    qwen.retry_policy = RetryPolicy(max_attempts=2, base_delay=0.01, max_delay=0.01)
+    before = json_repair_metrics()
+
+    result = await qwen.generate_hr_extract(_sample_report(), "OKR")
+    assert result.hr_summary == "总结" and not result.needs_retranslation
+    assert json_repair_metrics()["retries"] == before["retries"] + 1
+    await client.aclose()
+
+
+def test_repair_json_closes_truncation_and_trailing_commas():
+    assert loads_lenient('{"a": [1, 2,], "b": {"c": 0.') == {"a": [1, 2], "b": {}}
+    assert loads_lenient('[{"index": 0}, {"index": 1, "hr_sum') == [{"index": 0}, {"index": 1}]
+    with pytest.raises(ValueError):
+        loads_lenient("抱歉，无法生成")
+
+
+@pytest.mark.anyio("asyncio")
+async def test_qwen_compact_schema_maps_back_to_hr_extract():
+    compact = {
+        "s": "总结",
+        "r": [{"i": "延迟", "l": "h", "m": "增加人手"}],
+        "n": [{"t": "支持成本", "o": "HR"}],
+        "a": {"o": ["O1"], "k": ["KR1"], "g": [], "c": 0.8},
+        "x": ["跟进客户反馈"],
+        "v": "m",
+    }
+    prompts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        prompts.append(json.loads(request.content)["input"]["messages"][0]["content"])
+        text = json.dumps(compact, ensure_ascii=False)
+        return httpx.Response(200, json={"output": {"text": text}})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    qwen = QwenClient(api_key="test", model="qwen-test", http_client=client, compact_output=True)
+    result = await qwen.generate_hr_extract(_sample_report(), "OKR")
+    assert result == HRExtract.model_validate(
+        {**_hr_extract_payload(), "risks": [{"item": "延迟", "likelihood": "high", "mitigation": "增加人手"}]}
+    )
+    assert '"s":' in prompts[0] and '"hr_summary":' not in prompts[0]
+    await client.aclose()
+
+
+@pytest.mark.anyio("asyncio")
+async def test_qwen_batch_returns_one_extract_per_input():
+    qwen = QwenClient(api_key="test", model="qwen-slots")
+    extract = HRExtract(**_hr_extract_payload())
+
+    async def full_extract(report, okr_brief):
+        # A slot left empty must not shift the results after it.
+        return None if report.user_id == "u_1" else extract
+
+    qwen._full_extract = full_extract
+    reports = [
+        _sample_report().model_copy(update={"user_id": f"u_{index}"}) for index in range(3)
+    ]
+    results = await qwen.generate_hr_extracts([(report, "OKR") for report in reports])
+    assert len(results) == 3
+    assert results[0] is extract and results[2] is extract
+    assert results[1].needs_retranslation
@@ -0,0 +1,94 @@
+import asyncio
+import json
+from datetime import datetime
+
+import httpx
+import pytest
+
+from src.ai.qwen import QwenClient
+from src.ai.ratelimit import ModelRateLimiter, RateLimitConfig, TokenBucket, get_rate_limiter
+from src.schemas import ReportIn
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def _report() -> ReportIn:
+    now = datetime.utcnow()
+    return ReportIn(
+        user_id="u_1",
+        user_name="测试",
+        period_type="daily",
+        period_start=now.date(),
+        period_end=now.date(),
+        raw_text="日报内容",
+        message_ts=now,
+    )
+
+
+@pytest.mark.anyio("asyncio")
+async def test_max_in_flight_caps_concurrency():
+    limiter = ModelRateLimiter("qwen-max", max_in_flight=2)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with limiter.slot():
+            peak = max(peak, limiter.metrics()["in_flight"])
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(call() for _ in range(6)))
+    assert peak == 2
+
+
+@pytest.mark.anyio("asyncio")
+async def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(capacity=600, per_seconds=60)  # 10 tokens/sec
+    assert await bucket.acquire(600) == 0.0
+    waited = await bucket.acquire(1)
+    assert 0.05 < waited < 0.2
+    assert bucket.utilisation() > 0.99
+
+
+@pytest.mark.anyio("asyncio")
+async def test_limiter_shared_per_model():
+    config = RateLimitConfig(max_in_flight=3)
+    assert get_rate_limiter("qwen-max", config) is get_rate_limiter("QWEN-MAX", config)
+    assert get_rate_limiter("qwen-max", config) is not get_rate_limiter("qwen-plus", config)
+
+
+@pytest.mark.anyio("asyncio")
+async def test_qwen_honours_retry_after_without_retry_hint():
+    payload = {
+        "hr_summary": "总结",
+        "risks": [],
+        "needs": [],
+        "okr_alignment": {"hit_objectives": [], "hit_krs": [], "gaps": [], "confidence": 0.5},
+        "next_actions": [],
+        "risk_level": "low",
+    }
+    prompts = []
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "0"}),
+        httpx.Response(200, json={"output": {"text": json.dumps(payload)}}),
+    ]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        prompts.append(json.loads(request.content)["input"]["messages"][0]["content"])
+        return responses.pop(0)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    qwen = QwenClient(
+        api_key="test",
+        model="qwen-retry",
+        http_client=client,
+        rate_limits=RateLimitConfig(max_in_flight=1),
+    )
+    result = await qwen.generate_hr_extract(_report(), "OKR")
+    assert result.hr_summary == "总结"
+    assert prompts[0] == prompts[1]
+    metrics = get_rate_limiter("qwen-retry", qwen.rate_limits).metrics()
+    assert metrics["retry_after_pauses"] == 1
+    await client.aclose()
@@ -0,0 +1,192 @@
+import asyncio
+import json
+import random
+import time
+from datetime import datetime
+
+import httpx
+import pytest
+
+from src.ai.qwen import QwenClient
+from src.feishu.api_client import FeishuAPIClient
+from src.schemas import ReportIn
+from src.utils.retry import RetryPolicy, RetryState, call_with_retry, is_retryable
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def _status_error(status_code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://example.invalid")
+    response = httpx.Response(status_code, request=request)
+    return httpx.HTTPStatusError("boom", request=request, response=response)
+
+
+def test_classification_and_decorrelated_jitter():
+    assert is_retryable(_status_error(429)) and is_retryable(_status_error(503))
+    assert not is_retryable(_status_error(400)) and not is_retryable(_status_error(401))
+    assert is_retryable(httpx.ConnectError("down")) and not is_retryable(KeyError("x"))
+
+    now = [0.0]
+    policy = RetryPolicy(max_attempts=10, deadline=12.0, base_delay=0.5, max_delay=4.0)
+    state = RetryState(policy, clock=lambda: now[0], rng=random.Random(7))
+    delays = []
+    while True:
+        state.attempt_timeout()
+        delay = state.next_delay(_status_error(503))
+        if delay is None:
+            break
+        assert 0.5 <= delay <= 4.0
+        delays.append(delay)
+        now[0] += delay + 1.0
+    assert len(set(delays)) > 1
+    # stopped by the deadline, not the attempt cap
+    assert state.attempts < 10 and now[0] <= 12.0
+    assert state.next_delay(_status_error(400)) is None
+
+
+@pytest.mark.anyio("asyncio")
+async def test_attempt_timeouts_come_from_remaining_budget():
+    seen = []
+
+    async def call(timeout: float) -> str:
+        seen.append(timeout)
+        raise httpx.ReadTimeout("slow")
+
+    policy = RetryPolicy(
+        max_attempts=5, deadline=0.3, attempt_timeout=10.0, base_delay=0.01, max_delay=0.02,
+        min_attempt_timeout=0.01,
+    )
+    started = time.monotonic()
+    with pytest.raises(httpx.ReadTimeout):
+        await call_with_retry(policy, call)
+    assert time.monotonic() - started < 0.3
+    assert all(timeout <= 0.3 for timeout in seen) and len(seen) == 5
+
+
+@pytest.mark.anyio("asyncio")
+async def test_feishu_send_retries_5xx_with_stable_uuid_but_not_4xx():
+    bodies = []
+    statuses = [503, 200]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/tenant_access_token/internal"):
+            return httpx.Response(200, json={"code": 0, "tenant_access_token": "t", "expire": 7200})
+        bodies.append(json.loads(request.content))
+        return httpx.Response(statuses.pop(0))
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    feishu = FeishuAPIClient(
+        "app", "secret", "chat", http_client=client,
+        retry_policy=RetryPolicy(base_delay=0.01, max_delay=0.02),
+    )
+    await feishu.send_card({"card": 1})
+    assert len(bodies) == 2 and bodies[0]["uuid"] == bodies[1]["uuid"]
+
+    statuses.append(400)
+    with pytest.raises(httpx.HTTPStatusError):
+        await feishu.send_card({"card": 2})
+    assert len(bodies) == 3
+    await client.aclose()
+
+
+@pytest.mark.anyio("asyncio")
+async def test_qwen_does_not_retry_fatal_status():
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(400, json={"code": "InvalidParameter"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    qwen = QwenClient(api_key="test", model="qwen-retry", http_client=client, max_retries=3)
+    now = datetime.utcnow()
+    report = ReportIn(
+        user_id="u_1",
+        user_name="测试",
+        period_type="daily",
+        period_start=now.date(),
+        period_end=now.date(),
+        raw_text="日报",
+        message_ts=now,
+    )
+    result = await qwen.generate_hr_extract(report, "OKR")
+    assert result.needs_retranslation and calls == 1
+    await client.aclose()
+
+
+def _qwen_report() -> ReportIn:
+    now = datetime.utcnow()
+    return ReportIn(
+        user_id="u_1",
+        user_name="测试",
+        period_type="daily",
+        period_start=now.date(),
+        period_end=now.date(),
+        raw_text="日报",
+        message_ts=now,
+    )
+
+
+_VALID_EXTRACT = {
+    "hr_summary": "总结",
+    "risks": [],
+    "needs": [],
+    "okr_alignment": {"hit_objectives": [], "hit_krs": [], "gaps": [], "confidence": 0.5},
+    "next_actions": [],
+    "risk_level": "low",
+}
+
+
+@pytest.mark.anyio("asyncio")
+async def test_qwen_retry_after_timeout_gets_the_rest_of_the_deadline():
+    needed = [0.5, 0.3]
+    read_timeouts = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        read_timeout = request.extensions["timeout"]["read"]
+        read_timeouts.append(read_timeout)
+        took = needed.pop(0)
+        if took > read_timeout:
+            await asyncio.sleep(read_timeout)
+            raise httpx.ReadTimeout("slow", request=request)
+        await asyncio.sleep(took)
+        text = json.dumps(_VALID_EXTRACT, ensure_ascii=False)
+        return httpx.Response(200, json={"output": {"text": text}})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    # attempt_timeout stands in for the 20s floor: the second attempt needs
+    # more than that and only fits because it gets what the first one left.
+    policy = RetryPolicy(
+        max_attempts=2, deadline=0.9, attempt_timeout=0.2, base_delay=0.01, max_delay=0.01,
+        min_attempt_timeout=0.01,
+    )
+    qwen = QwenClient(
+        api_key="test", model="qwen-retry-budget", http_client=client, retry_policy=policy
+    )
+    result = await qwen.generate_hr_extract(_qwen_report(), "OKR")
+    assert not result.needs_retranslation and result.hr_summary == "总结"
+    assert len(read_timeouts) == 2 and read_timeouts[1] > 0.3
+    await client.aclose()
+
+
+@pytest.mark.anyio("asyncio")
+async def test_qwen_first_attempt_index_is_zero(monkeypatch):
+    attempts = []
+    qwen = QwenClient(api_key="test", model="qwen-retry-index", max_retries=2)
+
+    async def invoke(system_prompt, user_prompt, attempt, **kwargs):
+        attempts.append(attempt)
+        if len(attempts) == 1:
+            raise httpx.ConnectError("down")
+        return json.dumps(_VALID_EXTRACT, ensure_ascii=False)
+
+    monkeypatch.setattr(qwen, "_invoke_completion", invoke)
+    monkeypatch.setattr(
+        qwen, "retry_policy", RetryPolicy(max_attempts=2, base_delay=0.01, max_delay=0.01)
+    )
+    await qwen.generate_hr_extract(_qwen_report(), "OKR")
+    assert attempts == [0, 1]
@@ -0,0 +1,109 @@
+import json
+import time
+from datetime import datetime
+
+import httpx
+import pytest
+
+from src.ai.qwen import QwenClient
+from src.ai.router import ModelRouter, get_model_health, parse_routing_rules
+from src.config import Settings, resolve_api_mode
+from src.schemas import ReportIn
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def _report(period_type: str = "daily", raw_text: str = "日报：完成接口联调") -> ReportIn:
+    now = datetime.utcnow()
+    return ReportIn(
+        user_id="u_1",
+        user_name="测试",
+        period_type=period_type,
+        period_start=now.date(),
+        period_end=now.date(),
+        raw_text=raw_text,
+        message_ts=now,
+    )
+
+
+def test_rules_pick_model_by_period_and_length():
+    rules = parse_routing_rules(
+        "daily:<=400:rt-turbo; *:>=2000:rt-long; bogus; *:<=1000:rt-plus; *:*:rt-max"
+    )
+    assert [rule.model for rule in rules] == ["rt-turbo", "rt-long", "rt-plus", "rt-max"]
+    router = ModelRouter(rules, default_model="rt-default")
+    assert router.choose(_report()) == "rt-turbo"
+    assert router.choose(_report("weekly")) == "rt-plus"
+    assert router.choose(_report("monthly", "月" * 3000)) == "rt-long"
+    assert router.candidates(_report("monthly", "月" * 1500)) == ["rt-max", "rt-default"]
+
+
+def test_unhealthy_model_is_skipped():
+    router = ModelRouter(
+        parse_routing_rules("*:*:rh-turbo;*:*:rh-plus"),
+        default_model="rh-max",
+        min_samples=3,
+        max_latency=5.0,
+    )
+    for _ in range(3):
+        router.record("rh-turbo", 0.1, ok=False)
+        router.record("rh-plus", 9.0, ok=True)
+    assert router.choose(_report()) == "rh-max"
+    for _ in range(3):
+        router.record("rh-max", 0.2, ok=False)
+    # every candidate is unhealthy: fall back to the lowest error rate
+    assert router.choose(_report()) == "rh-plus"
+    assert get_model_health("rh-turbo").metrics()["error_rate"] == 1.0
+
+
+def test_health_samples_expire_and_ignore_case():
+    router = ModelRouter(
+        parse_routing_rules("*:*:RE-Turbo"),
+        default_model="re-max",
+        min_samples=3,
+        sample_ttl=0.05,
+    )
+    for _ in range(3):
+        router.record("re-turbo", 0.1, ok=False)
+    assert get_model_health("RE-TURBO") is get_model_health("re-turbo")
+    assert router.choose(_report()) == "re-max"
+    # A burst of errors does not fail the model over for good.
+    time.sleep(0.06)
+    assert router.choose(_report()) == "RE-Turbo"
+    assert get_model_health("re-turbo").samples == 0
+
+
+def test_api_mode_resolves_per_model():
+    assert resolve_api_mode("qwen-turbo", "text") == "compatible"
+    assert resolve_api_mode("qwen-max", "text") == "text"
+    assert resolve_api_mode("qwen-max", "compatible") == "compatible"
+    settings = Settings(QWEN_MODEL="qwen-long", QWEN_API_MODE="text")
+    assert settings.qwen_api_mode == "compatible"
+
+
+@pytest.mark.anyio("asyncio")
+async def test_client_sends_routed_model_with_its_api_mode():
+    seen = []
+    text = json.dumps({"hr_summary": "总结", "risk_level": "low"}, ensure_ascii=False)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        seen.append((request.url.path, body["model"]))
+        if request.url.path.endswith("/chat/completions"):
+            return httpx.Response(200, json={"choices": [{"message": {"content": text}}]})
+        return httpx.Response(200, json={"output": {"text": text}})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    router = ModelRouter(parse_routing_rules("daily:<=400:qwen-turbo"), default_model="qwen-max")
+    qwen = QwenClient(
+        api_key="test", model="qwen-max", api_mode="text", http_client=client, router=router
+    )
+    await qwen.generate_hr_extract(_report(), "OKR")
+    await qwen.generate_hr_extract(_report("monthly"), "OKR")
+    assert seen[0] == ("/compatible-mode/v1/chat/completions", "qwen-turbo")
+    assert seen[1][0].endswith("/text-generation/generation") and seen[1][1] == "qwen-max"
+    assert get_model_health("qwen-turbo").samples >= 1
+    await client.aclose()
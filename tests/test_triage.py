@@ -0,0 +1,104 @@
+import json
+from datetime import datetime
+
+import httpx
+import pytest
+
+from src.ai.qwen import QwenClient
+from src.ai.triage import CascadeConfig, cascade_metrics, heuristic_triage
+from src.schemas import ReportIn
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def _report(raw_text: str, period_type: str = "daily") -> ReportIn:
+    now = datetime.utcnow()
+    return ReportIn(
+        user_id="u_1",
+        user_name="测试",
+        period_type=period_type,
+        period_start=now.date(),
+        period_end=now.date(),
+        raw_text=raw_text,
+        message_ts=now,
+    )
+
+
+def _full_payload() -> dict:
+    return {
+        "hr_summary": "完整解读",
+        "risks": [{"item": "依赖延期", "likelihood": "high", "mitigation": "协调"}],
+        "needs": [],
+        "okr_alignment": {"hit_objectives": [], "hit_krs": [], "gaps": [], "confidence": 0.6},
+        "next_actions": [],
+        "risk_level": "high",
+    }
+
+
+def test_heuristic_triage_levels_and_okr_mentions():
+    routine = heuristic_triage(_report("完成 KR2 的接口文档整理"), "O1 提升质量\n- KR2 接口文档")
+    assert routine.risk_level == "low" and routine.confidence >= 0.7
+    assert routine.mentions_okr and routine.hit_krs == ("KR2",)
+    assert heuristic_triage(_report("联调存在风险"), "").risk_level == "medium"
+    assert heuristic_triage(_report("线上故障导致发布阻塞"), "").risk_level == "high"
+    assert heuristic_triage(_report("日常事项。" * 400), "").confidence < 0.7
+
+
+@pytest.mark.anyio("asyncio")
+async def test_cascade_escalates_only_risky_reports():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(json.loads(request.content)["model"])
+        text = json.dumps(_full_payload(), ensure_ascii=False)
+        return httpx.Response(200, json={"output": {"text": text}})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    qwen = QwenClient(
+        api_key="test", model="qwen-max", http_client=client, cascade=CascadeConfig()
+    )
+    before = cascade_metrics()
+    light = await qwen.generate_hr_extract(_report("整理周会纪要，完成 KR1 文档"), "OKR")
+    full = await qwen.generate_hr_extract(_report("支付接口依赖第三方，存在延期风险"), "OKR")
+    weekly = await qwen.generate_hr_extract(_report("整理周会纪要", "weekly"), "OKR")
+    assert light.risk_level == "low" and light.okr_alignment.hit_krs == ["KR1"]
+    assert full.hr_summary == weekly.hr_summary == "完整解读"
+    assert calls == ["qwen-max", "qwen-max"]
+    after = cascade_metrics()
+    assert after["triaged"] - before["triaged"] == 2
+    assert after["escalated"] - before["escalated"] == 1
+    assert after["latency"]["full"]["samples"] > before["latency"]["full"]["samples"]
+    await client.aclose()
+
+
+@pytest.mark.anyio("asyncio")
+async def test_model_triage_uses_fast_model_and_escalates_on_low_confidence():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        calls.append(body["model"])
+        if body["model"] == "qwen-turbo":
+            content = body["messages"][-1]["content"]
+            confidence = 0.3 if "模糊" in content else 0.9
+            triage = {"v": "l", "okr": False, "c": confidence, "s": "例行工作"}
+            text = json.dumps(triage, ensure_ascii=False)
+            return httpx.Response(200, json={"choices": [{"message": {"content": text}}]})
+        text = json.dumps(_full_payload(), ensure_ascii=False)
+        return httpx.Response(200, json={"output": {"text": text}})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    qwen = QwenClient(
+        api_key="test",
+        model="qwen-max",
+        http_client=client,
+        cascade=CascadeConfig(mode="model"),
+    )
+    routine = await qwen.generate_hr_extract(_report("整理文档"), "OKR")
+    unclear = await qwen.generate_hr_extract(_report("情况有些模糊"), "OKR")
+    assert routine.hr_summary == "例行工作" and unclear.hr_summary == "完整解读"
+    assert calls == ["qwen-turbo", "qwen-turbo", "qwen-max"]
+    await client.aclose()